@@ -1,15 +1,27 @@
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-from app.api.routers.v1.endpoints import trading, user_state, health
+from app.api.routers.v1.endpoints import trading, user_state, health, fills, analytics, watchlist, info, market_data, alerts
 from app.api.routers import root
 from app.core.config import settings
 from app.core.logger import setup_logger
 from app.core.exceptions import HyperliquidBotException
+from app.services.position_state_service import position_state_service
+from app.services.watchlist_service import watchlist_service
+from app.services.market_data_service import market_data_service
+from app.services.l1_signer import shutdown_signers
+from app.services.hyperliquid_service import hyperliquid_service
+from app.services.metadata_cache import metadata_cache
+from app.services.shared_cache import shared_cache
+from app.services.alert_service import alert_engine
+from app.services.user_state_cache import user_state_cache
 from app.core.exception_handlers import (
     hyperliquid_bot_exception_handler,
     validation_error_handler,
@@ -20,11 +32,46 @@ logger = setup_logger(__name__)
 
 limiter = Limiter(key_func=get_remote_address)
 
+def start_upstream_subscriptions():
+    metadata_cache.start()
+    if settings.STATE_ENGINE_ENABLED:
+        position_state_service.start(watchlist_service.get())
+    # Price alerts are evaluated on the allMids feed.
+    mids = settings.MARKET_DATA_MIDS_ENABLED or settings.ALERTS_ENABLED
+    if settings.MARKET_DATA_COINS or mids:
+        market_data_service.start(settings.MARKET_DATA_COINS, mids=mids)
+    if settings.ALERTS_ENABLED:
+        alert_engine.start()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Metadata is loaded in the background: the server accepts requests immediately.
+    threading.Thread(target=hyperliquid_service.warmup, daemon=True).start()
+    if shared_cache.enabled:
+        # With several workers, a single elected one holds the upstream subscriptions.
+        shared_cache.start(on_elected=start_upstream_subscriptions)
+    else:
+        start_upstream_subscriptions()
+    # Hot addresses are tracked per worker: every worker runs its own refresh scheduler.
+    user_state_cache.start()
+    yield
+    # Orders still queued or in flight are completed before signers shut down.
+    hyperliquid_service.drain(settings.API_SHUTDOWN_TIMEOUT)
+    position_state_service.stop()
+    market_data_service.stop()
+    alert_engine.stop()
+    user_state_cache.stop()
+    shutdown_signers()
+    metadata_cache.stop()
+    shared_cache.stop()
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title="Hyperliquid Trading & State API",
         description="API pour récupérer l'état et interagir avec Hyperliquid",
-        version="1.1.0"
+        version="1.1.0",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse
     )
 
     app.state.limiter = limiter
@@ -39,14 +86,20 @@ def create_app() -> FastAPI:
         CORSMiddleware,
         allow_origins=settings.ALLOWED_ORIGINS,
         allow_credentials=True,
-        allow_methods=["GET", "POST"],
-        allow_headers=["Content-Type", "X-API-Key"],
+        allow_methods=["GET", "POST", "DELETE"],
+        allow_headers=["Content-Type", "X-API-Key", "X-Account", "Idempotency-Key"],
     )
     
     app.include_router(root.router)
     app.include_router(health.router, prefix="/v1", tags=["Health"])
     app.include_router(trading.router, prefix="/v1", tags=["Trading"])
     app.include_router(user_state.router, prefix="/v1", tags=["User State"])
+    app.include_router(fills.router, prefix="/v1", tags=["Fills"])
+    app.include_router(analytics.router, prefix="/v1", tags=["Analytics"])
+    app.include_router(watchlist.router, prefix="/v1", tags=["Watchlist"])
+    app.include_router(info.router, prefix="/v1", tags=["Info"])
+    app.include_router(market_data.router, prefix="/v1", tags=["Market Data"])
+    app.include_router(alerts.router, prefix="/v1", tags=["Alerts"])
     
     logger.info(f"✓ API v1.1.0 initialisée")
 
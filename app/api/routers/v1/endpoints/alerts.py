@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Request, Response
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from app.models.schemas import AlertRuleRequest, AlertRuleResponse, AlertRulesResponse
+from app.services.alert_service import alert_rule_store
+from app.api.dependencies import APIKeyDep
+
+router = APIRouter()
+limiter = Limiter(key_func=get_remote_address)
+
+@router.get(
+    "/alerts",
+    response_model=AlertRulesResponse,
+    summary="Règles d'alerte",
+    description="Liste des règles d'alerte évaluées sur les flux de prix et de positions. **Authentification requise via header X-API-Key.**"
+)
+@limiter.limit("60/minute")
+async def list_alert_rules(request: Request, api_key: APIKeyDep):
+    return AlertRulesResponse(rules=alert_rule_store.list())
+
+@router.post(
+    "/alerts",
+    response_model=AlertRuleResponse,
+    status_code=201,
+    summary="Créer une règle d'alerte",
+    description="Ajoute une règle de seuil sur le prix médian d'un coin ou le PnL latent d'un wallet surveillé. Les alertes sont envoyées sur Telegram. **Authentification requise via header X-API-Key.**"
+)
+@limiter.limit("30/minute")
+async def create_alert_rule(request: Request, rule: AlertRuleRequest, api_key: APIKeyDep):
+    return AlertRuleResponse(**alert_rule_store.add(rule.model_dump()))
+
+@router.delete(
+    "/alerts/{rule_id}",
+    status_code=204,
+    summary="Supprimer une règle d'alerte",
+    description="Supprime une règle d'alerte. **Authentification requise via header X-API-Key.**"
+)
+@limiter.limit("30/minute")
+async def delete_alert_rule(request: Request, rule_id: str, api_key: APIKeyDep):
+    alert_rule_store.remove(rule_id)
+    return Response(status_code=204)
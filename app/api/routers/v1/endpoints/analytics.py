@@ -0,0 +1,34 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from eth_utils import is_address
+
+from app.core.exceptions import InvalidAddressError
+from app.models.schemas import WalletAnalyticsResponse
+from app.services.analytics_service import analytics_service
+
+router = APIRouter()
+limiter = Limiter(key_func=get_remote_address)
+
+@router.get(
+    "/analytics/{address}",
+    response_model=WalletAnalyticsResponse,
+    summary="Statistiques d'un wallet",
+    description="Volume par coin, courbe de PnL réalisé, win rate, durée moyenne de détention et fréquence de trading, calculés depuis l'historique local des fills."
+)
+@limiter.limit("60/minute")
+async def get_wallet_analytics(
+    request: Request,
+    address: str,
+    resolution: Literal["1m", "1h", "1d"] = Query("1h", description="Taille des buckets de la courbe de PnL"),
+    start_time: Optional[int] = Query(None, alias="from", description="Début de l'intervalle (ms)"),
+    end_time: Optional[int] = Query(None, alias="to", description="Fin de l'intervalle (ms)")
+):
+    if not is_address(address):
+        raise InvalidAddressError(address)
+
+    analytics = await run_in_threadpool(analytics_service.get_wallet_analytics, address, resolution, start_time, end_time)
+    return WalletAnalyticsResponse(**analytics)
@@ -0,0 +1,35 @@
+from typing import Optional
+import json
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from eth_utils import is_address
+
+from app.core.exceptions import InvalidAddressError
+from app.services.fill_store_service import fill_store
+
+router = APIRouter()
+limiter = Limiter(key_func=get_remote_address)
+
+@router.get(
+    "/fills",
+    summary="Historique des fills",
+    description="Retourne les fills enregistrés par le listener, filtrés par adresse, coin et intervalle de temps (timestamps en ms). Réponse en NDJSON streamée."
+)
+@limiter.limit("60/minute")
+async def get_fills(
+    request: Request,
+    user: Optional[str] = Query(None, description="Adresse de l'utilisateur"),
+    coin: Optional[str] = Query(None, description="Symbole de la crypto (ex: BTC)"),
+    start_time: Optional[int] = Query(None, alias="from", description="Début de l'intervalle (ms)"),
+    end_time: Optional[int] = Query(None, alias="to", description="Fin de l'intervalle (ms)"),
+    limit: int = Query(10000, gt=0, le=1_000_000, description="Nombre maximal de fills")
+):
+    if user and not is_address(user):
+        raise InvalidAddressError(user)
+
+    fills = fill_store.query(user=user, coin=coin, start_time=start_time, end_time=end_time, limit=limit)
+    lines = (json.dumps(fill, separators=(",", ":")) + "\n" for fill in fills)
+    return StreamingResponse(lines, media_type="application/x-ndjson")
@@ -6,7 +6,7 @@ import time
 from app.models.schemas import HealthResponse, ServiceStatus
 from app.core.config import settings
 from app.core.logger import setup_logger
-from app.services.hyperliquid_service import HyperliquidService
+from app.services.hyperliquid_service import hyperliquid_service
 
 logger = setup_logger(__name__)
 
@@ -17,12 +17,13 @@ START_TIME = time.time()
 
 def _check_exchange_status() -> ServiceStatus:
     try:
-        service = HyperliquidService()
-        if service.exchange_instance is None:
+        if not hyperliquid_service.trading_configured:
             return ServiceStatus(
                 status="down",
                 message="Exchange not configured (SECRET_KEY missing or TRADING_ENABLED=false)"
             )
+        if not hyperliquid_service.ready:
+            return ServiceStatus(status="down", message="Hyperliquid metadata still loading")
         return ServiceStatus(status="up", message="Connected to Hyperliquid")
     except Exception as e:
         logger.error(f"Error checking exchange status: {e}")
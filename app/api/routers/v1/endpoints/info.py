@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+import orjson
+
+from app.services.info_proxy_service import info_proxy_service
+from app.api.dependencies import APIKeyDep
+
+router = APIRouter()
+limiter = Limiter(key_func=get_remote_address)
+
+@router.post(
+    "/info",
+    summary="Proxy /info Hyperliquid",
+    description="Transmet n'importe quelle requête /info (clearinghouseState, openOrders, l2Book...) et renvoie la réponse de Hyperliquid telle quelle. Certaines requêtes peuvent être mises en cache (INFO_PROXY_CACHE_TTLS). **Authentification requise via header X-API-Key.**"
+)
+@limiter.limit("120/minute")
+async def proxy_info(request: Request, api_key: APIKeyDep):
+    try:
+        payload = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Le corps de la requête doit être un JSON valide")
+
+    if not isinstance(payload, dict) or not isinstance(payload.get("type"), str):
+        raise HTTPException(status_code=400, detail="Le corps de la requête doit contenir un champ 'type'")
+
+    try:
+        status_code, chunks, cache_hit = await run_in_threadpool(info_proxy_service.query, payload)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Erreur Hyperliquid : {str(e)}")
+
+    return StreamingResponse(
+        chunks,
+        status_code=status_code,
+        media_type="application/json",
+        headers={"X-Cache": "HIT" if cache_hit else "MISS"}
+    )
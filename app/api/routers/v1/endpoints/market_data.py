@@ -0,0 +1,137 @@
+import asyncio
+import time
+from typing import Callable, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from app.core.config import settings
+from app.models.schemas import BookResponse, QuoteResponse, PricesResponse, PriceResponse
+from app.services.market_data_service import market_data_service, MAX_BOOK_LEVELS
+
+router = APIRouter()
+limiter = Limiter(key_func=get_remote_address)
+
+# Workers that read the mids from the shared cache check it for a new version at this interval.
+PRICES_POLL_INTERVAL = 0.02
+
+
+def _etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    if not if_none_match or etag is None:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in tags or "*" in tags
+
+
+async def _wait_for_change(current_etag: Callable[[], Optional[str]], if_none_match: Optional[str], wait: float) -> Optional[str]:
+    deadline = time.monotonic() + wait
+    while True:
+        mids = market_data_service.get_mids()
+        changed = mids.changed_event() if mids else None
+        etag = current_etag()
+        remaining = deadline - time.monotonic()
+        if changed is None or remaining <= 0 or not _etag_matches(if_none_match, etag):
+            return etag
+        # The subscribed worker is woken by MidPrices.apply; the others only see a
+        # new version when they read the shared cache.
+        timeout = min(remaining, PRICES_POLL_INTERVAL) if market_data_service.reads_shared() else remaining
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _mids_etag() -> Optional[str]:
+    mids = market_data_service.get_mids()
+    return f'"mids-{mids.version}"' if mids else None
+
+
+def _coin_etag(coin: str) -> Optional[str]:
+    mids = market_data_service.get_mids()
+    price = mids.get(coin) if mids else None
+    return f'"{coin}-{price[1]}"' if price else None
+
+@router.get(
+    "/book/{coin}",
+    response_model=BookResponse,
+    summary="Carnet d'ordres local",
+    description="Profondeur du carnet L2 maintenu en mémoire depuis le flux WebSocket l2Book. Seuls les coins de MARKET_DATA_COINS sont disponibles."
+)
+@limiter.limit("120/minute")
+async def get_book(
+    request: Request,
+    coin: str,
+    depth: int = Query(MAX_BOOK_LEVELS, ge=1, le=MAX_BOOK_LEVELS, description="Nombre de niveaux par côté")
+):
+    book = market_data_service.get_book(coin)
+    if book is None:
+        raise HTTPException(status_code=404, detail=f"Carnet indisponible pour {coin}")
+    return BookResponse(**book.depth(depth))
+
+
+@router.get(
+    "/quote/{coin}",
+    response_model=QuoteResponse,
+    summary="Estimation de prix d'exécution",
+    description="Estime le VWAP et le slippage d'un ordre au marché de la taille donnée en parcourant le carnet local."
+)
+@limiter.limit("120/minute")
+async def get_quote(
+    request: Request,
+    coin: str,
+    size: float = Query(..., gt=0, description="Taille de l'ordre en unités du coin"),
+    side: Literal["buy", "sell"] = Query(..., description="Côté de l'ordre")
+):
+    book = market_data_service.get_book(coin)
+    quote = book.quote(size, side == "buy") if book else None
+    if quote is None:
+        raise HTTPException(status_code=404, detail=f"Carnet indisponible pour {coin}")
+    return QuoteResponse(**quote)
+
+
+@router.get(
+    "/prices",
+    response_model=PricesResponse,
+    summary="Prix médians",
+    description="Prix médians de tous les coins, maintenus en mémoire depuis le flux WebSocket allMids (MARKET_DATA_MIDS_ENABLED). Supporte ETag/If-None-Match ; avec `wait`, la requête attend un changement de prix avant de répondre (long-polling)."
+)
+@limiter.limit("600/minute")
+async def get_prices(
+    request: Request,
+    wait: float = Query(0, ge=0, le=settings.PRICES_MAX_WAIT, description="Attente maximale d'un changement (s) si If-None-Match correspond")
+):
+    if_none_match = request.headers.get("if-none-match")
+    etag = await _wait_for_change(_mids_etag, if_none_match, wait)
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Prix indisponibles")
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    body, version = market_data_service.get_mids().body()
+    return Response(content=body, media_type="application/json", headers={"ETag": f'"mids-{version}"'})
+
+
+@router.get(
+    "/prices/{coin}",
+    response_model=PriceResponse,
+    summary="Prix médian d'un coin",
+    description="Prix médian d'un coin depuis le flux allMids. Supporte ETag/If-None-Match et le long-polling via `wait`."
+)
+@limiter.limit("600/minute")
+async def get_price(
+    request: Request,
+    coin: str,
+    wait: float = Query(0, ge=0, le=settings.PRICES_MAX_WAIT, description="Attente maximale d'un changement (s) si If-None-Match correspond")
+):
+    if_none_match = request.headers.get("if-none-match")
+    etag = await _wait_for_change(lambda: _coin_etag(coin), if_none_match, wait)
+    if etag is None:
+        raise HTTPException(status_code=404, detail=f"Prix indisponible pour {coin}")
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    mids = market_data_service.get_mids()
+    mid, version = mids.get(coin)
+    return ORJSONResponse({"coin": coin, "mid": mid, "time": mids.time}, headers={"ETag": f'"{coin}-{version}"'})
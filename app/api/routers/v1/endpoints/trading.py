@@ -1,12 +1,25 @@
-from fastapi import APIRouter, HTTPException, Request
+import asyncio
+from concurrent.futures import Future
+
+import orjson
+from fastapi import APIRouter, Header, HTTPException, Request, Response
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from pydantic import BaseModel
 
-from app.core.exceptions import ExchangeNotConfiguredError, TradingError
+from app.core.exceptions import (
+    ExchangeNotConfiguredError,
+    TradingError,
+    AccountNotFoundError,
+    IdempotencyKeyConflictError,
+    IdempotencyKeyInProgressError,
+    IdempotentRequestFailedError
+)
 from app.models.schemas import MarketOrderRequest, MarketCloseRequest, OrderResponse, OrderFillDetail
 from app.services.hyperliquid_service import hyperliquid_service as hs
+from app.services.idempotency_service import idempotency_store
 from app.api.dependencies import APIKeyDep
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional
 
 router = APIRouter()
 limiter = Limiter(key_func=get_remote_address)
@@ -31,20 +44,39 @@ def process_order_result(order_result: Dict[str, Any]) -> OrderResponse:
     return OrderResponse(
         status=order_result["status"],
         filled_orders=filled_orders,
-        errors=errors
+        errors=errors,
+        expected_slippage=order_result.get("expected_slippage"),
+        realized_slippage=order_result.get("realized_slippage")
     )
 
-@router.post(
-    "/order/market",
-    response_model=OrderResponse,
-    summary="Ouvrir une position market",
-    description="Place un ordre market avec slippage configurable. **Authentification requise via header X-API-Key.**"
-)
-@limiter.limit("30/minute")
-async def create_market_order(request: Request, order: MarketOrderRequest, api_key: APIKeyDep):
+async def execute_order(
+    request: Request,
+    response: Response,
+    api_key: str,
+    idempotency_key: Optional[str],
+    payload: BaseModel,
+    account: Optional[str],
+    submit: Callable[[], "Future[Dict[str, Any]]"]
+) -> OrderResponse:
+    # Orders are signed and sent on the account's worker threads; the event loop only awaits them.
+    # Shielded: a client that disconnects stops waiting but never cancels a queued order.
     try:
-        order_result = hs.create_market_order(order)
+        if not idempotency_key:
+            return process_order_result(await asyncio.shield(asyncio.wrap_future(submit())))
+
+        key = f"{request.url.path}:{api_key}:{idempotency_key}"
+        fingerprint = orjson.dumps([payload.model_dump(), account], option=orjson.OPT_SORT_KEYS)
+        order_result, replayed = await idempotency_store.run(key, fingerprint, submit)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
         return process_order_result(order_result)
+    except IdempotencyKeyConflictError:
+        # The store key embeds the API key: only the client's key is echoed back.
+        raise HTTPException(status_code=422, detail=IdempotencyKeyConflictError(idempotency_key).message)
+    except (IdempotencyKeyInProgressError, IdempotentRequestFailedError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except AccountNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except ExchangeNotConfiguredError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except TradingError as e:
@@ -52,20 +84,42 @@ async def create_market_order(request: Request, order: MarketOrderRequest, api_k
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur inattendue : {str(e)}")
 
+@router.post(
+    "/order/market",
+    response_model=OrderResponse,
+    summary="Ouvrir une position market",
+    description="Place un ordre market avec slippage configurable, ou `auto` pour le déduire du carnet local. Le compte est choisi via le champ `account` ou le header `X-Account`. Un header `Idempotency-Key` rend les retries sûrs : la réponse du premier appel est rejouée. **Authentification requise via header X-API-Key.**"
+)
+@limiter.limit("30/minute")
+async def create_market_order(
+    request: Request,
+    response: Response,
+    order: MarketOrderRequest,
+    api_key: APIKeyDep,
+    x_account: Optional[str] = Header(None, alias="X-Account", description="Nom du compte de trading"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Clé unique par ordre pour dédupliquer les retries")
+):
+    return await execute_order(
+        request, response, api_key, idempotency_key, order, x_account,
+        lambda: hs.submit_market_order(order, x_account)
+    )
+
 @router.post(
     "/order/market/close",
     response_model=OrderResponse,
     summary="Fermer une position market",
-    description="Ferme une position existante. **Authentification requise via header X-API-Key.**"
+    description="Ferme une position existante. Supporte le header `Idempotency-Key`. **Authentification requise via header X-API-Key.**"
 )
 @limiter.limit("30/minute")
-async def close_market_position(request: Request, close_request: MarketCloseRequest, api_key: APIKeyDep):
-    try:
-        order_result = hs.close_market_position(close_request)
-        return process_order_result(order_result)
-    except ExchangeNotConfiguredError as e:
-        raise HTTPException(status_code=503, detail=str(e))
-    except TradingError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur inattendue : {str(e)}")
+async def close_market_position(
+    request: Request,
+    response: Response,
+    close_request: MarketCloseRequest,
+    api_key: APIKeyDep,
+    x_account: Optional[str] = Header(None, alias="X-Account", description="Nom du compte de trading"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Clé unique par ordre pour dédupliquer les retries")
+):
+    return await execute_order(
+        request, response, api_key, idempotency_key, close_request, x_account,
+        lambda: hs.submit_market_close(close_request, x_account)
+    )
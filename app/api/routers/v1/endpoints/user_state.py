@@ -1,42 +1,103 @@
-from fastapi import APIRouter, HTTPException, Request
+from typing import Dict, Any, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from app.core.config import settings
+from app.core.exceptions import UpstreamUnavailableError
 from app.models.schemas import UserStateResponse
 from app.services.hyperliquid_service import hyperliquid_service as hs
+from app.services.position_state_service import position_state_service
+from app.services.shared_cache import shared_cache
+from app.services.user_state_cache import user_state_cache
 
 router = APIRouter()
 limiter = Limiter(key_func=get_remote_address)
 
+def build_user_state_content(address: str, user_state: Dict[str, Any]) -> Dict[str, Any]:
+    # Upstream data is trusted: the UserStateResponse shape is built as a plain dict
+    # and serialized once by orjson instead of being validated and copied by pydantic.
+    margin_summary = user_state.get('marginSummary', {})
+    asset_positions = user_state.get('assetPositions', [])
+
+    return {
+        "address": address,
+        "accountValue": margin_summary.get('accountValue', '0.0'),
+        "totalRawUsd": margin_summary.get('totalRawUsd', '0.0'),
+        "numPositions": len(asset_positions),
+        "marginSummary": margin_summary,
+        "assetPositions": asset_positions,
+        "crossMarginSummary": user_state.get('crossMarginSummary'),
+        "withdrawable": user_state.get('withdrawable'),
+        "realizedPnl": user_state.get('realizedPnl')
+    }
+
+def freshness_headers(age: float, cache_status: Optional[str] = None) -> Optional[Dict[str, str]]:
+    # Cached answers always carry their age; uncached ones only when a stale fallback was served.
+    if cache_status:
+        return {"X-Cache": cache_status, "X-Data-Age": f"{age:.1f}"}
+    return {"X-Data-Age": f"{age:.1f}"} if age > 0 else None
+
+def load_user_state(address: str) -> Tuple[Optional[Dict[str, Any]], float, Optional[str]]:
+    """Returns `(state, age, cache status)`: age is 0 for a live answer, status None when no cache was involved."""
+    user_state = position_state_service.get_snapshot(address)
+    if user_state:
+        return user_state, 0.0, None
+
+    if user_state_cache.enabled:
+        return user_state_cache.get(address)
+
+    # Unwatched addresses: with several workers, a recent upstream answer is shared between them.
+    if not (shared_cache.enabled and settings.USER_STATE_CACHE_TTL > 0):
+        return (*hs.fetch_user_state(address), None)
+
+    key = f"ustate:{address.lower()}"
+    user_state = shared_cache.get_json(key, max_age=settings.USER_STATE_CACHE_TTL)
+    if user_state is not None:
+        return user_state, 0.0, None
+
+    user_state, age = hs.fetch_user_state(address)
+    if user_state and age == 0:
+        shared_cache.put_json(key, user_state)
+    return user_state, age, None
+
 @router.get(
     "/user/{address}",
     response_model=UserStateResponse,
     summary="Récupérer l'état d'un utilisateur",
-    description="Consulte l'état d'un compte (positions, margin, valeur du portefeuille). Endpoint public avec rate limiting."
+    description="Consulte l'état d'un compte (positions, margin, valeur du portefeuille). Endpoint public avec rate limiting. Les adresses surveillées sont servies depuis le moteur d'état en mémoire."
 )
 @limiter.limit("60/minute")
 async def get_user_state_by_address(request: Request, address: str):
     try:
-        user_state = hs.get_user_state(address)
+        # Upstream reads block up to UPSTREAM_INFO_DEADLINE: they run off the event loop.
+        user_state, age, cache_status = await run_in_threadpool(load_user_state, address)
         if not user_state:
             raise HTTPException(status_code=404, detail=f"Impossible de récupérer l'état pour {address}")
-            
-        margin_summary = user_state.get('marginSummary', {})
-        account_value = margin_summary.get('accountValue', '0.0')
-        total_raw_usd = margin_summary.get('totalRawUsd', '0.0')
-        asset_positions = user_state.get('assetPositions', [])
-
-        return UserStateResponse(
-            address=address,
-            accountValue=account_value,
-            totalRawUsd=total_raw_usd,
-            numPositions=len(asset_positions),
-            marginSummary=margin_summary,
-            assetPositions=asset_positions,
-            crossMarginSummary=user_state.get('crossMarginSummary'),
-            withdrawable=user_state.get('withdrawable')
-        )
-    except HTTPException:
+
+        return ORJSONResponse(build_user_state_content(address, user_state), headers=freshness_headers(age, cache_status))
+    except (HTTPException, UpstreamUnavailableError):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur : {str(e)}")
+
+@router.get(
+    "/user/{address}/raw",
+    summary="État brut d'un utilisateur",
+    description="Retourne la réponse clearinghouseState de Hyperliquid telle quelle, sans décodage ni ré-encodage. Endpoint public avec rate limiting."
+)
+@limiter.limit("60/minute")
+async def get_raw_user_state_by_address(request: Request, address: str):
+    try:
+        raw_state, age = await run_in_threadpool(hs.fetch_user_state_raw, address)
+        if not raw_state or raw_state == b"null":
+            raise HTTPException(status_code=404, detail=f"Impossible de récupérer l'état pour {address}")
+
+        return Response(content=raw_state, media_type="application/json", headers=freshness_headers(age))
+    except (HTTPException, UpstreamUnavailableError):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur : {str(e)}")
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Request
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from app.models.schemas import WatchlistUpdateRequest, WatchlistResponse
+from app.services.position_state_service import position_state_service
+from app.services.watchlist_service import watchlist_service
+from app.api.dependencies import APIKeyDep
+
+router = APIRouter()
+limiter = Limiter(key_func=get_remote_address)
+
+@router.get(
+    "/watchlist",
+    response_model=WatchlistResponse,
+    summary="Adresses surveillées",
+    description="Liste des adresses actuellement surveillées par le listener. **Authentification requise via header X-API-Key.**"
+)
+@limiter.limit("60/minute")
+async def get_watchlist(request: Request, api_key: APIKeyDep):
+    return WatchlistResponse(addresses=watchlist_service.get())
+
+@router.post(
+    "/watchlist",
+    response_model=WatchlistResponse,
+    summary="Ajouter des adresses surveillées",
+    description="Ajoute des adresses à la surveillance sans redémarrer le listener. **Authentification requise via header X-API-Key.**"
+)
+@limiter.limit("30/minute")
+async def add_to_watchlist(request: Request, update: WatchlistUpdateRequest, api_key: APIKeyDep):
+    addresses = watchlist_service.add(update.addresses)
+    if position_state_service.running:
+        position_state_service.update_addresses(addresses)
+    return WatchlistResponse(addresses=addresses)
+
+@router.delete(
+    "/watchlist",
+    response_model=WatchlistResponse,
+    summary="Retirer des adresses surveillées",
+    description="Retire des adresses de la surveillance sans redémarrer le listener. **Authentification requise via header X-API-Key.**"
+)
+@limiter.limit("30/minute")
+async def remove_from_watchlist(request: Request, update: WatchlistUpdateRequest, api_key: APIKeyDep):
+    addresses = watchlist_service.remove(update.addresses)
+    if position_state_service.running:
+        position_state_service.update_addresses(addresses)
+    return WatchlistResponse(addresses=addresses)
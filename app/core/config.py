@@ -12,6 +12,7 @@ logger = logging.getLogger(__name__)
 
 class Settings(BaseModel):
     ACCOUNT_ADDRESS: str = Field(default_factory=lambda: os.getenv("ACCOUNT_ADDRESS", ""))
+    HYPERLIQUID_API_URL: str = Field(default_factory=lambda: os.getenv("HYPERLIQUID_API_URL", "https://api.hyperliquid.xyz").rstrip("/"))
 
     USERS_LISTENED: list[str] = Field(default_factory=list)
     
@@ -26,14 +27,77 @@ class Settings(BaseModel):
 
     TELEGRAM_BOT_TOKEN: str = Field(default_factory=lambda: os.getenv("TELEGRAM_BOT_TOKEN", ""))
     TELEGRAM_CHAT_ID: str = Field(default_factory=lambda: os.getenv("TELEGRAM_CHAT_ID", ""))
+    TELEGRAM_API_URL: str = Field(default_factory=lambda: os.getenv("TELEGRAM_API_URL", "https://api.telegram.org").rstrip("/"))
 
     SECRET_KEY: str = Field(default_factory=lambda: os.getenv("SECRET_KEY", ""))
     API_PORT: int = Field(default_factory=lambda: int(os.getenv("API_PORT", "8000")))
     API_HOST: str = Field(default_factory=lambda: os.getenv("API_HOST", "0.0.0.0"))
+    API_WORKERS: int = Field(default_factory=lambda: int(os.getenv("API_WORKERS", "1")))
+    API_BACKLOG: int = Field(default_factory=lambda: int(os.getenv("API_BACKLOG", "2048")))
+    API_KEEPALIVE_TIMEOUT: int = Field(default_factory=lambda: int(os.getenv("API_KEEPALIVE_TIMEOUT", "5")))
+    API_SHUTDOWN_TIMEOUT: int = Field(default_factory=lambda: int(os.getenv("API_SHUTDOWN_TIMEOUT", "30")))
+    API_RUN_DIR: str = Field(default_factory=lambda: os.getenv("API_RUN_DIR", "data/run"))
+    SHARED_CACHE_SLOTS: int = Field(default_factory=lambda: int(os.getenv("SHARED_CACHE_SLOTS", "2048")))
+    SHARED_CACHE_SLOT_SIZE: int = Field(default_factory=lambda: int(os.getenv("SHARED_CACHE_SLOT_SIZE", "65536")))
+    USER_STATE_CACHE_TTL: float = Field(default_factory=lambda: float(os.getenv("USER_STATE_CACHE_TTL", "0")))
+    USER_STATE_SWR_ENABLED: bool = Field(default_factory=lambda: os.getenv("USER_STATE_SWR_ENABLED", "false").lower() in ("true", "1", "yes"))
+    USER_STATE_MAX_STALE: float = Field(default_factory=lambda: float(os.getenv("USER_STATE_MAX_STALE", "30")))
+    USER_STATE_REFRESH_BUDGET: float = Field(default_factory=lambda: float(os.getenv("USER_STATE_REFRESH_BUDGET", "5")))
+    USER_STATE_HOT_KEYS: int = Field(default_factory=lambda: int(os.getenv("USER_STATE_HOT_KEYS", "200")))
+    USER_STATE_HOT_MIN_HITS: float = Field(default_factory=lambda: float(os.getenv("USER_STATE_HOT_MIN_HITS", "2")))
+    USER_STATE_HOT_HALF_LIFE: float = Field(default_factory=lambda: float(os.getenv("USER_STATE_HOT_HALF_LIFE", "60")))
+    USER_STATE_CACHE_MAX_ENTRIES: int = Field(default_factory=lambda: int(os.getenv("USER_STATE_CACHE_MAX_ENTRIES", "4096")))
     
     API_KEY: str = Field(default_factory=lambda: os.getenv("API_KEY", ""))
     ALLOWED_ORIGINS: list[str] = Field(default_factory=list)
     TRADING_ENABLED: bool = Field(default_factory=lambda: os.getenv("TRADING_ENABLED", "true").lower() in ("true", "1", "yes"))
+    ACCOUNTS: dict[str, dict[str, str]] = Field(default_factory=dict)
+    IDEMPOTENCY_TTL: float = Field(default_factory=lambda: float(os.getenv("IDEMPOTENCY_TTL", "86400")))
+    IDEMPOTENCY_MAX_ENTRIES: int = Field(default_factory=lambda: int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000")))
+    SIGNING_PROCESSES: int = Field(default_factory=lambda: int(os.getenv("SIGNING_PROCESSES", "0")))
+    ORDER_SUBMIT_WORKERS: int = Field(default_factory=lambda: int(os.getenv("ORDER_SUBMIT_WORKERS", "4")))
+
+    STATE_ENGINE_ENABLED: bool = Field(default_factory=lambda: os.getenv("STATE_ENGINE_ENABLED", "false").lower() in ("true", "1", "yes"))
+    STATE_ENGINE_USE_WEBDATA: bool = Field(default_factory=lambda: os.getenv("STATE_ENGINE_USE_WEBDATA", "false").lower() in ("true", "1", "yes"))
+    STATE_ENGINE_MAX_STALENESS: float = Field(default_factory=lambda: float(os.getenv("STATE_ENGINE_MAX_STALENESS", "120")))
+    STATE_ENGINE_RECONCILE_INTERVAL: float = Field(default_factory=lambda: float(os.getenv("STATE_ENGINE_RECONCILE_INTERVAL", "60")))
+
+    FILL_STORE_ENABLED: bool = Field(default_factory=lambda: os.getenv("FILL_STORE_ENABLED", "true").lower() in ("true", "1", "yes"))
+    FILL_STORE_PATH: str = Field(default_factory=lambda: os.getenv("FILL_STORE_PATH", "data/fills.db"))
+    FILL_STORE_BATCH_SIZE: int = Field(default_factory=lambda: int(os.getenv("FILL_STORE_BATCH_SIZE", "1000")))
+    FILL_STORE_FLUSH_INTERVAL: float = Field(default_factory=lambda: float(os.getenv("FILL_STORE_FLUSH_INTERVAL", "0.5")))
+
+    WATCHLIST_PATH: str = Field(default_factory=lambda: os.getenv("WATCHLIST_PATH", "data/watchlist.json"))
+    WATCHLIST_WATCH_FILE: bool = Field(default_factory=lambda: os.getenv("WATCHLIST_WATCH_FILE", "true").lower() in ("true", "1", "yes"))
+    WATCHLIST_POLL_INTERVAL: float = Field(default_factory=lambda: float(os.getenv("WATCHLIST_POLL_INTERVAL", "0.1")))
+
+    INFO_PROXY_CACHE_TTLS: dict[str, float] = Field(default_factory=dict)
+    INFO_PROXY_CACHE_MAX_ENTRIES: int = Field(default_factory=lambda: int(os.getenv("INFO_PROXY_CACHE_MAX_ENTRIES", "1024")))
+
+    MARKET_DATA_COINS: list[str] = Field(default_factory=list)
+    MARKET_DATA_MIDS_ENABLED: bool = Field(default_factory=lambda: os.getenv("MARKET_DATA_MIDS_ENABLED", "false").lower() in ("true", "1", "yes"))
+    ALERTS_ENABLED: bool = Field(default_factory=lambda: os.getenv("ALERTS_ENABLED", "false").lower() in ("true", "1", "yes"))
+    ALERT_RULES_PATH: str = Field(default_factory=lambda: os.getenv("ALERT_RULES_PATH", "data/alerts.json"))
+    ALERT_COOLDOWN: float = Field(default_factory=lambda: float(os.getenv("ALERT_COOLDOWN", "300")))
+    PRICES_MAX_WAIT: float = Field(default_factory=lambda: float(os.getenv("PRICES_MAX_WAIT", "30")))
+    AUTO_SLIPPAGE_BUFFER: float = Field(default_factory=lambda: float(os.getenv("AUTO_SLIPPAGE_BUFFER", "0.001")))
+    AUTO_SLIPPAGE_MAX_CHILD_ORDERS: int = Field(default_factory=lambda: int(os.getenv("AUTO_SLIPPAGE_MAX_CHILD_ORDERS", "5")))
+    AUTO_SLIPPAGE_BOOK_TIMEOUT: float = Field(default_factory=lambda: float(os.getenv("AUTO_SLIPPAGE_BOOK_TIMEOUT", "1.0")))
+
+    METADATA_CACHE_PATH: str = Field(default_factory=lambda: os.getenv("METADATA_CACHE_PATH", "data/metadata.json"))
+    METADATA_REFRESH_INTERVAL: float = Field(default_factory=lambda: float(os.getenv("METADATA_REFRESH_INTERVAL", "3600")))
+    METADATA_MAX_AGE: float = Field(default_factory=lambda: float(os.getenv("METADATA_MAX_AGE", "86400")))
+
+    UPSTREAM_INFO_DEADLINE: float = Field(default_factory=lambda: float(os.getenv("UPSTREAM_INFO_DEADLINE", "2.0")))
+    UPSTREAM_HEDGE_ENABLED: bool = Field(default_factory=lambda: os.getenv("UPSTREAM_HEDGE_ENABLED", "true").lower() in ("true", "1", "yes"))
+    UPSTREAM_HEDGE_MIN_DELAY: float = Field(default_factory=lambda: float(os.getenv("UPSTREAM_HEDGE_MIN_DELAY", "0.05")))
+    UPSTREAM_BREAKER_FAILURES: int = Field(default_factory=lambda: int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5")))
+    UPSTREAM_BREAKER_RESET: float = Field(default_factory=lambda: float(os.getenv("UPSTREAM_BREAKER_RESET", "10")))
+    UPSTREAM_STALE_MAX_AGE: float = Field(default_factory=lambda: float(os.getenv("UPSTREAM_STALE_MAX_AGE", "300")))
+    UPSTREAM_MAX_WORKERS: int = Field(default_factory=lambda: int(os.getenv("UPSTREAM_MAX_WORKERS", "32")))
+
+    LISTENER_WORKERS: int = Field(default_factory=lambda: int(os.getenv("LISTENER_WORKERS", "1")))
+    LISTENER_RECORD_PATH: str = Field(default_factory=lambda: os.getenv("LISTENER_RECORD_PATH", ""))
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -50,6 +114,32 @@ class Settings(BaseModel):
         
         self.USERS_LISTENED = [to_checksum_address(addr) for addr in self.USERS_LISTENED]
 
+        raw_accounts = os.getenv("ACCOUNTS", "{}")
+        try:
+            accounts = json.loads(raw_accounts)
+        except Exception as e:
+            raise ConfigurationError("ACCOUNTS", f"Doit être un objet JSON valide, ex: {{\"sub1\": {{\"secret_key\": \"...\"}}}}. Erreur: {e}")
+
+        self.ACCOUNTS = {}
+        for name, account in accounts.items():
+            if not isinstance(account, dict) or not account.get("secret_key"):
+                raise ConfigurationError("ACCOUNTS", f"Le compte '{name}' doit définir 'secret_key'")
+            for key in ("account_address", "vault_address"):
+                if account.get(key):
+                    if not is_address(account[key]):
+                        raise InvalidAddressError(account[key], f"'{key}' du compte '{name}' invalide")
+                    account[key] = to_checksum_address(account[key])
+            self.ACCOUNTS[name] = account
+
+        raw_cache_ttls = os.getenv("INFO_PROXY_CACHE_TTLS", "{}")
+        try:
+            self.INFO_PROXY_CACHE_TTLS = {k: float(v) for k, v in json.loads(raw_cache_ttls).items()}
+        except Exception as e:
+            raise ConfigurationError("INFO_PROXY_CACHE_TTLS", f"Doit être un objet JSON valide, ex: {{\"meta\": 60}}. Erreur: {e}")
+
+        raw_coins = os.getenv("MARKET_DATA_COINS", "")
+        self.MARKET_DATA_COINS = [coin.strip() for coin in raw_coins.split(",") if coin.strip()]
+
         raw_origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:8000")
         self.ALLOWED_ORIGINS = [origin.strip() for origin in raw_origins.split(",") if origin.strip()]
         
@@ -58,7 +148,7 @@ class Settings(BaseModel):
         elif len(self.API_KEY) < 32:
             raise ConfigurationError("API_KEY", "Doit contenir au minimum 32 caractères pour la sécurité")
         
-        if self.TRADING_ENABLED and not self.SECRET_KEY:
+        if self.TRADING_ENABLED and not self.SECRET_KEY and not self.ACCOUNTS:
             raise ConfigurationError("SECRET_KEY", "Doit être défini dans .env lorsque TRADING_ENABLED=true")
         
         if not self.SECRET_KEY:
@@ -13,10 +13,15 @@ from pydantic import ValidationError
 from app.core.exceptions import (
     HyperliquidBotException,
     ExchangeNotConfiguredError,
+    AccountNotFoundError,
+    IdempotencyKeyConflictError,
     InvalidAddressError,
     TradingError,
     ConfigurationError,
-    TelegramNotificationError
+    TelegramNotificationError,
+    InvalidAlertRuleError,
+    AlertRuleNotFoundError,
+    UpstreamUnavailableError
 )
 from app.core.logger import setup_logger
 
@@ -32,9 +37,13 @@ async def hyperliquid_bot_exception_handler(request: Request, exc: HyperliquidBo
     logger.error(f"HyperliquidBotException: {exc.message}", exc_info=True)
     
     # Determine status code based on exception type
-    if isinstance(exc, ExchangeNotConfiguredError):
+    if isinstance(exc, (ExchangeNotConfiguredError, UpstreamUnavailableError)):
         status_code = status.HTTP_503_SERVICE_UNAVAILABLE
-    elif isinstance(exc, (InvalidAddressError, TradingError)):
+    elif isinstance(exc, (AccountNotFoundError, AlertRuleNotFoundError)):
+        status_code = status.HTTP_404_NOT_FOUND
+    elif isinstance(exc, IdempotencyKeyConflictError):
+        status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    elif isinstance(exc, (InvalidAddressError, TradingError, InvalidAlertRuleError)):
         status_code = status.HTTP_400_BAD_REQUEST
     elif isinstance(exc, ConfigurationError):
         status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
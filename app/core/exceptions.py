@@ -22,6 +22,19 @@ class ExchangeNotConfiguredError(HyperliquidBotException):
         super().__init__(self.message)
 
 
+class AccountNotFoundError(HyperliquidBotException):
+    """
+    Raised when a trading request targets an account that is not configured.
+    
+    Accounts are declared through ACCOUNT_ADDRESS/SECRET_KEY (default account)
+    and the ACCOUNTS JSON setting.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.message = f"Compte de trading inconnu: '{name}'"
+        super().__init__(self.message)
+
+
 class InvalidAddressError(HyperliquidBotException):
     """
     Raised when an Ethereum address is invalid.
@@ -51,6 +64,37 @@ class TradingError(HyperliquidBotException):
         super().__init__(self.message)
 
 
+class IdempotencyKeyConflictError(HyperliquidBotException):
+    """
+    Raised when an Idempotency-Key is reused with a different request body.
+    """
+    def __init__(self, key: str):
+        self.key = key
+        self.message = f"Idempotency-Key '{key}' déjà utilisée pour une requête différente"
+        super().__init__(self.message)
+
+
+class IdempotencyKeyInProgressError(HyperliquidBotException):
+    """
+    Raised when a duplicate arrives while the first request with the same
+    Idempotency-Key is still running in another worker, or its outcome is unknown.
+    """
+    def __init__(self):
+        self.message = "Une requête avec cette Idempotency-Key est en cours ou son issue est inconnue"
+        super().__init__(self.message)
+
+
+class IdempotentRequestFailedError(HyperliquidBotException):
+    """
+    Raised for duplicates of a request that failed after its order was submitted:
+    the order may have reached the exchange, so it is not sent again.
+    """
+    def __init__(self, reason: str):
+        self.reason = reason
+        self.message = f"L'ordre associé à cette Idempotency-Key a échoué après son envoi ({reason}). Utilisez une nouvelle clé après avoir vérifié vos positions"
+        super().__init__(self.message)
+
+
 class ConfigurationError(HyperliquidBotException):
     """
     Raised when configuration is invalid or incomplete.
@@ -75,3 +119,35 @@ class TelegramNotificationError(HyperliquidBotException):
         self.reason = reason
         self.message = f"Erreur d'envoi de notification Telegram: {reason}"
         super().__init__(self.message)
+
+
+class InvalidAlertRuleError(HyperliquidBotException):
+    """
+    Raised when an alert rule is incomplete or inconsistent.
+
+    Price rules need a coin, PnL rules need a watched wallet address.
+    """
+    def __init__(self, reason: str):
+        self.reason = reason
+        self.message = f"Règle d'alerte invalide: {reason}"
+        super().__init__(self.message)
+
+
+class AlertRuleNotFoundError(HyperliquidBotException):
+    """Raised when an alert rule id does not exist."""
+    def __init__(self, rule_id: str):
+        self.rule_id = rule_id
+        self.message = f"Règle d'alerte inconnue: '{rule_id}'"
+        super().__init__(self.message)
+
+
+class UpstreamUnavailableError(HyperliquidBotException):
+    """
+    Raised when Hyperliquid did not answer in time, keeps failing, or the circuit
+    breaker is open, and no recent enough value can be served instead.
+    """
+    def __init__(self, operation: str, reason: str):
+        self.operation = operation
+        self.reason = reason
+        self.message = f"Hyperliquid indisponible ({operation}): {reason}"
+        super().__init__(self.message)
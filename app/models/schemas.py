@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal, Union
 from datetime import datetime
 
 class MarginSummary(BaseModel):
@@ -17,6 +17,7 @@ class UserStateResponse(BaseModel):
     assetPositions: List[Dict[str, Any]]
     crossMarginSummary: Optional[Dict[str, Any]] = None
     withdrawable: Optional[str] = None
+    realizedPnl: Optional[str] = None
 
 class ErrorResponse(BaseModel):
     error: str
@@ -26,7 +27,11 @@ class MarketOrderRequest(BaseModel):
     coin: str = Field(..., description="Symbole de la crypto (ex: ASTER, BTC)")
     is_buy: bool = Field(..., description="True pour acheter, False pour vendre")
     size: float = Field(..., gt=0, description="Quantité à trader")
-    slippage: Optional[float] = Field(0.01, description="Slippage autorisé (défaut: 0.01 = 1%)")
+    slippage: Optional[Union[float, Literal["auto"]]] = Field(
+        0.01,
+        description="Slippage autorisé (défaut: 0.01 = 1%), ou 'auto' pour le calculer depuis le carnet local"
+    )
+    account: Optional[str] = Field(None, description="Nom du compte de trading (défaut: compte principal)")
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
@@ -40,6 +45,7 @@ class MarketOrderRequest(BaseModel):
 
 class MarketCloseRequest(BaseModel):
     coin: str = Field(..., description="Symbole de la crypto à fermer")
+    account: Optional[str] = Field(None, description="Nom du compte de trading (défaut: compte principal)")
     model_config = ConfigDict(
         json_schema_extra={
             "example": {"coin": "ASTER"}
@@ -55,6 +61,49 @@ class OrderResponse(BaseModel):
     status: str
     filled_orders: List[OrderFillDetail]
     errors: List[str]
+    expected_slippage: Optional[float] = Field(None, description="Slippage estimé depuis le carnet (mode 'auto')")
+    realized_slippage: Optional[float] = Field(None, description="Slippage réellement obtenu vs le mid (mode 'auto')")
+
+
+class WatchlistUpdateRequest(BaseModel):
+    addresses: List[str] = Field(..., min_length=1, description="Adresses à ajouter ou retirer de la surveillance")
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {"addresses": ["0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"]}
+        }
+    )
+
+class WatchlistResponse(BaseModel):
+    addresses: List[str]
+
+
+# ==================== Alert Models ====================
+
+class AlertRuleRequest(BaseModel):
+    type: Literal["price", "pnl"] = Field(..., description="'price' : prix médian d'un coin, 'pnl' : PnL latent d'un wallet surveillé")
+    op: Literal["above", "below"] = Field(..., description="Déclenche quand la valeur passe au-dessus (>=) ou en dessous (<) du seuil")
+    threshold: float = Field(..., description="Seuil en USD")
+    coin: Optional[str] = Field(None, description="Coin surveillé (règles 'price')")
+    user: Optional[str] = Field(None, description="Adresse du wallet (règles 'pnl')")
+    label: Optional[str] = Field(None, max_length=200, description="Texte ajouté à la notification")
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {"type": "price", "coin": "BTC", "op": "above", "threshold": 100000}
+        }
+    )
+
+class AlertRuleResponse(BaseModel):
+    id: str
+    type: str
+    op: str
+    threshold: float
+    coin: Optional[str] = None
+    user: Optional[str] = None
+    label: Optional[str] = None
+    createdAt: int = Field(..., description="Date de création (ms)")
+
+class AlertRulesResponse(BaseModel):
+    rules: List[AlertRuleResponse]
 
 
 # ==================== Health Check Models ====================
@@ -72,4 +121,74 @@ class HealthResponse(BaseModel):
     exchange: ServiceStatus = Field(..., description="Hyperliquid exchange connection status")
     uptime_seconds: float = Field(..., description="Application uptime in seconds")
     version: str = Field(..., description="Application version")
-    timestamp: str = Field(..., description="Current timestamp (ISO 8601)")
\ No newline at end of file
+    timestamp: str = Field(..., description="Current timestamp (ISO 8601)")
+
+# ==================== Analytics Models ====================
+
+class CoinVolume(BaseModel):
+    """Aggregated activity of a wallet on one coin."""
+    fills: int = Field(..., description="Nombre de fills")
+    size: float = Field(..., description="Volume cumulé en unités du coin")
+    notional: float = Field(..., description="Volume cumulé en USD")
+    realizedPnl: float = Field(..., description="PnL réalisé cumulé")
+
+
+class PnlPoint(BaseModel):
+    """One bucket of the realized PnL curve."""
+    time: int = Field(..., description="Début du bucket (timestamp ms)")
+    pnl: float = Field(..., description="PnL réalisé net des frais sur le bucket")
+    cumulativePnl: float = Field(..., description="PnL réalisé net cumulé")
+
+
+class WalletAnalyticsResponse(BaseModel):
+    """Rolling statistics of a wallet computed from its fill history."""
+    address: str
+    resolution: str = Field(..., description="Taille des buckets: '1m', '1h' ou '1d'")
+    start: Optional[int] = None
+    end: Optional[int] = None
+    totalFills: int
+    totalNotional: float
+    realizedPnl: float
+    fees: float
+    winRate: Optional[float] = Field(None, description="Part des fills de clôture gagnants")
+    avgHoldTimeSeconds: Optional[float] = Field(None, description="Durée moyenne de détention d'une position")
+    tradesPerHour: Optional[float] = Field(None, description="Fréquence de trading")
+    volumeByCoin: Dict[str, CoinVolume]
+    pnlCurve: List[PnlPoint]
+
+# ==================== Market Data Models ====================
+
+class BookResponse(BaseModel):
+    """Top of the local L2 book mirror for one coin."""
+    coin: str
+    time: int = Field(..., description="Timestamp Hyperliquid du dernier carnet reçu (ms)")
+    mid: Optional[float] = Field(None, description="Prix médian entre meilleur bid et meilleur ask")
+    bids: List[List[float]] = Field(..., description="Niveaux [prix, taille], meilleur bid en premier")
+    asks: List[List[float]] = Field(..., description="Niveaux [prix, taille], meilleur ask en premier")
+
+
+class PricesResponse(BaseModel):
+    """Mid prices of every coin from the allMids feed."""
+    time: int = Field(..., description="Timestamp de la dernière mise à jour des prix (ms)")
+    mids: Dict[str, float] = Field(..., description="Prix médian par coin")
+
+
+class PriceResponse(BaseModel):
+    """Mid price of one coin from the allMids feed."""
+    coin: str
+    mid: float = Field(..., description="Prix médian")
+    time: int = Field(..., description="Timestamp de la dernière mise à jour des prix (ms)")
+
+
+class QuoteResponse(BaseModel):
+    """Estimated execution of an aggressive order against the local book."""
+    coin: str
+    side: str = Field(..., description="'buy' ou 'sell'")
+    size: float = Field(..., description="Taille demandée")
+    filledSize: float = Field(..., description="Taille exécutable sur la profondeur visible")
+    fullyFilled: bool = Field(..., description="False si la profondeur visible ne couvre pas la taille demandée")
+    mid: float
+    vwap: float = Field(..., description="Prix moyen pondéré estimé")
+    worstPx: float = Field(..., description="Dernier niveau de prix touché")
+    slippage: float = Field(..., description="Écart relatif du VWAP au mid (0.01 = 1%)")
+    time: int = Field(..., description="Timestamp Hyperliquid du carnet utilisé (ms)")
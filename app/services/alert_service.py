@@ -0,0 +1,321 @@
+import bisect
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from eth_utils import is_address, to_checksum_address
+
+from app.core.config import settings
+from app.core.exceptions import AlertRuleNotFoundError, InvalidAddressError, InvalidAlertRuleError
+from app.core.logger import setup_logger
+from app.services.file_lock import locked_file
+from app.services.market_data_service import market_data_service
+from app.services.position_state_service import position_state_service
+from app.services.telegram_service import TelegramService
+from app.services.watchlist_service import WatchlistService, watchlist_service
+
+logger = setup_logger(__name__)
+
+RULE_TYPES = ("price", "pnl")
+RULE_OPS = ("above", "below")
+RULES_POLL_INTERVAL = 0.5
+
+
+class AlertRuleStore:
+    """
+    Alert rules persisted as a JSON file, written atomically by the API.
+
+    Like the watchlist, the file is the hand-off between API workers and the
+    process running the engine, which reloads it when its modification time changes.
+    Updates hold an exclusive `flock` on a sibling lock file, so concurrent
+    requests on different workers never lose each other's rules.
+    PnL rules are only accepted for addresses of the state engine's watch list.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.ALERT_RULES_PATH,
+        watchlist: WatchlistService = watchlist_service,
+        state_engine_enabled: bool = settings.STATE_ENGINE_ENABLED,
+    ):
+        self.path = path
+        self.watchlist = watchlist
+        self.state_engine_enabled = state_engine_enabled
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+
+    def list(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Règles d'alerte illisibles ({self.path}): {e}")
+            return []
+
+    def add(self, rule: Dict[str, Any]) -> Dict[str, Any]:
+        rule = self._validate(rule)
+        rule["id"] = uuid.uuid4().hex[:12]
+        rule["createdAt"] = int(time.time() * 1000)
+        with locked_file(self.path, self._lock):
+            rules = self.list()
+            rules.append(rule)
+            self._write(rules)
+        return rule
+
+    def remove(self, rule_id: str):
+        with locked_file(self.path, self._lock):
+            rules = self.list()
+            remaining = [rule for rule in rules if rule["id"] != rule_id]
+            if len(remaining) == len(rules):
+                raise AlertRuleNotFoundError(rule_id)
+            self._write(remaining)
+
+    def has_changed(self) -> bool:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        return True
+
+    def _validate(self, rule: Dict[str, Any]) -> Dict[str, Any]:
+        if rule.get("type") not in RULE_TYPES:
+            raise InvalidAlertRuleError(f"'type' doit valoir {' ou '.join(RULE_TYPES)}")
+        if rule.get("op") not in RULE_OPS:
+            raise InvalidAlertRuleError(f"'op' doit valoir {' ou '.join(RULE_OPS)}")
+
+        if rule["type"] == "price":
+            if not rule.get("coin"):
+                raise InvalidAlertRuleError("'coin' est requis pour une règle de prix")
+            rule["user"] = None
+        else:
+            user = rule.get("user")
+            if not user or not is_address(user):
+                raise InvalidAddressError(user or "", "'user' doit être l'adresse surveillée par la règle de PnL")
+            if not self.state_engine_enabled:
+                raise InvalidAlertRuleError("Les règles de PnL nécessitent le moteur d'état (STATE_ENGINE_ENABLED)")
+            if user.lower() not in {addr.lower() for addr in self.watchlist.get()}:
+                raise InvalidAlertRuleError(f"L'adresse {user} n'est pas suivie par le moteur d'état (watchlist)")
+            rule["user"] = to_checksum_address(user)
+            rule["coin"] = None
+        return rule
+
+    def _write(self, rules: List[Dict[str, Any]]):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(rules, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class ThresholdIndex:
+    """
+    Rules watching one series (a coin's mid or a wallet's PnL), sorted by threshold.
+
+    When the series moves from `old` to `new`, the rules it crossed are found by
+    bisection: evaluation cost depends on the rules triggered, not on the rules stored.
+    """
+
+    def __init__(self):
+        self.above: Tuple[List[float], List[Dict[str, Any]]] = ([], [])
+        self.below: Tuple[List[float], List[Dict[str, Any]]] = ([], [])
+
+    def add(self, rule: Dict[str, Any]):
+        thresholds, rules = self.above if rule["op"] == "above" else self.below
+        i = bisect.bisect_right(thresholds, rule["threshold"])
+        thresholds.insert(i, rule["threshold"])
+        rules.insert(i, rule)
+
+    def crossed(self, old: Optional[float], new: float) -> List[Dict[str, Any]]:
+        """Rules whose condition became true between `old` and `new` (all true ones if `old` is None)."""
+        above_thresholds, above_rules = self.above
+        below_thresholds, below_rules = self.below
+        # 'above' holds for value >= threshold, 'below' for value < threshold.
+        if old is None:
+            return above_rules[:bisect.bisect_right(above_thresholds, new)] + below_rules[bisect.bisect_right(below_thresholds, new):]
+        if new > old:
+            return above_rules[bisect.bisect_right(above_thresholds, old):bisect.bisect_right(above_thresholds, new)]
+        if new < old:
+            return below_rules[bisect.bisect_right(below_thresholds, new):bisect.bisect_right(below_thresholds, old)]
+        return []
+
+
+class AlertEngine:
+    """
+    Evaluates the alert rules against the live allMids and position state streams.
+
+    Price rules are indexed by coin and PnL rules by wallet, so a tick only looks at
+    the indexes of the coins whose mid changed (and the wallets holding them).
+    A rule fires when its condition becomes true, at most once per `cooldown`
+    seconds, and the alert is sent to Telegram from a background thread.
+    The first value seen for a series after a (re)start only seeds it: rules
+    already true then are not fired again on every restart or leader failover.
+    """
+
+    def __init__(self, store: AlertRuleStore, cooldown: float = settings.ALERT_COOLDOWN):
+        self.store = store
+        self.cooldown = cooldown
+        self.telegram_service = TelegramService()
+
+        self.price_rules: Dict[str, ThresholdIndex] = {}
+        self.pnl_rules: Dict[str, ThresholdIndex] = {}
+        self.mids: Dict[str, float] = {}
+        self.pnls: Dict[str, float] = {}
+        self.positions: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        self.coin_users: Dict[str, set] = {}
+        self.last_fired: Dict[str, float] = {}
+        self.alert_queue: "queue.Queue[Tuple[Dict[str, Any], float]]" = queue.Queue()
+        self.running = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.store.has_changed()
+        self.load(self.store.list())
+
+        market_data_service.mids_listeners.append(self.on_mids)
+        position_state_service.listeners.append(self.on_state_changed)
+        threading.Thread(target=self._rules_monitor, daemon=True).start()
+        threading.Thread(target=self._sender, daemon=True).start()
+        logger.info(f"✓ Moteur d'alertes actif ({len(self.store.list())} règle(s))")
+
+    def stop(self):
+        self.running = False
+        if self.on_mids in market_data_service.mids_listeners:
+            market_data_service.mids_listeners.remove(self.on_mids)
+        if self.on_state_changed in position_state_service.listeners:
+            position_state_service.listeners.remove(self.on_state_changed)
+
+    def load(self, rules: List[Dict[str, Any]]):
+        price_rules: Dict[str, ThresholdIndex] = {}
+        pnl_rules: Dict[str, ThresholdIndex] = {}
+        for rule in rules:
+            if rule["type"] == "price":
+                price_rules.setdefault(rule["coin"], ThresholdIndex()).add(rule)
+            else:
+                pnl_rules.setdefault(rule["user"].lower(), ThresholdIndex()).add(rule)
+
+        with self._lock:
+            known = {rule["id"] for index in (*self.price_rules.values(), *self.pnl_rules.values())
+                     for side in (index.above, index.below) for rule in side[1]}
+            self.price_rules = price_rules
+            self.pnl_rules = pnl_rules
+            self.pnls = {user: pnl for user, pnl in self.pnls.items() if user in pnl_rules}
+            for user in set(self.positions) - set(pnl_rules):
+                self._set_positions(user, {})
+                del self.positions[user]
+
+            # New rules whose condition already holds fire once on load.
+            fired = []
+            for coin, index in price_rules.items():
+                if coin in self.mids:
+                    fired += [(rule, self.mids[coin]) for rule in index.crossed(None, self.mids[coin]) if rule["id"] not in known]
+            for user, index in pnl_rules.items():
+                if user in self.pnls:
+                    fired += [(rule, self.pnls[user]) for rule in index.crossed(None, self.pnls[user]) if rule["id"] not in known]
+        self._fire(fired)
+
+        for user in pnl_rules:
+            self.on_state_changed(user)
+
+    def on_mids(self, mids: Dict[str, str]):
+        fired = []
+        with self._lock:
+            changed_users = set()
+            for coin in self.price_rules.keys() | self.coin_users.keys():
+                px = mids.get(coin)
+                if px is None:
+                    continue
+                new = float(px)
+                old = self.mids.get(coin)
+                if new == old:
+                    continue
+                self.mids[coin] = new
+                index = self.price_rules.get(coin)
+                if index and old is not None:
+                    fired += [(rule, new) for rule in index.crossed(old, new)]
+                changed_users |= self.coin_users.get(coin, set())
+
+            for user in changed_users:
+                fired += self._evaluate_pnl(user)
+        self._fire(fired)
+
+    def on_state_changed(self, address: str):
+        user = address.lower()
+        if user not in self.pnl_rules:
+            return
+        positions = position_state_service.get_positions(address)
+        if positions is None:
+            return
+        with self._lock:
+            self._set_positions(user, positions)
+            fired = self._evaluate_pnl(user)
+        self._fire(fired)
+
+    def _set_positions(self, user: str, positions: Dict[str, Tuple[float, float]]):
+        # Positions only change on fills: they are kept here so that ticks do not go through the state engine.
+        for coin in self.positions.get(user, {}).keys() - positions.keys():
+            self.coin_users[coin].discard(user)
+            if not self.coin_users[coin]:
+                del self.coin_users[coin]
+        for coin in positions:
+            self.coin_users.setdefault(coin, set()).add(user)
+        self.positions[user] = positions
+
+    def _evaluate_pnl(self, user: str) -> List[Tuple[Dict[str, Any], float]]:
+        index = self.pnl_rules.get(user)
+        positions = self.positions.get(user)
+        if index is None or positions is None:
+            return []
+
+        pnl = 0.0
+        for coin, (szi, entry) in positions.items():
+            mid = self.mids.get(coin)
+            if mid is not None:
+                pnl += szi * (mid - entry)
+
+        old = self.pnls.get(user)
+        self.pnls[user] = pnl
+        if old is None:
+            return []
+        return [(rule, pnl) for rule in index.crossed(old, pnl)]
+
+    def _fire(self, fired: List[Tuple[Dict[str, Any], float]]):
+        now = time.time()
+        for rule, value in fired:
+            if now - self.last_fired.get(rule["id"], 0.0) < self.cooldown:
+                continue
+            self.last_fired[rule["id"]] = now
+            logger.debug(f"[!] Alerte {rule['id']} déclenchée ({rule['type']} {rule['op']} {rule['threshold']}): {value}")
+            self.alert_queue.put((rule, value))
+
+    def _rules_monitor(self):
+        while self.running:
+            time.sleep(RULES_POLL_INTERVAL)
+            if self.store.has_changed():
+                self.load(self.store.list())
+
+    def _sender(self):
+        while self.running:
+            try:
+                rule, value = self.alert_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                self.telegram_service.send_rule_alert(rule, value)
+            except Exception as e:
+                logger.error(f"Envoi de l'alerte {rule['id']} impossible: {e}")
+
+
+alert_rule_store = AlertRuleStore()
+alert_engine = AlertEngine(alert_rule_store)
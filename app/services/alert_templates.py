@@ -0,0 +1,128 @@
+import html
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Localized fragments, resolved once per distinct value by the cached helpers below.
+STRINGS = {
+    "side_buy": "🟢 <b>ACHAT (Long/Buy)</b>",
+    "side_sell": "🔴 <b>VENTE (Short/Sell)</b>",
+    "above": "au-dessus de",
+    "below": "sous",
+    "no_address": "N/A",
+}
+
+TEMPLATE_SOURCES = {
+    ("fill", "full"): (
+        "{header} | {coin}\n"
+        "👤 <code>{short_addr}</code>\n"
+        "💰 Prix : <b>{px} $</b>\n"
+        "📊 Taille : {sz}\n"
+        "💵 PnL réalisé : {closed_pnl} $"
+    ),
+    ("fill", "compact"): "{header} | {coin} {sz} @ {px} $ | <code>{short_addr}</code> | PnL {closed_pnl} $",
+    ("fill", "log"): "[!] Trade détecté pour {user_prefix}... | {side} {coin} | Prix: {px} | Taille: {sz}",
+    ("price", "full"): (
+        "🔔 <b>ALERTE PRIX</b> | {coin}\n"
+        "{icon} Prix médian {direction} {threshold} $\n"
+        "💰 Prix : <b>{value} $</b>"
+        "{label}"
+    ),
+    ("price", "compact"): "🔔 {coin} {direction} {threshold} $ : {value} ${label}",
+    ("pnl", "full"): (
+        "🔔 <b>ALERTE PnL</b>\n"
+        "👤 <code>{short_addr}</code>\n"
+        "{icon} PnL latent {direction} {threshold} $\n"
+        "💵 PnL latent : <b>{value} $</b>"
+        "{label}"
+    ),
+    ("pnl", "compact"): "🔔 PnL <code>{short_addr}</code> {direction} {threshold} $ : {value} ${label}",
+}
+
+
+class Template:
+    """A format string split once into literal chunks and field names."""
+
+    __slots__ = ("source", "parts")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.parts: Tuple[Tuple[str, Optional[str]], ...] = tuple(
+            (literal, field) for literal, field, _, _ in Formatter().parse(source)
+        )
+
+    def render(self, values: Dict[str, str]) -> str:
+        chunks: List[str] = []
+        for literal, field in self.parts:
+            chunks.append(literal)
+            if field is not None:
+                chunks.append(values[field])
+        return "".join(chunks)
+
+
+TEMPLATES = {key: Template(source) for key, source in TEMPLATE_SOURCES.items()}
+TEMPLATE_NAMES = {name for _, name in TEMPLATES}
+
+
+@lru_cache(maxsize=65536)
+def short_addr(address: str) -> str:
+    return f"{address[:6]}...{address[-4:]}" if address else STRINGS["no_address"]
+
+
+@lru_cache(maxsize=64)
+def side_header(side: str) -> str:
+    if side == "B":
+        return STRINGS["side_buy"]
+    if side == "A":
+        return STRINGS["side_sell"]
+    return f"⚪ <b>{side}</b>"
+
+
+class Alert:
+    """
+    Values of one event (a fill or a triggered rule), rendered at most once per
+    template however many destinations use it.
+    """
+
+    __slots__ = ("kind", "values", "_texts")
+
+    def __init__(self, kind: str, values: Dict[str, str]):
+        self.kind = kind
+        self.values = values
+        self._texts: Dict[str, str] = {}
+
+    def text(self, template: str = "full") -> str:
+        text = self._texts.get(template)
+        if text is None:
+            text = self._texts[template] = TEMPLATES[(self.kind, template)].render(self.values)
+        return text
+
+
+def fill_alert(fill: Dict[str, Any], user_addr: str) -> Alert:
+    side = fill.get('side', '')
+    user_addr = user_addr or ""
+    return Alert("fill", {
+        "header": side_header(side),
+        "side": side,
+        "coin": str(fill.get('coin', 'UNKNOWN')),
+        "px": str(fill.get('px', '?')),
+        "sz": str(fill.get('sz', '?')),
+        "closed_pnl": str(fill.get('closedPnl', '0.0')),
+        "short_addr": short_addr(user_addr),
+        "user_prefix": user_addr[:8],
+    })
+
+
+def rule_alert(rule: Dict[str, Any], value: float) -> Alert:
+    kind = "pnl" if rule.get('type') == 'pnl' else "price"
+    op = rule.get('op')
+    # Coin and label come from API clients and are sent with parse_mode HTML.
+    return Alert(kind, {
+        "coin": html.escape(str(rule.get('coin'))),
+        "short_addr": short_addr(rule.get('user') or ""),
+        "icon": "📈" if op == 'above' else "📉",
+        "direction": STRINGS["above"] if op == 'above' else STRINGS["below"],
+        "threshold": str(rule.get('threshold')),
+        "value": f"{value:.2f}" if kind == "pnl" else str(value),
+        "label": f"\n📝 {html.escape(rule['label'])}" if rule.get('label') else "",
+    })
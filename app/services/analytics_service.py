@@ -0,0 +1,102 @@
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from app.core.logger import setup_logger
+from app.services.fill_store_service import FillStore, fill_store, ROLLUP_RESOLUTIONS
+
+logger = setup_logger(__name__)
+
+MS_PER_HOUR = 3_600_000
+
+
+class AnalyticsService:
+    """
+    Per-wallet statistics computed from the pre-aggregated fill rollups.
+
+    Rollups are maintained by the fill store at ingest time, so a query only
+    reads one row per (coin, bucket) and aggregates them with NumPy.
+    """
+
+    def __init__(self, store: FillStore):
+        self.store = store
+
+    def get_wallet_analytics(
+        self,
+        address: str,
+        resolution: str = "1h",
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        resolution_ms = ROLLUP_RESOLUTIONS[resolution]
+        rows = self.store.query_rollups(address, resolution_ms, start_time, end_time)
+
+        result: Dict[str, Any] = {
+            "address": address,
+            "resolution": resolution,
+            "start": start_time,
+            "end": end_time,
+            "totalFills": 0,
+            "totalNotional": 0.0,
+            "realizedPnl": 0.0,
+            "fees": 0.0,
+            "winRate": None,
+            "avgHoldTimeSeconds": None,
+            "tradesPerHour": None,
+            "volumeByCoin": {},
+            "pnlCurve": [],
+        }
+        if not rows:
+            return result
+
+        coins = np.array([row[0] for row in rows])
+        columns = np.array([row[1:] for row in rows], dtype=np.float64)
+        buckets = columns[:, 0].astype(np.int64)
+        n_fills, size, notional, realized_pnl, fees, n_closing, n_wins, hold_count, hold_ms = columns[:, 1:].T
+
+        # Volume per coin
+        coin_names, coin_index = np.unique(coins, return_inverse=True)
+        coin_fills = np.bincount(coin_index, weights=n_fills)
+        coin_size = np.bincount(coin_index, weights=size)
+        coin_notional = np.bincount(coin_index, weights=notional)
+        coin_pnl = np.bincount(coin_index, weights=realized_pnl)
+        result["volumeByCoin"] = {
+            str(coin): {
+                "fills": int(coin_fills[i]),
+                "size": float(coin_size[i]),
+                "notional": float(coin_notional[i]),
+                "realizedPnl": float(coin_pnl[i]),
+            }
+            for i, coin in enumerate(coin_names)
+        }
+
+        # Realized PnL curve, net of fees, one point per bucket
+        bucket_times, bucket_index = np.unique(buckets, return_inverse=True)
+        bucket_pnl = np.bincount(bucket_index, weights=realized_pnl - fees)
+        cumulative_pnl = np.cumsum(bucket_pnl)
+        result["pnlCurve"] = [
+            {"time": int(t), "pnl": float(p), "cumulativePnl": float(c)}
+            for t, p, c in zip(bucket_times, bucket_pnl, cumulative_pnl)
+        ]
+
+        total_fills = n_fills.sum()
+        total_closing = n_closing.sum()
+        total_holds = hold_count.sum()
+
+        first_bucket = start_time if start_time is not None else int(bucket_times[0])
+        last_bucket = end_time if end_time is not None else int(bucket_times[-1]) + resolution_ms
+        span_hours = max(last_bucket - first_bucket, resolution_ms) / MS_PER_HOUR
+
+        result.update({
+            "totalFills": int(total_fills),
+            "totalNotional": float(notional.sum()),
+            "realizedPnl": float(realized_pnl.sum()),
+            "fees": float(fees.sum()),
+            "winRate": float(n_wins.sum() / total_closing) if total_closing else None,
+            "avgHoldTimeSeconds": float(hold_ms.sum() / total_holds / 1000) if total_holds else None,
+            "tradesPerHour": float(total_fills / span_hours),
+        })
+        return result
+
+
+analytics_service = AnalyticsService(fill_store)
@@ -0,0 +1,22 @@
+import fcntl
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def locked_file(path: str, lock: threading.Lock) -> Iterator[None]:
+    """
+    Exclusive access to `path` for a read-modify-write, across threads (`lock`)
+    and processes (`fcntl.flock` on `{path}.lock`).
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with lock, open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
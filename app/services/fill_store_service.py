@@ -0,0 +1,384 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+
+from app.core.config import settings
+from app.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+FILL_COLUMNS = (
+    "user", "coin", "time", "px", "sz", "side", "dir", "closed_pnl",
+    "fee", "start_position", "oid", "tid", "hash", "crossed"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fills (
+    user TEXT NOT NULL,
+    coin TEXT NOT NULL,
+    time INTEGER NOT NULL,
+    px REAL NOT NULL,
+    sz REAL NOT NULL,
+    side TEXT NOT NULL,
+    dir TEXT,
+    closed_pnl REAL NOT NULL DEFAULT 0,
+    fee REAL NOT NULL DEFAULT 0,
+    start_position REAL,
+    oid INTEGER,
+    tid INTEGER,
+    hash TEXT,
+    crossed INTEGER
+);
+CREATE UNIQUE INDEX IF NOT EXISTS fills_user_tid ON fills (user, tid);
+CREATE INDEX IF NOT EXISTS fills_user_time ON fills (user, time);
+CREATE INDEX IF NOT EXISTS fills_coin_time ON fills (coin, time);
+CREATE INDEX IF NOT EXISTS fills_time ON fills (time);
+CREATE TABLE IF NOT EXISTS fill_rollups (
+    user TEXT NOT NULL,
+    coin TEXT NOT NULL,
+    resolution INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    n_fills INTEGER NOT NULL DEFAULT 0,
+    size REAL NOT NULL DEFAULT 0,
+    notional REAL NOT NULL DEFAULT 0,
+    realized_pnl REAL NOT NULL DEFAULT 0,
+    fees REAL NOT NULL DEFAULT 0,
+    n_closing INTEGER NOT NULL DEFAULT 0,
+    n_wins INTEGER NOT NULL DEFAULT 0,
+    hold_count INTEGER NOT NULL DEFAULT 0,
+    hold_ms REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (user, resolution, bucket, coin)
+);
+"""
+
+# Rollup bucket sizes in milliseconds.
+ROLLUP_RESOLUTIONS = {
+    "1m": 60_000,
+    "1h": 3_600_000,
+    "1d": 86_400_000,
+}
+
+ROLLUP_COLUMNS = (
+    "coin", "bucket", "n_fills", "size", "notional", "realized_pnl",
+    "fees", "n_closing", "n_wins", "hold_count", "hold_ms"
+)
+
+UPSERT_ROLLUP = """
+INSERT INTO fill_rollups (
+    user, coin, resolution, bucket, n_fills, size, notional,
+    realized_pnl, fees, n_closing, n_wins, hold_count, hold_ms
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (user, resolution, bucket, coin) DO UPDATE SET
+    n_fills = n_fills + excluded.n_fills,
+    size = size + excluded.size,
+    notional = notional + excluded.notional,
+    realized_pnl = realized_pnl + excluded.realized_pnl,
+    fees = fees + excluded.fees,
+    n_closing = n_closing + excluded.n_closing,
+    n_wins = n_wins + excluded.n_wins,
+    hold_count = hold_count + excluded.hold_count,
+    hold_ms = hold_ms + excluded.hold_ms
+"""
+
+SELECT_OPEN_TIME = """
+SELECT time FROM fills
+WHERE user = ? AND coin = ? AND start_position = 0 AND time <= ?
+ORDER BY time DESC LIMIT 1
+"""
+
+INSERT_FILL = (
+    f"INSERT OR IGNORE INTO fills ({', '.join(FILL_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in FILL_COLUMNS)})"
+)
+
+
+# Seconds a writer waits for the write lock held by another listener worker.
+WRITE_LOCK_TIMEOUT = 30.0
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def fill_to_row(user: str, fill: Dict[str, Any]) -> Tuple:
+    start_position = fill.get("startPosition")
+    fill_time = fill.get("time")
+    return (
+        user.lower(),
+        fill.get("coin", "UNKNOWN"),
+        int(fill_time) if fill_time is not None else int(time.time() * 1000),
+        _to_float(fill.get("px")),
+        _to_float(fill.get("sz")),
+        fill.get("side", ""),
+        fill.get("dir"),
+        _to_float(fill.get("closedPnl")),
+        _to_float(fill.get("fee")),
+        _to_float(start_position) if start_position is not None else None,
+        fill.get("oid"),
+        fill.get("tid"),
+        fill.get("hash"),
+        int(bool(fill.get("crossed"))) if "crossed" in fill else None,
+    )
+
+
+def row_to_fill(row: Tuple) -> Dict[str, Any]:
+    (user, coin, fill_time, px, sz, side, direction, closed_pnl,
+     fee, start_position, oid, tid, fill_hash, crossed) = row
+    return {
+        "user": user,
+        "coin": coin,
+        "time": fill_time,
+        "px": px,
+        "sz": sz,
+        "side": side,
+        "dir": direction,
+        "closedPnl": closed_pnl,
+        "fee": fee,
+        "startPosition": start_position,
+        "oid": oid,
+        "tid": tid,
+        "hash": fill_hash,
+        "crossed": None if crossed is None else bool(crossed),
+    }
+
+
+class FillStore:
+    """
+    Append-only local fill history backed by SQLite in WAL mode.
+
+    Writers only enqueue rows: a background thread drains the queue and commits
+    them in batches, so the WebSocket thread never waits on disk I/O.
+    Readers open their own connections and may run from any process.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.FILL_STORE_PATH,
+        batch_size: int = settings.FILL_STORE_BATCH_SIZE,
+        flush_interval: float = settings.FILL_STORE_FLUSH_INTERVAL,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.write_queue: "queue.Queue[Tuple]" = queue.Queue()
+        self.running = False
+        self._writer_thread: Optional[threading.Thread] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Every listener worker writes to the same file: wait for the others' transactions.
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=WRITE_LOCK_TIMEOUT)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self._rebuild_rollups_if_missing(conn)
+        return conn
+
+    def _rebuild_rollups_if_missing(self, conn: sqlite3.Connection):
+        with conn:
+            # Taken before the checks so that two workers starting together do not both rebuild.
+            conn.execute("BEGIN IMMEDIATE")
+            self._rebuild_rollups(conn)
+
+    def _rebuild_rollups(self, conn: sqlite3.Connection):
+        has_fills = conn.execute("SELECT 1 FROM fills LIMIT 1").fetchone()
+        has_rollups = conn.execute("SELECT 1 FROM fill_rollups LIMIT 1").fetchone()
+        if not has_fills or has_rollups:
+            return
+
+        logger.info("Reconstruction des agrégats de fills...")
+        cursor = conn.execute(f"SELECT {', '.join(FILL_COLUMNS)} FROM fills ORDER BY time")
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            self._update_rollups(conn, rows)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._writer_thread = threading.Thread(target=self._writer, daemon=True)
+        self._writer_thread.start()
+        logger.info(f"✓ Stockage des fills actif ({self.path})")
+
+    def stop(self):
+        if not self.running:
+            return
+        self.flush()
+        self.running = False
+        if self._writer_thread:
+            self._writer_thread.join(timeout=5)
+
+    def append(self, user: str, fills: List[Dict[str, Any]]):
+        for fill in fills:
+            self.write_queue.put(fill_to_row(user, fill))
+
+    def flush(self):
+        if self.running and self._writer_thread and self._writer_thread.is_alive():
+            self.write_queue.join()
+
+    def _drain_batch(self) -> List[Tuple]:
+        try:
+            batch = [self.write_queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.write_queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _writer(self):
+        conn = self._connect()
+        try:
+            while self.running:
+                batch = self._drain_batch()
+                if not batch:
+                    continue
+                try:
+                    with conn:
+                        self._write_batch(conn, batch)
+                except Exception as e:
+                    logger.error(f"Erreur d'écriture de {len(batch)} fill(s): {e}", exc_info=True)
+                finally:
+                    for _ in batch:
+                        self.write_queue.task_done()
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Tuple]):
+        # Rollups must only count rows that were actually inserted (not duplicates).
+        # New rows get rowids above the current maximum: the write lock is taken
+        # before reading it so that rows of other workers cannot land in between.
+        conn.execute("BEGIN IMMEDIATE")
+        last_rowid = conn.execute("SELECT coalesce(max(rowid), 0) FROM fills").fetchone()[0]
+        conn.executemany(INSERT_FILL, batch)
+        inserted = conn.execute(
+            f"SELECT {', '.join(FILL_COLUMNS)} FROM fills WHERE rowid > ? ORDER BY rowid", (last_rowid,)
+        ).fetchall()
+        if inserted:
+            self._update_rollups(conn, inserted)
+
+    def _update_rollups(self, conn: sqlite3.Connection, rows: List[Tuple]):
+        buckets: Dict[Tuple, List[float]] = {}
+        for row in rows:
+            (user, coin, fill_time, px, sz, side, _, closed_pnl,
+             fee, start_position, _, _, _, _) = row
+
+            hold_ms = None
+            if start_position:
+                end_position = start_position + (sz if side == "B" else -sz)
+                if abs(end_position) < 1e-9:
+                    opened = conn.execute(SELECT_OPEN_TIME, (user, coin, fill_time)).fetchone()
+                    if opened:
+                        hold_ms = fill_time - opened[0]
+
+            for resolution in ROLLUP_RESOLUTIONS.values():
+                key = (user, coin, resolution, fill_time - fill_time % resolution)
+                agg = buckets.setdefault(key, [0, 0.0, 0.0, 0.0, 0.0, 0, 0, 0, 0.0])
+                agg[0] += 1
+                agg[1] += sz
+                agg[2] += sz * px
+                agg[3] += closed_pnl
+                agg[4] += fee
+                if closed_pnl:
+                    agg[5] += 1
+                    agg[6] += closed_pnl > 0
+                if hold_ms is not None:
+                    agg[7] += 1
+                    agg[8] += hold_ms
+
+        conn.executemany(UPSERT_ROLLUP, [key + tuple(agg) for key, agg in buckets.items()])
+
+    def query(
+        self,
+        user: Optional[str] = None,
+        coin: Optional[str] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return
+
+        clauses = []
+        params: List[Any] = []
+        if user:
+            clauses.append("user = ?")
+            params.append(user.lower())
+        if coin:
+            clauses.append("coin = ?")
+            params.append(coin)
+        if start_time is not None:
+            clauses.append("time >= ?")
+            params.append(start_time)
+        if end_time is not None:
+            clauses.append("time <= ?")
+            params.append(end_time)
+
+        sql = f"SELECT {', '.join(FILL_COLUMNS)} FROM fills"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY time"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        conn = self._connect_readonly()
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row_to_fill(row)
+        finally:
+            conn.close()
+
+    def query_rollups(
+        self,
+        user: str,
+        resolution: int,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> List[Tuple]:
+        if not os.path.exists(self.path):
+            return []
+
+        sql = f"SELECT {', '.join(ROLLUP_COLUMNS)} FROM fill_rollups WHERE user = ? AND resolution = ?"
+        params: List[Any] = [user.lower(), resolution]
+        if start_time is not None:
+            sql += " AND bucket >= ?"
+            params.append(start_time - start_time % resolution)
+        if end_time is not None:
+            sql += " AND bucket <= ?"
+            params.append(end_time)
+        sql += " ORDER BY bucket"
+
+        conn = self._connect_readonly()
+        try:
+            return conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Agrégats de fills indisponibles: {e}")
+            return []
+        finally:
+            conn.close()
+
+    def _connect_readonly(self) -> sqlite3.Connection:
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+
+fill_store = FillStore()
@@ -1,22 +1,146 @@
-from typing import Optional, Dict, Any
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Optional, Dict, Any, Callable, Set, Tuple
+import orjson
+import requests
 from hyperliquid.exchange import Exchange
 from hyperliquid.info import Info
-from hyperliquid.utils import constants
 from eth_account.signers.local import LocalAccount
 import eth_account
 from app.core.config import settings 
 from app.core.logger import setup_logger
-from app.core.exceptions import ExchangeNotConfiguredError, TradingError
+from app.core.exceptions import ExchangeNotConfiguredError, TradingError, AccountNotFoundError, ConfigurationError
 from app.models.schemas import MarketOrderRequest, MarketCloseRequest
+from app.services.market_data_service import OrderBook, market_data_service
+from app.services.nonce_manager import NonceManager, use_nonce_manager
+from app.services.l1_signer import get_signer
+from app.services.metadata_cache import metadata_cache
+from app.services.resilience import TimeoutHTTPAdapter, UpstreamGuard
 
 logger = setup_logger(__name__)
 
+DEFAULT_ACCOUNT = "default"
+
+
+class TradingAccount:
+    """
+    One signing identity of the exchange pool.
+
+    Orders go through the account's submission queue: up to `max_in_flight`
+    orders are signed and sent concurrently, each stamped with a unique nonce
+    from the account's own manager. Different accounts never wait on each other.
+    The `Exchange` (which downloads metadata) is built on first use.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        exchange_factory: Callable[[], Exchange],
+        address: str,
+        max_in_flight: int = settings.ORDER_SUBMIT_WORKERS,
+    ):
+        self.name = name
+        self.address = address
+        self.nonces = NonceManager()
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix=f"orders-{name}")
+        self.pending: Set[Future] = set()
+        self._exchange_factory = exchange_factory
+        self._exchange: Optional[Exchange] = None
+        self._lock = threading.Lock()
+
+    @property
+    def exchange(self) -> Exchange:
+        if self._exchange is None:
+            with self._lock:
+                if self._exchange is None:
+                    self._exchange = self._exchange_factory()
+        return self._exchange
+
+    @property
+    def ready(self) -> bool:
+        return self._exchange is not None
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queue `fn(exchange, *args)` with this account's nonce manager bound to the worker thread."""
+        future = self.executor.submit(self._run, fn, *args)
+        self.pending.add(future)
+        future.add_done_callback(self.pending.discard)
+        return future
+
+    def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with use_nonce_manager(self.nonces):
+            return fn(self.exchange, *args)
+
+
 class HyperliquidService:
+    """
+    Access to the Hyperliquid API for the gateway.
+
+    Construction performs no network I/O: the `Info` client and each account's
+    `Exchange` are created on first use, or ahead of time by `warmup()`.
+    """
+
     def __init__(self):
-        self.exchange_instance: Optional[Exchange] = None
         self.account_address: Optional[str] = None
-        self.info_client = Info(constants.MAINNET_API_URL, skip_ws=True)
+        self.accounts: Dict[str, TradingAccount] = {}
+        self._info_client: Optional[Info] = None
+        self._info_lock = threading.Lock()
+        self.info_guard = UpstreamGuard("info")
         self._setup_exchange()
+        self._setup_accounts()
+
+    @property
+    def info_client(self) -> Info:
+        if self._info_client is None:
+            with self._info_lock:
+                if self._info_client is None:
+                    meta, spot_meta = metadata_cache.get()
+                    info = Info(settings.HYPERLIQUID_API_URL, skip_ws=True, meta=meta, spot_meta=spot_meta)
+                    # Every /info read (including hedged duplicates) gives up once the deadline has passed.
+                    adapter = TimeoutHTTPAdapter(self.info_guard.deadline)
+                    info.session.mount("http://", adapter)
+                    info.session.mount("https://", adapter)
+                    self._info_client = info
+        return self._info_client
+
+    @property
+    def exchange_instance(self) -> Optional[Exchange]:
+        account = self.accounts.get(DEFAULT_ACCOUNT)
+        return account.exchange if account else None
+
+    @property
+    def trading_configured(self) -> bool:
+        return DEFAULT_ACCOUNT in self.accounts
+
+    @property
+    def ready(self) -> bool:
+        """True once metadata has been loaded for the Info client and every account."""
+        return self._info_client is not None and all(account.ready for account in self.accounts.values())
+
+    def warmup(self):
+        """Load metadata for the Info client and every account. Meant to run in the background at startup."""
+        try:
+            self.info_client
+            for account in list(self.accounts.values()):
+                account.exchange
+            logger.info("✓ Métadonnées Hyperliquid chargées")
+        except Exception as e:
+            logger.error(f"Chargement des métadonnées Hyperliquid impossible, nouvel essai à la première requête: {e}")
+
+    def drain(self, timeout: float) -> int:
+        """
+        Stop accepting orders and wait up to `timeout` seconds for the queued and
+        in-flight ones. Returns the number of orders still pending.
+        """
+        pending = [future for account in self.accounts.values() for future in list(account.pending)]
+        if pending:
+            logger.info(f"Attente de {len(pending)} ordre(s) en cours avant l'arrêt...")
+        _, not_done = wait(pending, timeout=timeout)
+        for account in self.accounts.values():
+            account.executor.shutdown(wait=False)
+        if not_done:
+            logger.warning(f"{len(not_done)} ordre(s) toujours en cours après {timeout}s")
+        return len(not_done)
 
     def _setup_exchange(self):
         if not settings.ACCOUNT_ADDRESS or not settings.SECRET_KEY:
@@ -29,22 +153,103 @@ class HyperliquidService:
             address = account.address
             
         self.account_address = address
-        self.exchange_instance = Exchange(
-            account,
-            constants.MAINNET_API_URL,
-            account_address=address
+        self.accounts[DEFAULT_ACCOUNT] = TradingAccount(
+            DEFAULT_ACCOUNT,
+            lambda: self._build_exchange(account, address),
+            address
+        )
+        get_signer(account)
+        logger.info(f"Compte de trading configuré pour l'adresse: {self.account_address}")
+
+    def _setup_accounts(self):
+        for name, config in settings.ACCOUNTS.items():
+            if name in self.accounts:
+                raise ConfigurationError("ACCOUNTS", f"Le compte '{name}' est déjà configuré par ACCOUNT_ADDRESS/SECRET_KEY")
+            wallet: LocalAccount = eth_account.Account.from_key(config["secret_key"])
+            address = config.get("account_address") or wallet.address
+            vault_address = config.get("vault_address")
+            self.accounts[name] = TradingAccount(
+                name,
+                lambda wallet=wallet, address=address, vault_address=vault_address: self._build_exchange(
+                    wallet, address, vault_address
+                ),
+                vault_address or address
+            )
+            get_signer(wallet)
+            logger.info(f"Compte de trading '{name}' configuré: {address}")
+
+    def _build_exchange(self, wallet: LocalAccount, address: str, vault_address: Optional[str] = None) -> Exchange:
+        meta, spot_meta = metadata_cache.get()
+        return Exchange(
+            wallet,
+            settings.HYPERLIQUID_API_URL,
+            meta=meta,
+            vault_address=vault_address,
+            account_address=address,
+            spot_meta=spot_meta
         )
-        logger.info(f"Exchange initialisé pour l'adresse: {self.account_address}")
+
+    def add_account(self, name: str, exchange: Exchange, address: str) -> TradingAccount:
+        account = TradingAccount(name, lambda: exchange, address)
+        self.accounts[name] = account
+        return account
+
+    def get_account(self, name: Optional[str] = None) -> TradingAccount:
+        name = name or DEFAULT_ACCOUNT
+        account = self.accounts.get(name)
+        if account is None:
+            if name == DEFAULT_ACCOUNT:
+                raise ExchangeNotConfiguredError()
+            raise AccountNotFoundError(name)
+        return account
 
     def get_user_state(self, address: str) -> Optional[Dict[str, Any]]:
-        return self.info_client.user_state(address)
+        return self.fetch_user_state(address)[0]
+
+    def fetch_user_state(self, address: str) -> Tuple[Optional[Dict[str, Any]], float]:
+        """User state through the info guard: returns `(state, age)`, age > 0 when a stale value was served."""
+        return self.info_guard.call(("clearinghouseState", address.lower()), self.info_client.user_state, address)
+
+    def get_user_state_raw(self, address: str) -> bytes:
+        return self.fetch_user_state_raw(address)[0]
+
+    def fetch_user_state_raw(self, address: str) -> Tuple[bytes, float]:
+        payload = {"type": "clearinghouseState", "user": address}
+        return self.info_guard.call(("clearinghouseStateRaw", address.lower()), self.post_info_raw, payload)
+
+    def post_info_raw(self, payload: Dict[str, Any]) -> bytes:
+        """POST /info on the pooled session and return the upstream JSON bytes without decoding them."""
+        response = self.info_client.session.post(
+            self.info_client.base_url + "/info",
+            data=orjson.dumps(payload)
+        )
+        self.info_client._handle_exception(response)
+        return response.content
+
+    def open_info_stream(self, body: bytes) -> requests.Response:
+        """POST raw bytes to /info and return the streamed upstream response, left undecoded."""
+        return self.info_client.session.post(
+            self.info_client.base_url + "/info",
+            data=body,
+            stream=True
+        )
+
+    def create_market_order(self, order: MarketOrderRequest, account_name: Optional[str] = None) -> Dict[str, Any]:
+        return self.submit_market_order(order, account_name).result()
+
+    def submit_market_order(self, order: MarketOrderRequest, account_name: Optional[str] = None) -> Future:
+        """Queue the order and return its future. Errors raised here mean nothing was sent."""
+        account = self.get_account(order.account or account_name)
+        if order.slippage == "auto":
+            book = market_data_service.get_book(order.coin)
+            if book is None:
+                raise TradingError("ouverture de position", f"Carnet local indisponible pour {order.coin}, slippage 'auto' impossible")
+            return account.submit(self._create_auto_slippage_order, order, book)
+        return account.submit(self._market_open, order)
 
-    def create_market_order(self, order: MarketOrderRequest) -> Dict[str, Any]:
-        if not self.exchange_instance:
-            raise ExchangeNotConfiguredError()
-        
+    def _market_open(self, exchange: Exchange, order: MarketOrderRequest) -> Dict[str, Any]:
         try:
-            return self.exchange_instance.market_open(
+            return exchange.market_open(
                 order.coin,
                 order.is_buy,
                 order.size,
@@ -54,12 +259,85 @@ class HyperliquidService:
         except Exception as e:
             raise TradingError("ouverture de position", str(e))
 
-    def close_market_position(self, close_request: MarketCloseRequest) -> Dict[str, Any]:
-        if not self.exchange_instance:
-            raise ExchangeNotConfiguredError()
-        
+    def _create_auto_slippage_order(self, exchange: Exchange, order: MarketOrderRequest, book: OrderBook) -> Dict[str, Any]:
+        """
+        Place the order as IOC limits priced at the worst book level needed to fill it.
+
+        Sizes beyond the visible depth are split into child orders, each one sent
+        after the local book has refreshed following the previous fill.
+        """
+        expected = book.quote(order.size, order.is_buy)
+        mid = expected["mid"]
+        statuses = []
+        remaining = order.size
+        filled_size = 0.0
+        filled_notional = 0.0
+
+        for _ in range(settings.AUTO_SLIPPAGE_MAX_CHILD_ORDERS):
+            quote = book.quote(remaining, order.is_buy)
+            child_size = round(min(remaining, quote["filledSize"]), 8) if quote else 0.0
+            if child_size <= 0:
+                break
+
+            book_time = book.time
+            try:
+                result = exchange.market_open(
+                    order.coin,
+                    order.is_buy,
+                    child_size,
+                    quote["worstPx"],
+                    settings.AUTO_SLIPPAGE_BUFFER
+                )
+            except Exception as e:
+                if not statuses:
+                    raise TradingError("ouverture de position", str(e))
+                statuses.append({"error": str(e)})
+                break
+
+            if result["status"] != "ok":
+                if not statuses:
+                    return {**result, "expected_slippage": expected["slippage"], "realized_slippage": None}
+                statuses.append({"error": f"Order failed: {result['status']}"})
+                break
+
+            child_statuses = result.get("response", {}).get("data", {}).get("statuses", [])
+            statuses.extend(child_statuses)
+            child_filled = 0.0
+            for status in child_statuses:
+                if "filled" in status:
+                    size = float(status["filled"]["totalSz"])
+                    child_filled += size
+                    filled_notional += size * float(status["filled"]["avgPx"])
+
+            filled_size += child_filled
+            remaining = round(order.size - filled_size, 8)
+            if child_filled <= 0 or remaining <= 0:
+                break
+            book.wait_for_update(book_time, settings.AUTO_SLIPPAGE_BOOK_TIMEOUT)
+
+        realized = None
+        if filled_size > 0:
+            avg_px = filled_notional / filled_size
+            realized = (avg_px - mid) / mid if order.is_buy else (mid - avg_px) / mid
+
+        return {
+            "status": "ok",
+            "response": {"type": "order", "data": {"statuses": statuses}},
+            "expected_slippage": expected["slippage"],
+            "realized_slippage": realized,
+        }
+
+    def close_market_position(self, close_request: MarketCloseRequest, account_name: Optional[str] = None) -> Dict[str, Any]:
+        return self.submit_market_close(close_request, account_name).result()
+
+    def submit_market_close(self, close_request: MarketCloseRequest, account_name: Optional[str] = None) -> Future:
+        """Queue the close and return its future. Errors raised here mean nothing was sent."""
+        account = self.get_account(close_request.account or account_name)
+        return account.submit(self._market_close, close_request)
+
+    def _market_close(self, exchange: Exchange, close_request: MarketCloseRequest) -> Dict[str, Any]:
         try:
-            return self.exchange_instance.market_close(close_request.coin)
+            return exchange.market_close(close_request.coin)
         except Exception as e:
             raise TradingError("fermeture de position", str(e))
 
@@ -0,0 +1,241 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+from app.core.exceptions import (
+    IdempotencyKeyConflictError,
+    IdempotencyKeyInProgressError,
+    IdempotentRequestFailedError,
+)
+from app.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# How often a duplicate handled by another worker polls for the first call's outcome, and for how long.
+PENDING_POLL_INTERVAL = 0.05
+PENDING_MAX_WAIT = 30.0
+PURGE_INTERVAL = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency (
+    key BLOB PRIMARY KEY,
+    fingerprint BLOB NOT NULL,
+    status TEXT NOT NULL,
+    result BLOB,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_idempotency_expires ON idempotency(expires_at);
+"""
+
+
+class IdempotencyEntry:
+    __slots__ = ("fingerprint", "future", "expires_at")
+
+    def __init__(self, fingerprint: bytes, future: "asyncio.Future[Any]", expires_at: float):
+        self.fingerprint = fingerprint
+        self.future = future
+        self.expires_at = expires_at
+
+
+class SharedIdempotencyTable:
+    """
+    Idempotency claims shared by the API workers of a machine, in a SQLite file.
+
+    `INSERT OR IGNORE` on the key is the cross-process claim: exactly one worker
+    sends the order, the others read its outcome from the row. Unlike the mmap
+    cache, rows are never overwritten by another key.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._purged_at = 0.0
+
+    @staticmethod
+    def _digest(key: str) -> bytes:
+        # Keys embed the API key: only their hash is written to disk.
+        return hashlib.sha256(key.encode()).digest()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def claim(self, key: str, fingerprint: bytes, expires_at: float) -> Optional[Tuple[bytes, str, Optional[bytes]]]:
+        """Returns None if this process now owns the key, else the existing (fingerprint, status, result)."""
+        now = time.time()
+        digest = self._digest(key)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                if now - self._purged_at > PURGE_INTERVAL:
+                    self._purged_at = now
+                    conn.execute("DELETE FROM idempotency WHERE expires_at <= ?", (now,))
+                conn.execute("DELETE FROM idempotency WHERE key = ? AND expires_at <= ?", (digest, now))
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO idempotency (key, fingerprint, status, expires_at) VALUES (?, ?, 'pending', ?)",
+                    (digest, fingerprint, expires_at),
+                ).rowcount
+            if inserted:
+                return None
+            return self._read(conn, digest)
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str, Optional[bytes]]]:
+        with self._lock:
+            return self._read(self._connection(), self._digest(key))
+
+    def complete(self, key: str, status: str, result: bytes):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("UPDATE idempotency SET status = ?, result = ? WHERE key = ?", (status, result, self._digest(key)))
+
+    def release(self, key: str):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM idempotency WHERE key = ?", (self._digest(key),))
+
+    @staticmethod
+    def _read(conn: sqlite3.Connection, digest: bytes) -> Optional[Tuple[bytes, str, Optional[bytes]]]:
+        row = conn.execute("SELECT fingerprint, status, result FROM idempotency WHERE key = ?", (digest,)).fetchone()
+        return (bytes(row[0]), row[1], row[2] and bytes(row[2])) if row else None
+
+
+class IdempotencyStore:
+    """
+    Bounded TTL store of order results keyed by `Idempotency-Key`.
+
+    The first request for a key submits the order; concurrent duplicates await
+    the same future and later duplicates get the stored result until it expires.
+    Once submitted, an order runs to completion even if its client disconnects.
+    Only errors raised before submission (unknown account, missing book...) free
+    the key for a retry: a failure after submission is kept, since the order may
+    have reached the exchange, and duplicates get 409.
+    With several API workers, keys are also claimed in a SQLite table shared by
+    the workers, so a retry reaching another worker is not sent again. Its calls
+    may wait on the SQLite lock: they run in threads, never on the event loop.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.IDEMPOTENCY_TTL,
+        max_entries: int = settings.IDEMPOTENCY_MAX_ENTRIES,
+        shared: Optional[SharedIdempotencyTable] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self._entries: "OrderedDict[str, IdempotencyEntry]" = OrderedDict()
+
+    async def run(self, key: str, fingerprint: bytes, submit: Callable[[], "Future[Any]"]) -> Tuple[Any, bool]:
+        """
+        `submit` queues the order and returns its future without blocking.
+        Returns (result, replayed).
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > now:
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyKeyConflictError(key)
+            return await self._replay(entry.future), True
+
+        if self.shared is not None:
+            existing = await asyncio.to_thread(self.shared.claim, key, fingerprint, time.time() + self.ttl)
+            if existing is not None:
+                return await self._replay_shared(key, fingerprint, existing), True
+
+        try:
+            order_future = submit()
+        except BaseException:
+            # Nothing was sent: the client may retry with the same key.
+            if self.shared is not None:
+                await asyncio.to_thread(self.shared.release, key)
+            raise
+
+        future = asyncio.wrap_future(order_future)
+        future.add_done_callback(lambda done: self._completed(key, done))
+        self._entries[key] = IdempotencyEntry(fingerprint, future, now + self.ttl)
+        self._entries.move_to_end(key)
+        self._evict(now)
+
+        # Shielded: a disconnected client cancels its wait, not the order.
+        return await asyncio.shield(future), False
+
+    async def _replay(self, future: "asyncio.Future[Any]") -> Any:
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            raise IdempotentRequestFailedError(str(e))
+
+    async def _replay_shared(self, key: str, fingerprint: bytes, existing: Tuple[bytes, str, Optional[bytes]]) -> Any:
+        deadline = time.monotonic() + PENDING_MAX_WAIT
+        while True:
+            stored_fingerprint, status, result = existing
+            if stored_fingerprint != fingerprint:
+                raise IdempotencyKeyConflictError(key)
+            if status == "ok":
+                return orjson.loads(result)
+            if status == "failed":
+                raise IdempotentRequestFailedError(orjson.loads(result))
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgressError()
+            await asyncio.sleep(PENDING_POLL_INTERVAL)
+            existing = await asyncio.to_thread(self.shared.get, key)
+            if existing is None:
+                # Freed by a failure before submission or expired: nothing was recorded as sent.
+                raise IdempotencyKeyInProgressError()
+
+    def _completed(self, key: str, future: "asyncio.Future[Any]"):
+        if future.cancelled():
+            error: Optional[BaseException] = asyncio.CancelledError()
+        else:
+            # Marks the exception as retrieved when no duplicate was waiting on it.
+            error = future.exception()
+        if error is not None:
+            logger.warning(f"Ordre idempotent en échec ou d'issue inconnue: {error}")
+        if self.shared is None:
+            return
+        if error is None:
+            outcome = ("ok", orjson.dumps(future.result()))
+        else:
+            outcome = ("failed", orjson.dumps(str(error)))
+        future.get_loop().run_in_executor(None, self._share, key, *outcome)
+
+    def _share(self, key: str, status: str, result: bytes):
+        try:
+            self.shared.complete(key, status, result)
+        except Exception as e:
+            logger.error(f"Résultat idempotent non partagé: {e}")
+
+    def _evict(self, now: float):
+        # Entries are in insertion order with a fixed TTL: expired ones are at the front.
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+
+
+idempotency_store = IdempotencyStore(
+    shared=SharedIdempotencyTable(os.path.join(settings.API_RUN_DIR, "idempotency.db")) if settings.API_WORKERS > 1 else None
+)
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+from app.core.logger import setup_logger
+from app.services.hyperliquid_service import HyperliquidService, hyperliquid_service
+
+logger = setup_logger(__name__)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class InfoProxyService:
+    """
+    Generic pass-through for Hyperliquid /info queries.
+
+    Upstream bytes are streamed back without being decoded. Query types listed
+    in `cache_ttls` are buffered once and kept in a bounded LRU keyed on the
+    canonicalized request body.
+    """
+
+    def __init__(
+        self,
+        service: HyperliquidService,
+        cache_ttls: Dict[str, float] = settings.INFO_PROXY_CACHE_TTLS,
+        max_entries: int = settings.INFO_PROXY_CACHE_MAX_ENTRIES,
+    ):
+        self.service = service
+        self.cache_ttls = cache_ttls
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[bytes, Tuple[float, int, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def canonicalize(payload: Dict[str, Any]) -> bytes:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+
+    def get_cached(self, key: bytes) -> Optional[Tuple[int, bytes]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, status_code, content = entry
+            if time.monotonic() >= expires_at:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return status_code, content
+
+    def _store(self, key: bytes, ttl: float, status_code: int, content: bytes):
+        with self._lock:
+            self._cache[key] = (time.monotonic() + ttl, status_code, content)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def query(self, payload: Dict[str, Any]) -> Tuple[int, Iterator[bytes], bool]:
+        """Returns (status code, body chunks, served from cache)."""
+        body = self.canonicalize(payload)
+        ttl = self.cache_ttls.get(payload.get("type", ""), 0)
+
+        if ttl > 0:
+            cached = self.get_cached(body)
+            if cached is not None:
+                status_code, content = cached
+                return status_code, iter((content,)), True
+
+        response = self.service.open_info_stream(body)
+
+        if ttl > 0 and response.status_code == 200:
+            content = response.content
+            self._store(body, ttl, response.status_code, content)
+            return response.status_code, iter((content,)), False
+
+        return response.status_code, self._iter_response(response), False
+
+    @staticmethod
+    def _iter_response(response) -> Iterator[bytes]:
+        try:
+            yield from response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        finally:
+            response.close()
+
+
+info_proxy_service = InfoProxyService(hyperliquid_service)
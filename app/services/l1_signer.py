@@ -0,0 +1,121 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import msgpack
+import hyperliquid.exchange as hl_exchange
+from eth_account.signers.local import LocalAccount
+from eth_keys import keys
+from eth_utils import keccak, to_hex
+
+from app.core.config import settings
+from app.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# EIP-712 constants of Hyperliquid L1 actions. The domain and the "Agent" type
+# never change, so their hashes are computed once instead of on every order.
+EIP712_DOMAIN_TYPEHASH = keccak(text="EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+AGENT_TYPEHASH = keccak(text="Agent(string source,bytes32 connectionId)")
+DOMAIN_SEPARATOR = keccak(
+    EIP712_DOMAIN_TYPEHASH
+    + keccak(text="Exchange")
+    + keccak(text="1")
+    + (1337).to_bytes(32, "big")
+    + bytes(32)
+)
+SOURCE_HASHES = {True: keccak(text="a"), False: keccak(text="b")}
+
+# (action, active_pool, nonce, is_mainnet)
+SignRequest = Tuple[Dict[str, Any], Optional[str], int, bool]
+
+
+def l1_action_digest(action: Dict[str, Any], active_pool: Optional[str], nonce: int, is_mainnet: bool) -> bytes:
+    """EIP-712 digest signed for an L1 action, identical to the SDK's `sign_l1_action` input."""
+    data = msgpack.packb(action) + nonce.to_bytes(8, "big")
+    if active_pool is None:
+        data += b"\x00"
+    else:
+        data += b"\x01" + bytes.fromhex(active_pool[2:] if active_pool.startswith("0x") else active_pool)
+    connection_id = keccak(data)
+    struct_hash = keccak(AGENT_TYPEHASH + SOURCE_HASHES[is_mainnet] + connection_id)
+    return keccak(b"\x19\x01" + DOMAIN_SEPARATOR + struct_hash)
+
+
+def _sign_digest(private_key: keys.PrivateKey, digest: bytes) -> Dict[str, Any]:
+    signature = private_key.sign_msg_hash(digest)
+    return {"r": to_hex(signature.r), "s": to_hex(signature.s), "v": signature.v + 27}
+
+
+# Key of the signing worker process, loaded once by the pool initializer.
+_worker_key: Optional[keys.PrivateKey] = None
+
+
+def _init_worker(key_bytes: bytes):
+    global _worker_key
+    _worker_key = keys.PrivateKey(key_bytes)
+
+
+def _sign_in_worker(request: SignRequest) -> Dict[str, Any]:
+    return _sign_digest(_worker_key, l1_action_digest(*request))
+
+
+class L1Signer:
+    """
+    Signs Hyperliquid L1 actions for one wallet without rebuilding the EIP-712 payload.
+
+    Produces the same signatures as the SDK's `sign_l1_action`. With `processes > 0`,
+    hashing and ECDSA run in a dedicated process pool so signing bursts do not
+    contend with the API threads for the GIL.
+    """
+
+    def __init__(self, wallet: LocalAccount, processes: int = 0):
+        self.address = wallet.address
+        self.private_key: keys.PrivateKey = wallet._key_obj
+        self.pool: Optional[ProcessPoolExecutor] = None
+        if processes > 0:
+            self.pool = ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=_init_worker,
+                initargs=(self.private_key.to_bytes(),)
+            )
+
+    def sign(self, action: Dict[str, Any], active_pool: Optional[str], nonce: int, is_mainnet: bool) -> Dict[str, Any]:
+        if self.pool is not None:
+            return self.pool.submit(_sign_in_worker, (action, active_pool, nonce, is_mainnet)).result()
+        return _sign_digest(self.private_key, l1_action_digest(action, active_pool, nonce, is_mainnet))
+
+    def sign_batch(self, requests: Iterable[SignRequest]) -> List[Dict[str, Any]]:
+        requests = list(requests)
+        if self.pool is not None:
+            return list(self.pool.map(_sign_in_worker, requests, chunksize=max(1, len(requests) // 16)))
+        return [_sign_digest(self.private_key, l1_action_digest(*request)) for request in requests]
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+
+_signers: Dict[str, L1Signer] = {}
+
+
+def get_signer(wallet: LocalAccount) -> L1Signer:
+    signer = _signers.get(wallet.address)
+    if signer is None:
+        signer = _signers.setdefault(wallet.address, L1Signer(wallet, settings.SIGNING_PROCESSES))
+    return signer
+
+
+def sign_l1_action(wallet: LocalAccount, action: Dict[str, Any], active_pool: Optional[str], nonce: int, is_mainnet: bool) -> Dict[str, Any]:
+    """Drop-in replacement for `hyperliquid.utils.signing.sign_l1_action`."""
+    return get_signer(wallet).sign(action, active_pool, nonce, is_mainnet)
+
+
+def shutdown_signers():
+    for signer in list(_signers.values()):
+        signer.close()
+    _signers.clear()
+
+
+# `Exchange` calls the name imported into `hyperliquid.exchange`; route it to the fast path.
+hl_exchange.sign_l1_action = sign_l1_action
@@ -0,0 +1,384 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+from hyperliquid.info import Info
+
+from app.core.config import settings
+from app.core.logger import setup_logger
+from app.services.metadata_cache import metadata_cache
+from app.services.shared_cache import SharedCache, shared_cache
+
+logger = setup_logger(__name__)
+
+# Hyperliquid l2Book messages carry at most 20 levels per side.
+MAX_BOOK_LEVELS = 20
+
+# Books and mids read from the shared cache are ignored once the elected worker stops publishing.
+SHARED_BOOK_MAX_AGE = 30.0
+# How often a book read from the shared cache is re-read while an order waits for its next update.
+SHARED_BOOK_POLL_INTERVAL = 0.005
+
+
+class OrderBook:
+    """
+    Compact L2 book for one coin: four preallocated float64 arrays overwritten
+    in place on every update, bids sorted best-first (descending), asks ascending.
+    """
+
+    __slots__ = ("coin", "bid_px", "bid_sz", "ask_px", "ask_sz", "n_bids", "n_asks", "time", "updated_at", "lock", "updated", "refresh")
+
+    def __init__(self, coin: str, max_levels: int = MAX_BOOK_LEVELS):
+        self.coin = coin
+        self.bid_px = np.zeros(max_levels)
+        self.bid_sz = np.zeros(max_levels)
+        self.ask_px = np.zeros(max_levels)
+        self.ask_sz = np.zeros(max_levels)
+        self.n_bids = 0
+        self.n_asks = 0
+        self.time = 0
+        self.updated_at = 0.0
+        self.lock = threading.Lock()
+        self.updated = threading.Condition(self.lock)
+        # Called while waiting for an update when the book is fed by polling rather than pushes.
+        self.refresh: Optional[Callable[[], None]] = None
+
+    def apply_snapshot(self, bids: List[Dict[str, Any]], asks: List[Dict[str, Any]], book_time: int = 0):
+        max_levels = len(self.bid_px)
+        bids = bids[:max_levels]
+        asks = asks[:max_levels]
+        bid_px = [float(level["px"]) for level in bids]
+        bid_sz = [float(level["sz"]) for level in bids]
+        ask_px = [float(level["px"]) for level in asks]
+        ask_sz = [float(level["sz"]) for level in asks]
+
+        with self.lock:
+            self.n_bids = len(bids)
+            self.n_asks = len(asks)
+            self.bid_px[:self.n_bids] = bid_px
+            self.bid_sz[:self.n_bids] = bid_sz
+            self.ask_px[:self.n_asks] = ask_px
+            self.ask_sz[:self.n_asks] = ask_sz
+            self.time = book_time
+            self.updated_at = time.time()
+            self.updated.notify_all()
+
+    def wait_for_update(self, since: int, timeout: float) -> bool:
+        """Block until a snapshot newer than `since` has been applied, or the timeout expires."""
+        if self.refresh is None:
+            with self.updated:
+                return self.updated.wait_for(lambda: self.time != since, timeout)
+
+        # Nothing pushes snapshots into a book read from the shared cache: poll it.
+        deadline = time.monotonic() + timeout
+        while self.time == since:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(SHARED_BOOK_POLL_INTERVAL)
+            self.refresh()
+        return True
+
+    @property
+    def ready(self) -> bool:
+        return self.n_bids > 0 and self.n_asks > 0
+
+    def mid(self) -> Optional[float]:
+        with self.lock:
+            if not self.ready:
+                return None
+            return float((self.bid_px[0] + self.ask_px[0]) / 2)
+
+    def depth(self, levels: int = MAX_BOOK_LEVELS) -> Dict[str, Any]:
+        with self.lock:
+            n_bids = min(levels, self.n_bids)
+            n_asks = min(levels, self.n_asks)
+            return {
+                "coin": self.coin,
+                "time": self.time,
+                "mid": float((self.bid_px[0] + self.ask_px[0]) / 2) if self.ready else None,
+                "bids": np.column_stack((self.bid_px[:n_bids], self.bid_sz[:n_bids])).tolist(),
+                "asks": np.column_stack((self.ask_px[:n_asks], self.ask_sz[:n_asks])).tolist(),
+            }
+
+    def quote(self, size: float, is_buy: bool) -> Optional[Dict[str, Any]]:
+        """Estimate the VWAP and slippage of an aggressive order walking the book."""
+        with self.lock:
+            if not self.ready:
+                return None
+            mid = (self.bid_px[0] + self.ask_px[0]) / 2
+            if is_buy:
+                px = self.ask_px[:self.n_asks].copy()
+                sz = self.ask_sz[:self.n_asks].copy()
+            else:
+                px = self.bid_px[:self.n_bids].copy()
+                sz = self.bid_sz[:self.n_bids].copy()
+
+        cumulative = np.cumsum(sz)
+        last = int(np.searchsorted(cumulative, size))
+        fully_filled = last < len(cumulative)
+        if not fully_filled:
+            last = len(cumulative) - 1
+
+        taken = sz[:last + 1]
+        filled_size = float(cumulative[last])
+        if fully_filled:
+            taken[-1] -= filled_size - size
+            filled_size = size
+
+        vwap = float(np.dot(taken, px[:last + 1]) / filled_size)
+        slippage = (vwap - mid) / mid if is_buy else (mid - vwap) / mid
+
+        return {
+            "coin": self.coin,
+            "side": "buy" if is_buy else "sell",
+            "size": size,
+            "filledSize": filled_size,
+            "fullyFilled": fully_filled,
+            "mid": float(mid),
+            "vwap": vwap,
+            "worstPx": float(px[last]),
+            "slippage": float(slippage),
+            "time": self.time,
+        }
+
+
+class MidPrices:
+    """
+    Latest mid of every coin from the allMids feed, in a float64 array indexed by coin.
+
+    `version` increases each time at least one mid changes and `changed` holds, per
+    coin, the version of its last change: both are used as ETags. The JSON body of
+    all mids is serialized once per version. Long-polling requests wait on
+    `changed_event()`, set from the thread that applies a new version.
+    """
+
+    def __init__(self, capacity: int = 512):
+        self.index: Dict[str, int] = {}
+        self.coins: List[str] = []
+        self.px = np.full(capacity, np.nan)
+        self.changed = np.zeros(capacity, dtype=np.int64)
+        # Starts from the clock so that versions are not reused after a restart.
+        self.version = int(time.time() * 1000)
+        self.time = 0
+        self.lock = threading.Lock()
+        self._body: Optional[bytes] = None
+        self._events: Dict[asyncio.AbstractEventLoop, asyncio.Event] = {}
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.coins)
+
+    def apply(self, mids: Dict[str, str], mids_time: int = 0, version: Optional[int] = None) -> bool:
+        """Store the mids of an allMids message. Returns False if no mid changed."""
+        values = np.array([float(px) for px in mids.values()])
+        with self.lock:
+            for coin in mids:
+                if coin not in self.index:
+                    self._add_coin(coin)
+            idx = np.fromiter((self.index[coin] for coin in mids), dtype=np.int64, count=len(mids))
+
+            changed = self.px[idx] != values
+            if version is None:
+                if not changed.any():
+                    return False
+                version = self.version + 1
+            elif version == self.version:
+                return False
+
+            self.px[idx] = values
+            self.changed[idx[changed]] = version
+            self.version = version
+            self.time = mids_time or int(time.time() * 1000)
+            self._body = None
+            loops = list(self._events)
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._notify, loop)
+            except RuntimeError:
+                # Closed loop.
+                with self.lock:
+                    self._events.pop(loop, None)
+        return True
+
+    def changed_event(self) -> asyncio.Event:
+        """Event of the running loop, set at the next version. Take it before reading the ETag."""
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            event = self._events.get(loop)
+            if event is None:
+                event = self._events[loop] = asyncio.Event()
+            return event
+
+    def _notify(self, loop: asyncio.AbstractEventLoop):
+        # One event per version and loop: every waiter of that loop is woken by a single callback.
+        with self.lock:
+            event = self._events.pop(loop, None)
+        if event is not None:
+            event.set()
+
+    def _add_coin(self, coin: str):
+        n = len(self.coins)
+        if n == len(self.px):
+            self.px = np.concatenate((self.px, np.full(n, np.nan)))
+            self.changed = np.concatenate((self.changed, np.zeros(n, dtype=np.int64)))
+        self.index[coin] = n
+        self.coins.append(coin)
+
+    def get(self, coin: str) -> Optional[Tuple[float, int]]:
+        """Returns `(mid, version of its last change)` for one coin."""
+        i = self.index.get(coin)
+        if i is None:
+            return None
+        with self.lock:
+            return float(self.px[i]), int(self.changed[i])
+
+    def body(self) -> Tuple[bytes, int]:
+        """Returns the JSON body of all mids and the version it was built from."""
+        with self.lock:
+            if self._body is None:
+                self._body = orjson.dumps({
+                    "time": self.time,
+                    "mids": dict(zip(self.coins, self.px[:len(self.coins)].tolist())),
+                })
+            return self._body, self.version
+
+
+class MarketDataService:
+    """
+    Keeps in-memory L2 books for a configurable set of coins from the l2Book WebSocket feed.
+
+    With `mids`, it also subscribes to allMids and keeps the mid of every coin.
+
+    With a `shared` cache (several API workers), only the elected worker subscribes:
+    it publishes every book under `book:{coin}` and the mids under `mids`, the other
+    workers rebuild their local copies from the shared cache when they are read.
+    """
+
+    def __init__(self, shared: Optional[SharedCache] = None):
+        self.shared = shared
+        self.books: Dict[str, OrderBook] = {}
+        self.mids = MidPrices()
+        # Called with each allMids message that changed at least one mid.
+        self.mids_listeners: List[Callable[[Dict[str, str]], None]] = []
+        self.subscribe_mids = False
+        self._shared_mids_at = 0.0
+        self.info_client: Optional[Info] = None
+        self.running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, coins: List[str], mids: bool = False):
+        if self.running or not (coins or mids):
+            return
+
+        self.running = True
+        self.subscribe_mids = mids
+        for coin in coins:
+            self.books.setdefault(coin, OrderBook(coin))
+
+        self._thread = threading.Thread(target=self._subscribe, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.info_client and self.info_client.ws_manager:
+            try:
+                self.info_client.disconnect_websocket()
+            except Exception as e:
+                logger.debug(f"Erreur lors de la fermeture du WebSocket market data: {e}")
+        self.info_client = None
+
+    def reads_shared(self) -> bool:
+        """True in the workers that read books and mids published by the elected worker."""
+        return bool(self.shared) and not self.running
+
+    def get_book(self, coin: str) -> Optional[OrderBook]:
+        if self.reads_shared():
+            return self._get_shared_book(coin)
+
+        book = self.books.get(coin)
+        if book is None or not book.ready:
+            return None
+        return book
+
+    def get_mids(self) -> Optional[MidPrices]:
+        if self.reads_shared():
+            self._refresh_mids_from_shared()
+        return self.mids if self.mids.ready else None
+
+    def _refresh_mids_from_shared(self):
+        entry = self.shared.table.get("mids", max_age=SHARED_BOOK_MAX_AGE)
+        # The payload is only decoded when the elected worker has published a new one.
+        if entry is None or entry[1] == self._shared_mids_at:
+            return
+        payload = orjson.loads(entry[0])
+        self.mids.apply(payload["mids"], payload["time"], payload["version"])
+        self._shared_mids_at = entry[1]
+
+    def _get_shared_book(self, coin: str) -> Optional[OrderBook]:
+        book = self.books.get(coin)
+        if book is None:
+            if coin not in settings.MARKET_DATA_COINS:
+                return None
+            book = self.books.setdefault(coin, OrderBook(coin))
+            book.refresh = lambda: self._refresh_from_shared(book)
+
+        if not self._refresh_from_shared(book):
+            return None
+        return book
+
+    def _refresh_from_shared(self, book: OrderBook) -> bool:
+        entry = self.shared.get_json(f"book:{book.coin}", max_age=SHARED_BOOK_MAX_AGE)
+        if entry is None:
+            return False
+        if entry["time"] != book.time:
+            bids, asks = entry["levels"]
+            book.apply_snapshot(bids, asks, entry["time"])
+        return book.ready
+
+    def _subscribe(self):
+        try:
+            meta, spot_meta = metadata_cache.get()
+            self.info_client = Info(settings.HYPERLIQUID_API_URL, skip_ws=False, meta=meta, spot_meta=spot_meta)
+            for coin in self.books:
+                self.info_client.subscribe({"type": "l2Book", "coin": coin}, self._on_message_received)
+            if self.subscribe_mids:
+                self.info_client.subscribe({"type": "allMids"}, self._on_message_received)
+            logger.info(
+                f"✓ Market data abonné aux carnets de {len(self.books)} coin(s)"
+                + (" et aux prix médians" if self.subscribe_mids else "")
+            )
+        except Exception as e:
+            logger.error(f"Market data: abonnement impossible: {e}", exc_info=True)
+
+    def _on_message_received(self, message: Dict[str, Any]):
+        try:
+            channel = message.get("channel")
+            data = message.get("data") or {}
+            if channel == "allMids":
+                self._on_mids(data.get("mids") or {})
+                return
+            if channel != "l2Book":
+                return
+            book = self.books.get(data.get("coin"))
+            if book is None:
+                return
+            bids, asks = data.get("levels", ([], []))
+            book.apply_snapshot(bids, asks, data.get("time", 0))
+            if self.shared:
+                self.shared.put_json(f"book:{book.coin}", {"time": book.time, "levels": [bids, asks]})
+        except Exception as e:
+            logger.error(f"Erreur market data sur un message WS: {e}", exc_info=True)
+
+    def _on_mids(self, mids: Dict[str, str]):
+        if not self.mids.apply(mids):
+            return
+        if self.shared:
+            self.shared.put_json("mids", {"version": self.mids.version, "time": self.mids.time, "mids": mids})
+        for listener in self.mids_listeners:
+            listener(mids)
+
+
+market_data_service = MarketDataService(shared=shared_cache if shared_cache.enabled else None)
@@ -0,0 +1,107 @@
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+
+from app.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Frame header: payload length (big-endian uint32).
+FRAME_HEADER = struct.Struct(">I")
+
+
+class MessageRecorder:
+    """
+    Append-only recording of raw WebSocket messages.
+
+    Messages are only enqueued by the WebSocket thread; a background thread
+    batches them into zlib-compressed frames of `[time, message]` JSON lines.
+    A truncated last frame (crash while writing) is ignored when reading.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0, batch_size: int = 1000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self.write_queue: "queue.Queue[Tuple[float, Dict[str, Any]]]" = queue.Queue()
+        self.running = False
+        self._writer_thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.running:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.running = True
+        self._writer_thread = threading.Thread(target=self._writer, daemon=True)
+        self._writer_thread.start()
+        logger.info(f"✓ Enregistrement des messages WebSocket actif ({self.path})")
+
+    def stop(self):
+        if not self.running:
+            return
+        self.flush()
+        self.running = False
+        if self._writer_thread:
+            self._writer_thread.join(timeout=5)
+
+    def append(self, message: Dict[str, Any]):
+        self.write_queue.put((time.time(), message))
+
+    def flush(self):
+        if self.running and self._writer_thread and self._writer_thread.is_alive():
+            self.write_queue.join()
+
+    def _drain_batch(self) -> List[Tuple[float, Dict[str, Any]]]:
+        try:
+            batch = [self.write_queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.write_queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _writer(self):
+        with open(self.path, "ab") as f:
+            while self.running:
+                batch = self._drain_batch()
+                if not batch:
+                    continue
+                try:
+                    payload = zlib.compress(b"\n".join(orjson.dumps(record) for record in batch))
+                    f.write(FRAME_HEADER.pack(len(payload)) + payload)
+                    f.flush()
+                except Exception as e:
+                    logger.error(f"Erreur d'enregistrement de {len(batch)} message(s): {e}", exc_info=True)
+                finally:
+                    for _ in batch:
+                        self.write_queue.task_done()
+
+
+def read_recording(path: str) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """Yield the `(time, message)` records of a recording in write order."""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+            (length,) = FRAME_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                logger.warning(f"Dernier bloc tronqué ignoré dans {path}")
+                return
+            for line in zlib.decompress(payload).split(b"\n"):
+                recorded_at, message = orjson.loads(line)
+                yield recorded_at, message
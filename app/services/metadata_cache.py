@@ -0,0 +1,143 @@
+import mmap
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+from hyperliquid.api import API
+
+from app.core.config import settings
+from app.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Bump when the snapshot layout changes: older files are then ignored.
+SNAPSHOT_VERSION = 1
+
+
+class MetadataCache:
+    """
+    Shared `meta`/`spotMeta` for every `Info` and `Exchange` built by the gateway.
+
+    The metadata is kept in a versioned JSON snapshot on disk, written atomically
+    and read through mmap, so API workers, listener workers and reconnects reuse
+    one copy instead of downloading it again. A background thread refreshes it;
+    when the upstream is unreachable the last snapshot keeps being served.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.METADATA_CACHE_PATH,
+        refresh_interval: float = settings.METADATA_REFRESH_INTERVAL,
+        max_age: float = settings.METADATA_MAX_AGE,
+        base_url: str = settings.HYPERLIQUID_API_URL,
+    ):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.base_url = base_url
+
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_mtime_ns = 0
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self.running = False
+
+    def get(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Returns (meta, spot_meta), loading or downloading them if needed."""
+        snapshot = self._snapshot
+        if snapshot is not None and not self._file_changed():
+            return snapshot["meta"], snapshot["spotMeta"]
+
+        with self._lock:
+            if self._snapshot is None or self._file_changed():
+                self._snapshot = self._read_snapshot() or self._snapshot
+            if self._snapshot is None or self._is_expired(self._snapshot):
+                self._refresh_locked()
+            return self._snapshot["meta"], self._snapshot["spotMeta"]
+
+    def refresh(self):
+        with self._lock:
+            self._refresh_locked()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._refresh_thread.start()
+
+    def stop(self):
+        self.running = False
+
+    def _refresh_loop(self):
+        while self.running:
+            time.sleep(self.refresh_interval)
+            if not self.running:
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Rafraîchissement des métadonnées impossible, snapshot conservé: {e}")
+
+    def _refresh_locked(self):
+        try:
+            snapshot = self._fetch()
+        except Exception:
+            if self._snapshot is not None:
+                logger.warning("Métadonnées Hyperliquid injoignables, utilisation du snapshot existant")
+                return
+            raise
+        self._write_snapshot(snapshot)
+        self._snapshot = snapshot
+
+    def _fetch(self) -> Dict[str, Any]:
+        api = API(self.base_url)
+        return {
+            "version": SNAPSHOT_VERSION,
+            "baseUrl": self.base_url,
+            "fetchedAt": time.time(),
+            "meta": api.post("/info", {"type": "meta"}),
+            "spotMeta": api.post("/info", {"type": "spotMeta"}),
+        }
+
+    def _is_expired(self, snapshot: Dict[str, Any]) -> bool:
+        return time.time() - snapshot.get("fetchedAt", 0) > self.max_age
+
+    def _file_changed(self) -> bool:
+        try:
+            return os.stat(self.path).st_mtime_ns != self._snapshot_mtime_ns
+        except OSError:
+            return False
+
+    def _read_snapshot(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, "rb") as f:
+                mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    snapshot = orjson.loads(memoryview(mapped))
+        except (OSError, ValueError) as e:
+            logger.debug(f"Snapshot de métadonnées illisible ({self.path}): {e}")
+            return None
+
+        self._snapshot_mtime_ns = mtime_ns
+        if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("baseUrl") != self.base_url:
+            return None
+        return snapshot
+
+    def _write_snapshot(self, snapshot: Dict[str, Any]):
+        directory = os.path.dirname(self.path)
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(snapshot))
+            os.replace(tmp_path, self.path)
+            self._snapshot_mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            logger.warning(f"Écriture du snapshot de métadonnées impossible ({self.path}): {e}")
+
+
+metadata_cache = MetadataCache()
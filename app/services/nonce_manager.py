@@ -0,0 +1,123 @@
+import fcntl
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+import hyperliquid.exchange as hl_exchange
+
+from app.core.config import settings
+from app.core.exceptions import ConfigurationError
+
+# The SDK stamps every signed action with `hyperliquid.exchange.get_timestamp_ms()`.
+# We replace it with a dispatcher that uses the nonce manager bound to the current
+# thread, so each account keeps its own strictly increasing nonce sequence.
+_sdk_get_timestamp_ms = hl_exchange.get_timestamp_ms
+_local = threading.local()
+
+
+# A counter more than this far behind the wall clock is moved forward.
+MAX_NONCE_LAG_MS = 1000
+
+# Lock file of the nonce slot held by this process (kept open for its lifetime).
+_slot_file = None
+_partition: Optional[Tuple[int, int]] = None
+
+
+class NonceManager:
+    """
+    Unique, increasing millisecond nonces for one signing account.
+
+    `next()` is lock-free: `next()` on an `itertools.count` is atomic under the
+    GIL, so concurrent callers always get distinct values. Bursts of more than
+    one order per millisecond simply run ahead of the clock (Hyperliquid accepts
+    nonces up to a day in the future); when idle, the counter falls behind and
+    is re-seeded from the clock under a lock.
+
+    Processes signing for the same account (API workers) use disjoint sequences:
+    nonces are `offset` modulo `stride`, one offset per process.
+    """
+
+    def __init__(self, stride: Optional[int] = None, offset: Optional[int] = None):
+        if stride is None or offset is None:
+            stride, offset = worker_nonce_partition()
+        self.stride = stride
+        self.offset = offset
+        self._counter = itertools.count(self._align(int(time.time() * 1000)), stride)
+        self._lock = threading.Lock()
+
+    def _align(self, ms: int) -> int:
+        return ms + (self.offset - ms) % self.stride
+
+    def next(self) -> int:
+        nonce = next(self._counter)
+        now = int(time.time() * 1000)
+        if nonce >= now - MAX_NONCE_LAG_MS:
+            return nonce
+
+        with self._lock:
+            nonce = next(self._counter)
+            if nonce < now - MAX_NONCE_LAG_MS:
+                # Callers still drawing from the old counter get values far below
+                # `now`, so they cannot collide with the new sequence.
+                nonce = self._align(now)
+                self._counter = itertools.count(nonce + self.stride, self.stride)
+            return nonce
+
+
+def claim_worker_slot(workers: int, run_dir: str) -> int:
+    """
+    Reserve a slot in [0, workers) for this process with an exclusive `flock`.
+
+    The lock is held until the process exits, so a restarted worker takes over
+    the slot of the one it replaces.
+    """
+    global _slot_file
+    os.makedirs(run_dir, exist_ok=True)
+    for slot in range(workers):
+        f = open(os.path.join(run_dir, f"nonce-slot-{slot}.lock"), "w")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            continue
+        _slot_file = f
+        return slot
+    raise ConfigurationError("API_WORKERS", f"Aucun slot de nonce libre parmi {workers} (trop de processus API ?)")
+
+
+def worker_nonce_partition() -> Tuple[int, int]:
+    """(stride, offset) of this process' nonces: (1, 0) with a single API worker."""
+    global _partition
+    if _partition is None:
+        if settings.API_WORKERS <= 1:
+            _partition = (1, 0)
+        else:
+            _partition = (settings.API_WORKERS, claim_worker_slot(settings.API_WORKERS, settings.API_RUN_DIR))
+    return _partition
+
+
+def current_nonce_manager() -> Optional[NonceManager]:
+    return getattr(_local, "manager", None)
+
+
+@contextmanager
+def use_nonce_manager(manager: NonceManager) -> Iterator[NonceManager]:
+    previous = current_nonce_manager()
+    _local.manager = manager
+    try:
+        yield manager
+    finally:
+        _local.manager = previous
+
+
+def _get_timestamp_ms() -> int:
+    manager = current_nonce_manager()
+    if manager is None:
+        return _sdk_get_timestamp_ms()
+    return manager.next()
+
+
+hl_exchange.get_timestamp_ms = _get_timestamp_ms
@@ -0,0 +1,343 @@
+import copy
+import threading
+import time
+from typing import Callable, Dict, Any, Optional, List, Tuple
+
+from hyperliquid.info import Info
+
+from app.core.config import settings
+from app.core.logger import setup_logger
+from app.services.hyperliquid_service import hyperliquid_service
+from app.services.metadata_cache import metadata_cache
+from app.services.shared_cache import SharedCache, shared_cache
+from app.services.subscription_manager import SubscriptionManager
+from app.services.watchlist_service import watchlist_service
+
+logger = setup_logger(__name__)
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _fmt(value: float) -> str:
+    text = f"{value:.8f}".rstrip("0").rstrip(".")
+    return "0.0" if text in ("", "-0") else text
+
+
+def _is_spot(coin: str) -> bool:
+    # Spot pairs are named "PURR/USDC" or "@{index}"; they are not perp positions.
+    return coin.startswith("@") or "/" in coin
+
+
+class AddressState:
+    """
+    In-memory clearinghouse state of one watched address.
+
+    Positions follow the fills. `marginSummary`, `crossMarginSummary` and
+    `withdrawable` are the values of the last seed and are not recomputed
+    between seeds. `realized_pnl` and `fees` add up the fills received since
+    the engine started and are not affected by reseeds.
+    """
+
+    def __init__(self, address: str):
+        self.address = address
+        self.state: Optional[Dict[str, Any]] = None
+        self.positions: Dict[str, Dict[str, Any]] = {}
+        self.realized_pnl = 0.0
+        self.fees = 0.0
+        self.seed_time_ms = 0
+        self.seeded_at = 0.0
+        self.pending_fills: List[Dict[str, Any]] = []
+        # Fills applied since the last seed, replayed on top of the next one when newer than it.
+        self.applied_fills: List[Dict[str, Any]] = []
+
+    @property
+    def seeded(self) -> bool:
+        return self.state is not None
+
+    def seed(self, user_state: Dict[str, Any]) -> bool:
+        """Replace the state with a snapshot. Returns False if it is older than the current one."""
+        seed_time_ms = int(user_state.get("time") or time.time() * 1000)
+        if self.seeded and seed_time_ms < self.seed_time_ms:
+            return False
+
+        self.state = user_state
+        self.positions = {}
+        for asset_position in user_state.get("assetPositions", []):
+            position = asset_position.get("position") or {}
+            coin = position.get("coin")
+            if coin:
+                self.positions[coin] = dict(position)
+        self.seed_time_ms = seed_time_ms
+        self.seeded_at = time.time()
+
+        # Fills received while the snapshot was fetched may be newer than it.
+        replay = self.applied_fills + self.pending_fills
+        self.applied_fills, self.pending_fills = [], []
+        for fill in replay:
+            self._apply_position(fill)
+        return True
+
+    def apply_fill(self, fill: Dict[str, Any]):
+        coin = fill.get("coin")
+        if not coin or _is_spot(coin):
+            return
+
+        self.realized_pnl += _to_float(fill.get("closedPnl"))
+        self.fees += _to_float(fill.get("fee"))
+
+        if not self.seeded:
+            self.pending_fills.append(fill)
+            return
+        self._apply_position(fill)
+
+    def _apply_position(self, fill: Dict[str, Any]):
+        # Fills already reflected in the seeded snapshot must not be counted twice.
+        if int(fill.get("time", 0)) <= self.seed_time_ms:
+            return
+        self.applied_fills.append(fill)
+
+        coin = fill["coin"]
+        px = _to_float(fill.get("px"))
+        sz = _to_float(fill.get("sz"))
+        signed_sz = sz if fill.get("side") == "B" else -sz
+
+        position = self.positions.get(coin)
+        old_szi = _to_float(position.get("szi")) if position else 0.0
+        old_entry = _to_float(position.get("entryPx")) if position else 0.0
+        new_szi = old_szi + signed_sz
+
+        if abs(new_szi) < 1e-12:
+            self.positions.pop(coin, None)
+            return
+
+        if old_szi == 0.0 or (old_szi > 0) == (signed_sz > 0):
+            entry = (abs(old_szi) * old_entry + sz * px) / abs(new_szi)
+        elif (old_szi > 0) == (new_szi > 0):
+            entry = old_entry
+        else:
+            entry = px
+
+        if position is None:
+            position = {"coin": coin}
+            self.positions[coin] = position
+
+        position["szi"] = _fmt(new_szi)
+        position["entryPx"] = _fmt(entry)
+        position["positionValue"] = _fmt(abs(new_szi) * px)
+        position["unrealizedPnl"] = _fmt(new_szi * (px - entry))
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = copy.deepcopy(self.state)
+        state["assetPositions"] = [
+            {"type": "oneWay", "position": dict(position)}
+            for position in self.positions.values()
+        ]
+        state["realizedPnl"] = _fmt(self.realized_pnl)
+        return state
+
+
+class PositionStateService:
+    """
+    Incremental position and PnL state for the watched addresses.
+
+    Each address is seeded once from `user_state`, then kept current by applying
+    the `userFills` stream (and optionally `webData2` clearinghouse pushes).
+    A background reconciliation re-seeds every address periodically.
+
+    With a `shared` cache (several API workers), only the elected worker runs the
+    engine: it publishes each snapshot under `user:{address}` and follows the
+    watchlist file, the other workers serve snapshots from the shared cache.
+    """
+
+    def __init__(
+        self,
+        max_staleness: float = settings.STATE_ENGINE_MAX_STALENESS,
+        reconcile_interval: float = settings.STATE_ENGINE_RECONCILE_INTERVAL,
+        use_webdata: bool = settings.STATE_ENGINE_USE_WEBDATA,
+        shared: Optional[SharedCache] = None,
+    ):
+        self.max_staleness = max_staleness
+        self.reconcile_interval = reconcile_interval
+        self.use_webdata = use_webdata
+        self.shared = shared
+
+        self.states: Dict[str, AddressState] = {}
+        # Called with the address after each seed or fill, outside the state lock.
+        self.listeners: List[Callable[[str], None]] = []
+        self.info_client: Optional[Info] = None
+        self.running = False
+        self._lock = threading.Lock()
+        self._reconcile_thread: Optional[threading.Thread] = None
+
+        self.subscription_managers = [SubscriptionManager({}, "userFills", self._on_message_received)]
+        if self.use_webdata:
+            self.subscription_managers.append(SubscriptionManager({}, "webData2", self._on_message_received))
+
+    def start(self, addresses: List[str]):
+        if self.running:
+            return
+
+        self.running = True
+        self._set_states(addresses)
+
+        self._reconcile_thread = threading.Thread(target=self._run, daemon=True)
+        self._reconcile_thread.start()
+
+        # Watchlist changes may be posted to any worker: the elected one picks them up from the file.
+        if self.shared:
+            threading.Thread(target=self._watchlist_monitor, daemon=True).start()
+
+    def stop(self):
+        self.running = False
+        if self.info_client and self.info_client.ws_manager:
+            try:
+                self.info_client.disconnect_websocket()
+            except Exception as e:
+                logger.debug(f"Erreur lors de la fermeture du WebSocket du moteur d'état: {e}")
+        self.info_client = None
+
+    def update_addresses(self, addresses: List[str]):
+        self._set_states(addresses)
+        if self.info_client:
+            for manager in self.subscription_managers:
+                manager.sync(self.info_client, addresses)
+
+    def _set_states(self, addresses: List[str]):
+        wanted = {addr.lower(): addr for addr in addresses}
+        with self._lock:
+            for key in list(self.states):
+                if key not in wanted:
+                    del self.states[key]
+                    if self.shared:
+                        self.shared.delete(f"user:{key}")
+            for key, addr in wanted.items():
+                self.states.setdefault(key, AddressState(addr))
+
+    def is_watched(self, address: str) -> bool:
+        return address.lower() in self.states
+
+    def get_snapshot(self, address: str) -> Optional[Dict[str, Any]]:
+        if self.shared and not self.running:
+            return self._get_shared_snapshot(address)
+
+        with self._lock:
+            state = self.states.get(address.lower())
+            if state is None or not state.seeded:
+                return None
+            if time.time() - state.seeded_at > self.max_staleness:
+                return None
+            return state.snapshot()
+
+    def get_positions(self, address: str) -> Optional[Dict[str, Tuple[float, float]]]:
+        """Returns `{coin: (szi, entryPx)}` for a seeded address."""
+        with self._lock:
+            state = self.states.get(address.lower())
+            if state is None or not state.seeded:
+                return None
+            return {
+                coin: (_to_float(position.get("szi")), _to_float(position.get("entryPx")))
+                for coin, position in state.positions.items()
+            }
+
+    def seed(self, address: str, user_state: Dict[str, Any]):
+        with self._lock:
+            state = self.states.get(address.lower())
+            if state is None:
+                return
+            if not state.seed(user_state):
+                return
+            self._publish(state)
+        self._notify(address)
+
+    def apply_fills(self, address: str, fills: List[Dict[str, Any]]):
+        with self._lock:
+            state = self.states.get(address.lower())
+            if state is None:
+                return
+            for fill in fills:
+                state.apply_fill(fill)
+            self._publish(state)
+        self._notify(address)
+
+    def _notify(self, address: str):
+        for listener in self.listeners:
+            try:
+                listener(address)
+            except Exception as e:
+                logger.error(f"Erreur d'un abonné du moteur d'état: {e}", exc_info=True)
+
+    def _publish(self, state: AddressState):
+        if self.shared and state.seeded:
+            self.shared.put_json(f"user:{state.address.lower()}", {
+                "seededAt": state.seeded_at,
+                "state": state.snapshot(),
+            })
+
+    def _get_shared_snapshot(self, address: str) -> Optional[Dict[str, Any]]:
+        entry = self.shared.get_json(f"user:{address.lower()}")
+        if entry is None or time.time() - entry["seededAt"] > self.max_staleness:
+            return None
+        return entry["state"]
+
+    def _watchlist_monitor(self):
+        watchlist_service.has_changed()
+
+        while self.running:
+            time.sleep(settings.WATCHLIST_POLL_INTERVAL)
+
+            if watchlist_service.has_changed():
+                self.update_addresses(watchlist_service.get())
+
+    def _run(self):
+        try:
+            self._subscribe()
+        except Exception as e:
+            logger.error(f"Moteur d'état: abonnement impossible ({e}). Les requêtes iront vers Hyperliquid.")
+
+        while self.running:
+            self._reconcile()
+            time.sleep(self.reconcile_interval)
+
+    def _subscribe(self):
+        meta, spot_meta = metadata_cache.get()
+        self.info_client = Info(settings.HYPERLIQUID_API_URL, skip_ws=False, meta=meta, spot_meta=spot_meta)
+        addresses = [state.address for state in list(self.states.values())]
+        for manager in self.subscription_managers:
+            manager.sync(self.info_client, addresses)
+        logger.info(f"✓ Moteur d'état abonné à {len(self.states)} adresse(s)")
+
+    def _reconcile(self):
+        for state in list(self.states.values()):
+            if not self.running:
+                return
+            try:
+                user_state, age = hyperliquid_service.fetch_user_state(state.address)
+                # A stale fallback is older than what the streams already applied.
+                if user_state and age == 0:
+                    self.seed(state.address, user_state)
+            except Exception as e:
+                logger.warning(f"Réconciliation impossible pour {state.address[:10]}...: {e}")
+
+    def _on_message_received(self, message: Dict[str, Any]):
+        try:
+            data = message.get("data") or {}
+            channel = message.get("channel")
+
+            if channel == "userFills":
+                if data.get("isSnapshot"):
+                    return
+                self.apply_fills(data.get("user", ""), data.get("fills", []))
+            elif channel == "webData2":
+                clearinghouse_state = data.get("clearinghouseState")
+                if clearinghouse_state:
+                    self.seed(data.get("user", ""), clearinghouse_state)
+        except Exception as e:
+            logger.error(f"Erreur du moteur d'état sur un message WS: {e}", exc_info=True)
+
+
+position_state_service = PositionStateService(shared=shared_cache if shared_cache.enabled else None)
@@ -0,0 +1,222 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Hashable, Optional, Set, Tuple
+
+from requests.adapters import HTTPAdapter
+from hyperliquid.utils.error import ClientError
+
+from app.core.config import settings
+from app.core.exceptions import UpstreamUnavailableError
+from app.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """Applies a default timeout to every request of a session (the SDK sends none)."""
+
+    def __init__(self, timeout: float, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class LatencyTracker:
+    """Percentiles over the last `window` successful call durations."""
+
+    def __init__(self, window: int = 500):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self._sorted: Optional[list] = None
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+            self._sorted = None
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self.samples:
+                return None
+            if self._sorted is None:
+                self._sorted = sorted(self.samples)
+            return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds, then lets a single trial call through (half-open):
+    its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = settings.UPSTREAM_BREAKER_FAILURES,
+        reset_timeout: float = settings.UPSTREAM_BREAKER_RESET,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(f"Circuit Hyperliquid ouvert après {self.failures} échec(s)")
+                self.opened_at = time.monotonic()
+
+
+class UpstreamGuard:
+    """
+    Deadline, hedging, circuit breaker and last-good fallback around one kind of
+    read-only upstream call.
+
+    A second identical request is sent when the first has not answered after the
+    recent p95 latency (or right away if it failed), and the first successful
+    answer wins. A 429 is never hedged and counts as a failure for the breaker.
+    When the deadline expires, the calls fail or the circuit is open, the last
+    good value for the key is served if it is recent enough, otherwise
+    `UpstreamUnavailableError` is raised.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        deadline: float = settings.UPSTREAM_INFO_DEADLINE,
+        hedge: bool = settings.UPSTREAM_HEDGE_ENABLED,
+        hedge_min_delay: float = settings.UPSTREAM_HEDGE_MIN_DELAY,
+        breaker: Optional[CircuitBreaker] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+        stale_max_age: float = settings.UPSTREAM_STALE_MAX_AGE,
+        stale_max_entries: int = 10000,
+    ):
+        self.name = name
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = breaker or CircuitBreaker()
+        # Calls abandoned at the deadline keep their thread until the HTTP timeout: the pool bounds them.
+        self.executor = executor or ThreadPoolExecutor(max_workers=settings.UPSTREAM_MAX_WORKERS, thread_name_prefix=name)
+        self.stale_max_age = stale_max_age
+        self.stale_max_entries = stale_max_entries
+        self.latency = LatencyTracker()
+        self.metrics = {"calls": 0, "hedged": 0, "timeouts": 0, "errors": 0, "rejected": 0, "rate_limited": 0, "stale_served": 0}
+        self._last_good: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> float:
+        p95 = self.latency.percentile(0.95)
+        if p95 is None:
+            return self.deadline / 2
+        return min(max(p95, self.hedge_min_delay), self.deadline)
+
+    def call(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+        """Returns `(value, age)`: age is 0 for a fresh answer, else the age in seconds of the stale value served."""
+        self.metrics["calls"] += 1
+        if not self.breaker.allow():
+            self.metrics["rejected"] += 1
+            return self._fallback(key, "circuit ouvert")
+
+        start = time.monotonic()
+        deadline_at = start + self.deadline
+        pending: Set[Future] = {self.executor.submit(fn, *args)}
+        attempts = 1
+        error: Optional[BaseException] = None
+        rate_limited = False
+
+        while pending:
+            hedging = self.hedge and attempts == 1 and not rate_limited
+            timeout = deadline_at - time.monotonic()
+            if hedging:
+                timeout = min(timeout, start + self.hedge_delay() - time.monotonic())
+            done, pending = wait(pending, timeout=max(timeout, 0), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    self.latency.record(time.monotonic() - start)
+                    self.breaker.record_success()
+                    value = future.result()
+                    self._remember(key, value)
+                    return value, 0.0
+                if isinstance(error, ClientError):
+                    if error.status_code == 429:
+                        # Upstream asks to back off: a second request would only add load.
+                        rate_limited = True
+                        continue
+                    # The request itself is invalid: the upstream is healthy.
+                    self.breaker.record_success()
+                    raise error
+
+            if time.monotonic() >= deadline_at:
+                break
+            if hedging and not rate_limited:
+                attempts += 1
+                self.metrics["hedged"] += 1
+                pending.add(self.executor.submit(fn, *args))
+
+        self.breaker.record_failure()
+        if rate_limited:
+            self.metrics["rate_limited"] += 1
+            reason = "limite de requêtes atteinte (429)"
+        elif error is None or pending:
+            self.metrics["timeouts"] += 1
+            reason = f"pas de réponse en {self.deadline}s"
+        else:
+            self.metrics["errors"] += 1
+            reason = str(error) or error.__class__.__name__
+        return self._fallback(key, reason)
+
+    def _remember(self, key: Hashable, value: Any):
+        with self._lock:
+            self._last_good[key] = (time.monotonic(), value)
+            self._last_good.move_to_end(key)
+            while len(self._last_good) > self.stale_max_entries:
+                self._last_good.popitem(last=False)
+
+    def _fallback(self, key: Hashable, reason: str) -> Tuple[Any, float]:
+        with self._lock:
+            entry = self._last_good.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age <= self.stale_max_age:
+                self.metrics["stale_served"] += 1
+                logger.debug(f"Hyperliquid indisponible ({reason}), valeur de {age:.1f}s servie pour {key}")
+                return entry[1], max(age, 1e-6)
+        raise UpstreamUnavailableError(self.name, reason)
@@ -0,0 +1,267 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Callable, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+from app.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+MAGIC = b"HLSHARE1"
+# magic, slots, slot size
+FILE_HEADER = struct.Struct("<8sII")
+# seq, key hash, stored_at, payload length, payload crc32, key length
+SLOT_HEADER = struct.Struct("<QQdIIH")
+SEQ = struct.Struct("<Q")
+READ_ATTEMPTS = 5
+
+
+def _key_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") or 1
+
+
+class SharedTable:
+    """
+    Fixed-size key/value table in a memory-mapped file, shared by processes on one host.
+
+    Each key maps to one slot (a colliding key evicts the previous one, like any
+    cache). Writers lock the slot's byte range; readers never lock: they use the
+    slot's sequence number (odd while a write is in progress) and a CRC to
+    discard torn reads.
+    """
+
+    def __init__(self, path: str, slots: int, slot_size: int):
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self._fd: Optional[int] = None
+        self._mm: Optional[mmap.mmap] = None
+        self._write_lock = threading.Lock()
+        self._open_lock = threading.Lock()
+
+    @property
+    def max_value_size(self) -> int:
+        return self.slot_size - SLOT_HEADER.size
+
+    def open(self):
+        with self._open_lock:
+            if self._mm is not None:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            size = FILE_HEADER.size + self.slots * self.slot_size
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                header = os.pread(fd, FILE_HEADER.size, 0)
+                if len(header) < FILE_HEADER.size or FILE_HEADER.unpack(header) != (MAGIC, self.slots, self.slot_size):
+                    # New file or different layout: start from an empty table.
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, size)
+                    os.pwrite(fd, FILE_HEADER.pack(MAGIC, self.slots, self.slot_size), 0)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+            self._fd = fd
+            self._mm = mmap.mmap(fd, size)
+
+    def close(self):
+        with self._open_lock:
+            if self._mm is not None:
+                self._mm.close()
+                os.close(self._fd)
+            self._mm = None
+            self._fd = None
+
+    def _offset(self, key_hash: int) -> int:
+        return FILE_HEADER.size + (key_hash % self.slots) * self.slot_size
+
+    def put(self, key: str, value: bytes, stored_at: Optional[float] = None) -> bool:
+        """Store `value` under `key`. Returns False if it does not fit in a slot."""
+        self.open()
+        key_bytes = key.encode()
+        if len(key_bytes) + len(value) > self.max_value_size:
+            return False
+
+        key_hash = _key_hash(key_bytes)
+        offset = self._offset(key_hash)
+        mm = self._mm
+        with self._write_lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self.slot_size, offset)
+            try:
+                (seq,) = SEQ.unpack_from(mm, offset)
+                SEQ.pack_into(mm, offset, seq + 1)
+                start = offset + SLOT_HEADER.size
+                mm[start:start + len(key_bytes) + len(value)] = key_bytes + value
+                SLOT_HEADER.pack_into(
+                    mm, offset, seq + 1, key_hash, stored_at or time.time(),
+                    len(value), zlib.crc32(value), len(key_bytes)
+                )
+                SEQ.pack_into(mm, offset, seq + 2)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self.slot_size, offset)
+        return True
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Tuple[bytes, float]]:
+        """Returns `(value, stored_at)`, or None if missing, evicted or older than `max_age`."""
+        self.open()
+        key_bytes = key.encode()
+        key_hash = _key_hash(key_bytes)
+        offset = self._offset(key_hash)
+        mm = self._mm
+
+        for _ in range(READ_ATTEMPTS):
+            seq, slot_hash, stored_at, length, crc, key_length = SLOT_HEADER.unpack_from(mm, offset)
+            if seq & 1:
+                time.sleep(0)
+                continue
+            if slot_hash != key_hash or key_length + length > self.max_value_size:
+                return None
+            start = offset + SLOT_HEADER.size
+            data = mm[start:start + key_length + length]
+            if SEQ.unpack_from(mm, offset)[0] != seq:
+                continue
+
+            if data[:key_length] != key_bytes:
+                return None
+            value = data[key_length:]
+            if zlib.crc32(value) != crc:
+                continue
+            if max_age is not None and time.time() - stored_at > max_age:
+                return None
+            return value, stored_at
+        return None
+
+    def delete(self, key: str):
+        self.open()
+        key_bytes = key.encode()
+        key_hash = _key_hash(key_bytes)
+        offset = self._offset(key_hash)
+        mm = self._mm
+        with self._write_lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self.slot_size, offset)
+            try:
+                seq, slot_hash, _, _, _, key_length = SLOT_HEADER.unpack_from(mm, offset)
+                start = offset + SLOT_HEADER.size
+                if slot_hash == key_hash and mm[start:start + key_length] == key_bytes:
+                    SLOT_HEADER.pack_into(mm, offset, seq + 2, 0, 0.0, 0, 0, 0)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self.slot_size, offset)
+
+
+class LeaderElection:
+    """
+    Elects one process among those sharing `path` with an exclusive `flock`.
+
+    Candidates retry every `retry_interval` seconds; the lock is released when the
+    leader exits (or crashes), so another process takes over.
+    """
+
+    def __init__(self, path: str, on_elected: Callable[[], None], retry_interval: float = 1.0):
+        self.path = path
+        self.on_elected = on_elected
+        self.retry_interval = retry_interval
+        self.is_leader = False
+        self.running = False
+        self._file = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.is_leader = False
+
+    def try_acquire(self) -> bool:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        f = open(self.path, "w")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        self.is_leader = True
+        return True
+
+    def _run(self):
+        while self.running and not self.try_acquire():
+            time.sleep(self.retry_interval)
+        if not self.running:
+            return
+        logger.info(f"✓ Worker {os.getpid()} élu pour les abonnements Hyperliquid")
+        try:
+            self.on_elected()
+        except Exception as e:
+            logger.error(f"Démarrage des abonnements du worker élu impossible: {e}", exc_info=True)
+
+
+class SharedCache:
+    """
+    Cross-worker cache of the API: JSON values in a `SharedTable`, plus the
+    election of the worker that holds the upstream WebSocket subscriptions.
+
+    Leader/follower mode is only used with several API workers; with one worker
+    every service keeps working from its own memory as before.
+    """
+
+    def __init__(
+        self,
+        path: str = os.path.join(settings.API_RUN_DIR, "shared_cache.bin"),
+        slots: int = settings.SHARED_CACHE_SLOTS,
+        slot_size: int = settings.SHARED_CACHE_SLOT_SIZE,
+        enabled: bool = settings.API_WORKERS > 1,
+    ):
+        self.table = SharedTable(path, slots, slot_size)
+        self.enabled = enabled
+        self.election: Optional[LeaderElection] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self.election is not None and self.election.is_leader
+
+    def start(self, on_elected: Callable[[], None]):
+        self.table.open()
+        self.election = LeaderElection(self.table.path + ".leader", on_elected)
+        self.election.start()
+
+    def stop(self):
+        if self.election:
+            self.election.stop()
+        self.table.close()
+
+    def get_json(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        entry = self.table.get(key, max_age)
+        return orjson.loads(entry[0]) if entry else None
+
+    def put_json(self, key: str, value: Any) -> bool:
+        stored = self.table.put(key, orjson.dumps(value))
+        if not stored:
+            logger.debug(f"Valeur trop grande pour le cache partagé: {key}")
+        return stored
+
+    def delete(self, key: str):
+        self.table.delete(key)
+
+
+shared_cache = SharedCache()
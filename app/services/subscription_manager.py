@@ -0,0 +1,61 @@
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class SubscriptionManager:
+    """
+    Keeps the per-address WebSocket subscriptions of a live `Info` client in sync
+    with a desired set of addresses.
+
+    Only the difference between the desired set and the active `subscriptions`
+    dict is sent, so addresses that stay watched are never resubscribed.
+    """
+
+    def __init__(
+        self,
+        subscriptions: Dict[str, int],
+        subscription_type: str,
+        callback: Callable[[Any], None],
+    ):
+        self.subscriptions = subscriptions
+        self.subscription_type = subscription_type
+        self.callback = callback
+        self.lock = threading.RLock()
+
+    def _subscription(self, addr: str) -> Dict[str, str]:
+        return {"type": self.subscription_type, "user": addr}
+
+    def diff(self, desired: List[str]) -> Tuple[List[str], List[str]]:
+        active = {addr.lower(): addr for addr in self.subscriptions}
+        wanted = {addr.lower(): addr for addr in desired}
+        added = [addr for key, addr in wanted.items() if key not in active]
+        removed = [addr for key, addr in active.items() if key not in wanted]
+        return added, removed
+
+    def sync(self, info_client: Any, desired: List[str]) -> List[str]:
+        """Apply the incremental subscribe/unsubscribe messages. Returns the addresses that failed."""
+        failed = []
+        with self.lock:
+            added, removed = self.diff(desired)
+
+            for addr in removed:
+                sub_id = self.subscriptions.pop(addr)
+                try:
+                    info_client.unsubscribe(self._subscription(addr), sub_id)
+                    logger.info(f"  ✓ Désabonné ({self.subscription_type}): {addr[:10]}...")
+                except Exception as e:
+                    logger.error(f"  ✗ Erreur de désabonnement pour {addr}: {e}")
+
+            for addr in added:
+                try:
+                    self.subscriptions[addr] = info_client.subscribe(self._subscription(addr), self.callback)
+                    logger.info(f"  ✓ Abonné ({self.subscription_type}): {addr[:10]}...")
+                except Exception as e:
+                    logger.error(f"  ✗ Erreur d'abonnement pour {addr}: {e}")
+                    failed.append(addr)
+
+        return failed
@@ -1,6 +1,6 @@
 import requests
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -11,6 +11,8 @@ from tenacity import (
 
 from app.core.config import settings
 from app.core.logger import setup_logger
+from app.core.exceptions import ConfigurationError
+from app.services.alert_templates import Alert, TEMPLATE_NAMES, fill_alert, rule_alert
 
 logger = setup_logger(__name__)
 
@@ -18,41 +20,48 @@ class TelegramService:
     def __init__(self):
         self.token = settings.TELEGRAM_BOT_TOKEN
         self.chat_id = settings.TELEGRAM_CHAT_ID
+        self.api_url = settings.TELEGRAM_API_URL
+        self.destinations = self._parse_destinations(self.chat_id)
 
         if not self.token or not self.chat_id:
             logger.warning("Configuration Telegram manquante. Les alertes ne seront pas envoyées.")
 
+    @staticmethod
+    def _parse_destinations(raw: str) -> List[Tuple[str, str]]:
+        # "chat_id[:template],..." : each chat receives the alerts rendered with its own template.
+        destinations = []
+        for entry in (raw or "").split(","):
+            chat_id, _, template = entry.strip().partition(":")
+            if not chat_id:
+                continue
+            template = template or "full"
+            if template not in TEMPLATE_NAMES - {"log"}:
+                raise ConfigurationError("TELEGRAM_CHAT_ID", f"Template inconnu '{template}' pour le chat {chat_id}")
+            destinations.append((chat_id, template))
+        return destinations
+
     def send_trade_alert(self, fill: Dict[str, Any], user_addr: str):
-        if not self.token or not self.chat_id:
-            return
+        self.send_alert(fill_alert(fill, user_addr))
 
-        message = self._format_fill_message(fill, user_addr)
-        self._send_message(message)
+    def send_rule_alert(self, rule: Dict[str, Any], value: float):
+        self.send_alert(rule_alert(rule, value))
 
-    def _format_fill_message(self, fill: Dict[str, Any], user_addr: str) -> str:
-        coin = fill.get('coin', 'UNKNOWN')
-        price = fill.get('px', '?')
-        size = fill.get('sz', '?')
-        side = fill.get('side', '') # 'B' = Buy, 'A' = Ask
-        closed_pnl = fill.get('closedPnl', '0.0')
+    def send_alert(self, alert: Alert):
+        if not self.token or not self.destinations:
+            return
 
-        if side == 'B':
-            header = "🟢 <b>ACHAT (Long/Buy)</b>"
-        elif side == 'A':
-            header = "🔴 <b>VENTE (Short/Sell)</b>"
-        else:
-            header = f"⚪ <b>{side}</b>"
+        # One unreachable chat (bad id, bot removed, retries exhausted) must not deprive the others.
+        for chat_id, template in self.destinations:
+            try:
+                self._send_message(alert.text(template), chat_id)
+            except Exception as e:
+                logger.error(f"Alerte non envoyée au chat {chat_id}: {e}")
 
-        short_addr = f"{user_addr[:6]}...{user_addr[-4:]}" if user_addr else "N/A"
-    
+    def _format_fill_message(self, fill: Dict[str, Any], user_addr: str) -> str:
+        return fill_alert(fill, user_addr).text()
 
-        return (
-            f"{header} | {coin}\n"
-            f"👤 <code>{short_addr}</code>\n"
-            f"💰 Prix : <b>{price} $</b>\n"
-            f"📊 Taille : {size}\n"
-            f"💵 PnL réalisé : {closed_pnl} $"
-        )
+    def _format_rule_message(self, rule: Dict[str, Any], value: float) -> str:
+        return rule_alert(rule, value).text()
 
     @retry(
         stop=stop_after_attempt(3),
@@ -64,10 +73,10 @@ class TelegramService:
         )),
         before_sleep=before_sleep_log(logger, logging.WARNING)
     )
-    def _send_message(self, message_text: str):
-        url = f"https://api.telegram.org/bot{self.token}/sendMessage"
+    def _send_message(self, message_text: str, chat_id: Optional[str] = None):
+        url = f"{self.api_url}/bot{self.token}/sendMessage"
         payload = {
-            "chat_id": self.chat_id,
+            "chat_id": chat_id or self.chat_id,
             "text": message_text,
             "parse_mode": "HTML",
             "disable_web_page_preview": True
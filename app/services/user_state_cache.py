@@ -0,0 +1,283 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+from app.core.logger import setup_logger
+from app.services.hyperliquid_service import HyperliquidService, hyperliquid_service
+from app.services.resilience import LatencyTracker
+from app.services.shared_cache import SharedCache, shared_cache
+
+logger = setup_logger(__name__)
+
+SCHEDULER_TICK = 0.05
+REFRESH_WORKERS = 4
+MIN_LEAD_FACTOR = 2.0
+MAX_LEAD_FACTOR = 16.0
+
+
+class AccessTracker:
+    """
+    Request counts per address, decayed exponentially: a count halves after
+    `half_life` seconds without requests. Only the `capacity` most requested
+    addresses are kept.
+    """
+
+    def __init__(self, half_life: float, capacity: int):
+        self.half_life = half_life
+        self.capacity = capacity
+        self._scores: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, at: float, now: float) -> float:
+        return score * 0.5 ** ((now - at) / self.half_life)
+
+    def hit(self, key: str, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            score, at = self._scores.get(key, (0.0, now))
+            score = self._decayed(score, at, now) + 1.0
+            self._scores[key] = (score, now)
+            # Pruned in batches so that the sort is amortized over `capacity` new addresses.
+            if len(self._scores) > 2 * self.capacity:
+                ranked = sorted(self._scores.items(), key=lambda item: self._decayed(*item[1], now), reverse=True)
+                self._scores = dict(ranked[:self.capacity])
+        return score
+
+    def score(self, key: str, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        entry = self._scores.get(key)
+        return self._decayed(entry[0], entry[1], now) if entry else 0.0
+
+
+class UserStateCache:
+    """
+    Stale-while-revalidate cache of `user_state` for addresses the state engine does not watch.
+
+    A value younger than `ttl` is served as is. Up to `max_stale` seconds past its
+    TTL it is still served immediately while a refresh runs in the background;
+    beyond that the request waits for Hyperliquid. Addresses requested at least
+    `min_hits` times per `half_life` are refreshed ahead of expiry by a scheduler
+    limited to `refresh_budget` upstream calls per second (split between API
+    workers), hottest first. The lead time follows the observed refresh latency and
+    grows whenever a hot address is still served stale.
+    """
+
+    def __init__(
+        self,
+        service: HyperliquidService,
+        ttl: float = settings.USER_STATE_CACHE_TTL,
+        max_stale: float = settings.USER_STATE_MAX_STALE,
+        refresh_budget: float = settings.USER_STATE_REFRESH_BUDGET,
+        hot_keys: int = settings.USER_STATE_HOT_KEYS,
+        min_hits: float = settings.USER_STATE_HOT_MIN_HITS,
+        half_life: float = settings.USER_STATE_HOT_HALF_LIFE,
+        max_entries: int = settings.USER_STATE_CACHE_MAX_ENTRIES,
+        workers: int = settings.API_WORKERS,
+        shared: Optional[SharedCache] = None,
+        enabled: bool = settings.USER_STATE_SWR_ENABLED,
+    ):
+        self.service = service
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.refresh_rate = refresh_budget / max(workers, 1)
+        self.min_hits = min_hits
+        self.max_entries = max_entries
+        self.shared = shared if shared is not None and shared.enabled else None
+        self.enabled = enabled and ttl > 0
+
+        self.access = AccessTracker(half_life, hot_keys)
+        self.latency = LatencyTracker()
+        self.lead_factor = MIN_LEAD_FACTOR
+        self.metrics = {"hits": 0, "stale": 0, "misses": 0, "refreshes": 0, "hot_misses": 0, "deferred": 0}
+
+        self.entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._due: List[Tuple[float, str, float]] = []
+        self._urgent: "OrderedDict[str, None]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._tokens = max(self.refresh_rate, 1.0)
+        self._tokens_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.running = False
+
+    def start(self):
+        if self.running or not self.enabled:
+            return
+        self.running = True
+        self._executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="ustate-refresh")
+        threading.Thread(target=self._scheduler, daemon=True).start()
+        logger.info(f"✓ Cache user_state actif (TTL {self.ttl}s, {self.refresh_rate:g} rafraîchissement(s)/s)")
+
+    def stop(self):
+        self.running = False
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def lead(self) -> float:
+        """How long before expiry a hot address is refreshed."""
+        p95 = self.latency.percentile(0.95) or 0.0
+        return min(self.lead_factor * p95 + 2 * SCHEDULER_TICK, self.ttl / 2)
+
+    def get(self, address: str) -> Tuple[Optional[Dict[str, Any]], float, str]:
+        """Returns `(state, age, cache status)`, the status being HIT, STALE or MISS."""
+        key = address.lower()
+        score = self.access.hit(key)
+        entry = self._get_entry(key)
+        if entry is not None:
+            fetched_at, state = entry
+            age = max(time.time() - fetched_at, 0.0)
+            if age <= self.ttl:
+                self.metrics["hits"] += 1
+                return state, age, "HIT"
+            if age <= self.ttl + self.max_stale:
+                self.metrics["stale"] += 1
+                if score >= self.min_hits:
+                    self._hot_missed()
+                with self._lock:
+                    self._urgent[key] = None
+                return state, age, "STALE"
+
+        self.metrics["misses"] += 1
+        if entry is not None and score >= self.min_hits:
+            self._hot_missed()
+        state, age = self._load(key, address)
+        return state, age, "MISS"
+
+    def _hot_missed(self):
+        # A hot address outlived its TTL: refresh earlier from now on.
+        self.metrics["hot_misses"] += 1
+        self.lead_factor = min(self.lead_factor * 1.5, MAX_LEAD_FACTOR)
+
+    def _get_entry(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        if self.shared is None or (entry is not None and time.time() - entry[0] <= self.ttl):
+            return entry
+        return self._adopt_shared(key, entry) or entry
+
+    def _adopt_shared(
+        self, key: str, entry: Optional[Tuple[float, Dict[str, Any]]]
+    ) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """Takes the copy published by another worker if it is newer than `entry`."""
+        shared_entry = self.shared.table.get(f"ustate:{key}", max_age=self.ttl + self.max_stale)
+        if shared_entry is None:
+            return None
+        raw, stored_at = shared_entry
+        if entry is not None and stored_at <= entry[0]:
+            return None
+        state = orjson.loads(raw)
+        self._store(key, state, stored_at, publish=False)
+        return stored_at, state
+
+    def _load(self, key: str, address: str) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Fetches the state from Hyperliquid; concurrent loads of an address share one call."""
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            start = time.monotonic()
+            state, age = self.service.fetch_user_state(address)
+            if age == 0:
+                self.latency.record(time.monotonic() - start)
+            if state:
+                self._store(key, state, time.time() - age, publish=age == 0)
+            future.set_result((state, age))
+            return state, age
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _store(self, key: str, state: Dict[str, Any], fetched_at: float, publish: bool):
+        with self._lock:
+            self.entries[key] = (fetched_at, state)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            heapq.heappush(self._due, (fetched_at + self.ttl, key, fetched_at))
+        if publish and self.shared is not None:
+            self.shared.put_json(f"ustate:{key}", state)
+
+    def _take_token(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(max(self.refresh_rate, 1.0), self._tokens + (now - self._tokens_at) * self.refresh_rate)
+        self._tokens_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _scheduler(self):
+        while self.running:
+            time.sleep(SCHEDULER_TICK)
+            try:
+                self._schedule()
+            except Exception as e:
+                logger.error(f"Erreur du planificateur user_state: {e}")
+
+    def _schedule(self):
+        now = time.time()
+        horizon = now + self.lead()
+        due = []
+        with self._lock:
+            urgent = list(self._urgent)
+            self._urgent.clear()
+            while self._due and self._due[0][0] <= horizon:
+                item = heapq.heappop(self._due)
+                entry = self.entries.get(item[1])
+                # Entries refreshed or evicted since they were queued are skipped.
+                if entry is not None and entry[0] == item[2]:
+                    due.append(item)
+
+        # Addresses served stale first, then hot addresses about to expire, hottest first.
+        # Cold ones are left to expire and are fetched again on their next request.
+        mono = time.monotonic()
+        hot = [item for item in due if self.access.score(item[1], mono) >= self.min_hits]
+        hot.sort(key=lambda item: self.access.score(item[1], mono), reverse=True)
+        for key in urgent + [item[1] for item in hot]:
+            if key in self._inflight:
+                continue
+            if not self._take_token():
+                self.metrics["deferred"] += 1
+                with self._lock:
+                    if key in urgent:
+                        self._urgent[key] = None
+                    else:
+                        entry = self.entries.get(key)
+                        if entry is not None:
+                            heapq.heappush(self._due, (entry[0] + self.ttl, key, entry[0]))
+                continue
+            self._executor.submit(self._refresh, key)
+
+    def _refresh(self, key: str):
+        try:
+            if self.shared is not None:
+                with self._lock:
+                    entry = self.entries.get(key)
+                adopted = self._adopt_shared(key, entry)
+                if adopted is not None and time.time() - adopted[0] < self.ttl - self.lead():
+                    return
+            self.metrics["refreshes"] += 1
+            self._load(key, key)
+            self.lead_factor = max(self.lead_factor * 0.99, MIN_LEAD_FACTOR)
+        except Exception as e:
+            logger.warning(f"Rafraîchissement impossible pour {key[:10]}...: {e}")
+
+
+user_state_cache = UserStateCache(hyperliquid_service, shared=shared_cache)
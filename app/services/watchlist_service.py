@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+from typing import List, Optional
+
+from eth_utils import is_address, to_checksum_address
+
+from app.core.config import settings
+from app.core.exceptions import InvalidAddressError
+from app.core.logger import setup_logger
+from app.services.file_lock import locked_file
+
+logger = setup_logger(__name__)
+
+
+class WatchlistService:
+    """
+    Desired set of watched addresses, persisted as a JSON file.
+
+    The file is the hand-off between the admin API and the listener process:
+    the API rewrites it atomically under a file lock shared by the API workers,
+    the listener watches its modification time.
+    It is seeded from USERS_LISTENED when it does not exist yet.
+    """
+
+    def __init__(self, path: str = settings.WATCHLIST_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+
+    def get(self) -> List[str]:
+        if not os.path.exists(self.path):
+            return list(settings.USERS_LISTENED)
+
+        try:
+            with open(self.path) as f:
+                addresses = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Watchlist illisible ({self.path}): {e}. Utilisation de USERS_LISTENED.")
+            return list(settings.USERS_LISTENED)
+
+        return [to_checksum_address(addr) for addr in addresses if is_address(addr)]
+
+    def add(self, addresses: List[str]) -> List[str]:
+        new_addresses = self._validate(addresses)
+        with locked_file(self.path, self._lock):
+            current = self.get()
+            known = {addr.lower() for addr in current}
+            current.extend(addr for addr in new_addresses if addr.lower() not in known)
+            self._write(current)
+        return current
+
+    def remove(self, addresses: List[str]) -> List[str]:
+        removed = {addr.lower() for addr in self._validate(addresses)}
+        with locked_file(self.path, self._lock):
+            current = [addr for addr in self.get() if addr.lower() not in removed]
+            self._write(current)
+        return current
+
+    def has_changed(self) -> bool:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        return True
+
+    def _validate(self, addresses: List[str]) -> List[str]:
+        for addr in addresses:
+            if not is_address(addr):
+                raise InvalidAddressError(addr, "Doit être une adresse Ethereum valide (format 0x...)")
+        return [to_checksum_address(addr) for addr in addresses]
+
+    def _write(self, addresses: List[str]):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(addresses, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+watchlist_service = WatchlistService()
@@ -0,0 +1,7 @@
+"""
+Local Hyperliquid simulator.
+
+This module contains an offline stand-in for the Hyperliquid REST (`/info`,
+`/exchange`) and WebSocket (`userFills`, `l2Book`, `allMids`) APIs, used for
+load and latency benchmarks of the gateway.
+"""
@@ -0,0 +1,192 @@
+import itertools
+import random
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Coins listed by the simulator: (name, szDecimals, initial mid)
+DEFAULT_COINS = [
+    ("BTC", 5, 100_000.0),
+    ("ETH", 4, 3_500.0),
+    ("SOL", 2, 180.0),
+    ("HYPE", 2, 30.0),
+]
+BOOK_LEVELS = 20
+BOOK_TICK = 0.0001
+MAX_RECENT_FILLS = 2000
+FEE_RATE = 0.00045
+
+
+class SimulatedMarket:
+    """
+    In-memory market state of the simulator: mid prices following a random walk,
+    synthetic L2 books around them, and per-user positions built from fills.
+    """
+
+    def __init__(self, coins: Optional[List[Tuple[str, int, float]]] = None, seed: Optional[int] = None):
+        self.random = random.Random(seed)
+        self.coins = [name for name, _, _ in (coins or DEFAULT_COINS)]
+        self.sz_decimals = {name: decimals for name, decimals, _ in (coins or DEFAULT_COINS)}
+        self.mids = {name: mid for name, _, mid in (coins or DEFAULT_COINS)}
+        self.positions: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(dict)
+        self.fills: Dict[str, Deque[Dict[str, Any]]] = defaultdict(lambda: deque(maxlen=MAX_RECENT_FILLS))
+        self._oids = itertools.count(1)
+        self._tids = itertools.count(1)
+
+    # ---------- Info ----------
+
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "universe": [
+                {"name": name, "szDecimals": self.sz_decimals[name], "maxLeverage": 50}
+                for name in self.coins
+            ]
+        }
+
+    def spot_meta(self) -> Dict[str, Any]:
+        return {"universe": [], "tokens": []}
+
+    def all_mids(self) -> Dict[str, str]:
+        return {coin: self._fmt_px(mid) for coin, mid in self.mids.items()}
+
+    def l2_book(self, coin: str) -> Optional[Dict[str, Any]]:
+        mid = self.mids.get(coin)
+        if mid is None:
+            return None
+        bids = []
+        asks = []
+        for i in range(1, BOOK_LEVELS + 1):
+            size = self._fmt_sz(coin, self.random.uniform(0.5, 5.0) * 10_000 / mid)
+            bids.append({"px": self._fmt_px(mid * (1 - i * BOOK_TICK)), "sz": size, "n": self.random.randint(1, 10)})
+            asks.append({"px": self._fmt_px(mid * (1 + i * BOOK_TICK)), "sz": size, "n": self.random.randint(1, 10)})
+        return {"coin": coin, "time": self._now_ms(), "levels": [bids, asks]}
+
+    def user_state(self, user: str) -> Dict[str, Any]:
+        asset_positions = []
+        total_ntl = 0.0
+        unrealized = 0.0
+        for coin, position in self.positions[user.lower()].items():
+            mid = self.mids[coin]
+            szi = position["szi"]
+            pnl = szi * (mid - position["entryPx"])
+            total_ntl += abs(szi) * mid
+            unrealized += pnl
+            asset_positions.append({
+                "type": "oneWay",
+                "position": {
+                    "coin": coin,
+                    "szi": self._fmt_sz(coin, szi),
+                    "entryPx": self._fmt_px(position["entryPx"]),
+                    "positionValue": f"{abs(szi) * mid:.2f}",
+                    "unrealizedPnl": f"{pnl:.2f}",
+                    "leverage": {"type": "cross", "value": 10},
+                },
+            })
+        account_value = 100_000.0 + unrealized
+        summary = {
+            "accountValue": f"{account_value:.2f}",
+            "totalNtlPos": f"{total_ntl:.2f}",
+            "totalRawUsd": f"{account_value - total_ntl:.2f}",
+            "totalMarginUsed": f"{total_ntl / 10:.2f}",
+        }
+        return {
+            "marginSummary": summary,
+            "crossMarginSummary": dict(summary),
+            "crossMaintenanceMarginUsed": f"{total_ntl / 20:.2f}",
+            "withdrawable": f"{max(account_value - total_ntl / 10, 0):.2f}",
+            "assetPositions": asset_positions,
+            "time": self._now_ms(),
+        }
+
+    def user_fills(self, user: str) -> List[Dict[str, Any]]:
+        return list(reversed(self.fills[user.lower()]))
+
+    # ---------- Trading ----------
+
+    def step(self, volatility: float = 0.0005):
+        for coin in self.coins:
+            self.mids[coin] *= 1 + self.random.gauss(0, volatility)
+
+    def execute_order(self, user: str, order: Dict[str, Any], fill_rate: float) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Execute one order wire. Returns (status, fill or None)."""
+        asset = order.get("a")
+        if not isinstance(asset, int) or not 0 <= asset < len(self.coins):
+            return {"error": f"Invalid asset {asset}"}, None
+
+        coin = self.coins[asset]
+        is_buy = bool(order.get("b"))
+        limit_px = float(order.get("p", 0))
+        size = float(order.get("s", 0))
+        mid = self.mids[coin]
+        px = mid * (1 + BOOK_TICK) if is_buy else mid * (1 - BOOK_TICK)
+
+        crosses = limit_px >= px if is_buy else limit_px <= px
+        if not crosses or self.random.random() >= fill_rate:
+            return {"error": "Order could not immediately match against any resting orders. asset=%d" % asset}, None
+
+        fill = self._apply_fill(user, coin, is_buy, px, size)
+        return {"filled": {"totalSz": fill["sz"], "avgPx": fill["px"], "oid": fill["oid"]}}, fill
+
+    def random_fill(self, user: str) -> Dict[str, Any]:
+        coin = self.random.choice(self.coins)
+        mid = self.mids[coin]
+        size = float(self._fmt_sz(coin, self.random.uniform(0.1, 2.0) * 1_000 / mid)) or 10 ** -self.sz_decimals[coin]
+        return self._apply_fill(user, coin, self.random.random() < 0.5, mid, size)
+
+    def _apply_fill(self, user: str, coin: str, is_buy: bool, px: float, size: float) -> Dict[str, Any]:
+        user = user.lower()
+        position = self.positions[user].get(coin, {"szi": 0.0, "entryPx": 0.0})
+        start = position["szi"]
+        signed = size if is_buy else -size
+        end = start + signed
+
+        closed_pnl = 0.0
+        if start and (start > 0) != (signed > 0):
+            closed = min(abs(start), size)
+            closed_pnl = closed * (px - position["entryPx"]) * (1 if start > 0 else -1)
+
+        if abs(end) < 1e-12:
+            self.positions[user].pop(coin, None)
+        else:
+            if not start or (start > 0) == (signed > 0):
+                entry = (abs(start) * position["entryPx"] + size * px) / abs(end)
+            elif (start > 0) == (end > 0):
+                entry = position["entryPx"]
+            else:
+                entry = px
+            self.positions[user][coin] = {"szi": end, "entryPx": entry}
+
+        if start == 0 or (start > 0) == (signed > 0):
+            direction = "Open Long" if is_buy else "Open Short"
+        else:
+            direction = "Close Short" if is_buy else "Close Long"
+
+        fill = {
+            "coin": coin,
+            "px": self._fmt_px(px),
+            "sz": self._fmt_sz(coin, size),
+            "side": "B" if is_buy else "A",
+            "time": self._now_ms(),
+            "startPosition": self._fmt_sz(coin, start),
+            "dir": direction,
+            "closedPnl": f"{closed_pnl:.6f}",
+            "hash": "0x" + self.random.getrandbits(256).to_bytes(32, "big").hex(),
+            "oid": next(self._oids),
+            "crossed": True,
+            "fee": f"{abs(size * px) * FEE_RATE:.6f}",
+            "tid": next(self._tids),
+            "feeToken": "USDC",
+        }
+        self.fills[user].append(fill)
+        return fill
+
+    def _fmt_sz(self, coin: str, size: float) -> str:
+        return f"{size:.{self.sz_decimals[coin]}f}"
+
+    @staticmethod
+    def _fmt_px(px: float) -> str:
+        return f"{float(f'{px:.5g}'):.6f}".rstrip("0").rstrip(".")
+
+    @staticmethod
+    def _now_ms() -> int:
+        return int(time.time() * 1000)
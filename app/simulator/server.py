@@ -0,0 +1,207 @@
+import asyncio
+import random
+from typing import Any, Dict, List, Optional, Set
+
+from eth_keys import keys
+from eth_utils import to_checksum_address
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+from app.core.logger import setup_logger
+from app.services.l1_signer import l1_action_digest
+from app.simulator.market import SimulatedMarket, DEFAULT_COINS
+
+logger = setup_logger(__name__)
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+class SimulatorConfig(BaseModel):
+    latency_ms: float = Field(default=0.0, ge=0, description="Latence ajoutée à chaque requête REST")
+    jitter_ms: float = Field(default=0.0, ge=0, description="Variation aléatoire de la latence (uniforme)")
+    error_rate: float = Field(default=0.0, ge=0, le=1, description="Probabilité d'une erreur 500 simulée")
+    fill_rate: float = Field(default=1.0, ge=0, le=1, description="Probabilité qu'un ordre marketable soit exécuté")
+    book_interval: float = Field(default=0.5, gt=0, description="Intervalle de publication des carnets l2Book (s)")
+    fill_stream_rate: float = Field(default=0.0, ge=0, description="Fills synthétiques poussés par seconde et par utilisateur abonné")
+    coins: List[str] = Field(default_factory=lambda: [name for name, _, _ in DEFAULT_COINS])
+    seed: Optional[int] = None
+
+
+class FillBroadcaster:
+    """Fan-out of fills to the WebSocket connections subscribed to `userFills`."""
+
+    def __init__(self):
+        self.subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, user: str, queue: asyncio.Queue):
+        self.subscribers.setdefault(user.lower(), set()).add(queue)
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        for queues in self.subscribers.values():
+            queues.discard(queue)
+
+    def publish(self, user: str, fill: Dict[str, Any]):
+        message = {"channel": "userFills", "data": {"user": user.lower(), "fills": [fill]}}
+        for queue in self.subscribers.get(user.lower(), ()):
+            queue.put_nowait(message)
+
+
+def recover_signer(action: Dict[str, Any], nonce: int, signature: Dict[str, Any], vault_address: Optional[str]) -> str:
+    """Address that signed an L1 action (testnet domain, as the SDK uses for non-mainnet URLs)."""
+    digest = l1_action_digest(action, vault_address, nonce, False)
+    v = int(signature["v"])
+    signature = keys.Signature(vrs=(v - 27 if v >= 27 else v, int(signature["r"], 16), int(signature["s"], 16)))
+    return signature.recover_public_key_from_msg_hash(digest).to_checksum_address()
+
+
+def create_simulator_app(config: Optional[SimulatorConfig] = None) -> FastAPI:
+    """
+    Build a local stand-in for the Hyperliquid `/info`, `/exchange` and `/ws` endpoints.
+
+    Point `HYPERLIQUID_API_URL` at it to run the gateway and the listener offline.
+    """
+    config = config or SimulatorConfig()
+    coins = [coin for coin in DEFAULT_COINS if coin[0] in config.coins]
+    market = SimulatedMarket(coins, seed=config.seed)
+    rng = random.Random(config.seed)
+    broadcaster = FillBroadcaster()
+
+    app = FastAPI(title="Hyperliquid Simulator", docs_url=None, redoc_url=None)
+    app.state.config = config
+    app.state.market = market
+    app.state.broadcaster = broadcaster
+
+    async def simulate_network() -> Optional[JSONResponse]:
+        delay = config.latency_ms + rng.uniform(0, config.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if config.error_rate and rng.random() < config.error_rate:
+            return JSONResponse(status_code=500, content={"error": "Simulated upstream error"})
+        return None
+
+    @app.post("/info")
+    async def info(request: Request):
+        error = await simulate_network()
+        if error:
+            return error
+
+        body = await request.json()
+        request_type = body.get("type")
+        if request_type == "meta":
+            return market.meta()
+        if request_type == "spotMeta":
+            return market.spot_meta()
+        if request_type == "allMids":
+            return market.all_mids()
+        if request_type == "l2Book":
+            return market.l2_book(body.get("coin", ""))
+        if request_type == "clearinghouseState":
+            return market.user_state(body.get("user", ""))
+        if request_type == "userFills":
+            return market.user_fills(body.get("user", ""))
+        if request_type in ("openOrders", "frontendOpenOrders"):
+            return []
+        return JSONResponse(status_code=422, content={"error": f"Unsupported info type: {request_type}"})
+
+    @app.post("/exchange")
+    async def exchange(request: Request):
+        error = await simulate_network()
+        if error:
+            return error
+
+        body = await request.json()
+        action = body.get("action") or {}
+        vault_address = body.get("vaultAddress")
+        try:
+            signer = recover_signer(action, int(body["nonce"]), body["signature"], vault_address)
+        except Exception as e:
+            return {"status": "err", "response": f"Invalid signature: {e}"}
+        user = to_checksum_address(vault_address) if vault_address else signer
+
+        if action.get("type") != "order":
+            return {"status": "ok", "response": {"type": "default"}}
+
+        statuses = []
+        for order in action.get("orders", []):
+            status, fill = market.execute_order(user, order, config.fill_rate)
+            statuses.append(status)
+            if fill:
+                broadcaster.publish(user, fill)
+        return {"status": "ok", "response": {"type": "order", "data": {"statuses": statuses}}}
+
+    @app.websocket("/ws")
+    async def websocket(ws: WebSocket):
+        await ws.accept()
+        await ws.send_text("Websocket connection established.")
+
+        outbox: asyncio.Queue = asyncio.Queue()
+        books: Set[str] = set()
+        users: Set[str] = set()
+        tasks = [
+            asyncio.create_task(_send_loop(ws, outbox)),
+            asyncio.create_task(_book_loop(outbox, books, config.book_interval)),
+        ]
+        if config.fill_stream_rate > 0:
+            tasks.append(asyncio.create_task(_fill_stream_loop(users, config.fill_stream_rate)))
+
+        try:
+            while True:
+                message = await ws.receive_json()
+                method = message.get("method")
+                if method == "ping":
+                    outbox.put_nowait({"channel": "pong"})
+                    continue
+
+                subscription = message.get("subscription") or {}
+                if method == "subscribe":
+                    _subscribe(subscription, outbox, books, users)
+                elif method == "unsubscribe":
+                    books.discard(subscription.get("coin"))
+                    users.discard((subscription.get("user") or "").lower())
+                outbox.put_nowait({"channel": "subscriptionResponse", "data": message})
+        except WebSocketDisconnect:
+            pass
+        finally:
+            broadcaster.unsubscribe(outbox)
+            for task in tasks:
+                task.cancel()
+
+    def _subscribe(subscription: Dict[str, Any], outbox: asyncio.Queue, books: Set[str], users: Set[str]):
+        subscription_type = subscription.get("type")
+        if subscription_type == "l2Book":
+            books.add(subscription.get("coin"))
+        elif subscription_type == "allMids":
+            books.add("*")
+        elif subscription_type == "userFills":
+            user = (subscription.get("user") or ZERO_ADDRESS).lower()
+            users.add(user)
+            broadcaster.subscribe(user, outbox)
+            outbox.put_nowait({
+                "channel": "userFills",
+                "data": {"user": user, "fills": market.user_fills(user), "isSnapshot": True}
+            })
+
+    async def _send_loop(ws: WebSocket, outbox: asyncio.Queue):
+        while True:
+            await ws.send_json(await outbox.get())
+
+    async def _book_loop(outbox: asyncio.Queue, books: Set[str], interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            market.step()
+            for coin in list(books):
+                if coin == "*":
+                    outbox.put_nowait({"channel": "allMids", "data": {"mids": market.all_mids()}})
+                    continue
+                book = market.l2_book(coin)
+                if book:
+                    outbox.put_nowait({"channel": "l2Book", "data": book})
+
+    async def _fill_stream_loop(users: Set[str], rate: float):
+        while True:
+            await asyncio.sleep(rng.expovariate(rate))
+            for user in list(users):
+                broadcaster.publish(user, market.random_fill(user))
+
+    return app
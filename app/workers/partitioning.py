@@ -0,0 +1,52 @@
+import bisect
+import hashlib
+from typing import Dict, Iterable, List
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping addresses to listener workers.
+
+    Each worker owns `replicas` virtual points on the ring, so adding or removing
+    a worker only moves the addresses that fall next to its points
+    (about 1/N of them) instead of reshuffling everything.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 128):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+        for node in nodes:
+            self.add_node(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return sorted(set(self._owners.values()))
+
+    def add_node(self, node: str):
+        for i in range(self.replicas):
+            point = _hash(f"{node}#{i}")
+            if point in self._owners:
+                continue
+            self._owners[point] = node
+            bisect.insort(self._points, point)
+
+    def remove_node(self, node: str):
+        self._points = [point for point in self._points if self._owners[point] != node]
+        self._owners = {point: owner for point, owner in self._owners.items() if owner != node}
+
+    def owner(self, key: str) -> str:
+        if not self._points:
+            raise ValueError("Aucun worker dans l'anneau de hachage")
+        index = bisect.bisect(self._points, _hash(key.lower())) % len(self._points)
+        return self._owners[self._points[index]]
+
+    def partition(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        partitions: Dict[str, List[str]] = {node: [] for node in self.nodes}
+        for key in keys:
+            partitions[self.owner(key)].append(key)
+        return partitions
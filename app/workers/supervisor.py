@@ -0,0 +1,139 @@
+import multiprocessing
+import queue
+import signal
+import time
+from typing import Dict, List, Optional
+
+from app.core.logger import setup_logger
+from app.workers.partitioning import HashRing
+
+logger = setup_logger(__name__)
+
+INITIAL_RESTART_DELAY = 1
+MAX_RESTART_DELAY = 60
+# A worker that stayed up this long before stopping is restarted without backoff.
+HEALTHY_UPTIME = 300
+MONITOR_INTERVAL = 1
+METRICS_LOG_INTERVAL = 60
+
+
+def run_worker(worker_id: str, worker_ids: List[str], metrics_queue):
+    # Imported in the child so that each worker builds its own clients and threads.
+    from app.workers.trades_listener import TradesListener
+
+    listener = TradesListener(worker_id=worker_id, ring=HashRing(worker_ids), metrics_queue=metrics_queue)
+    listener.start()
+
+
+class ListenerSupervisor:
+    """
+    Runs N TradesListener processes, each owning the slice of the watch list
+    assigned to it by a consistent hash ring.
+
+    Crashed workers are restarted with exponential backoff, reset once a worker
+    has run for HEALTHY_UPTIME, and the metrics they report are merged into a
+    single view.
+    """
+
+    def __init__(self, num_workers: int):
+        self.worker_ids = [f"worker-{i}" for i in range(num_workers)]
+        self.metrics_queue = multiprocessing.Queue()
+        self.processes: Dict[str, multiprocessing.Process] = {}
+        self.restart_counts: Dict[str, int] = {worker_id: 0 for worker_id in self.worker_ids}
+        self.next_restart: Dict[str, float] = {}
+        self.started_at: Dict[str, float] = {}
+        self.total_restarts = 0
+        self.worker_metrics: Dict[str, Dict[str, int]] = {}
+        self.running = True
+
+    def start(self):
+        logger.info("-----------------------------------------------------")
+        logger.info(f"Démarrage du superviseur ({len(self.worker_ids)} workers)")
+        logger.info("-----------------------------------------------------")
+
+        signal.signal(signal.SIGINT, self._signal_handler)
+        signal.signal(signal.SIGTERM, self._signal_handler)
+
+        for worker_id in self.worker_ids:
+            self._spawn(worker_id)
+
+        last_metrics_log = time.time()
+        while self.running:
+            time.sleep(MONITOR_INTERVAL)
+            self._collect_metrics()
+            self._check_workers()
+
+            if time.time() - last_metrics_log >= METRICS_LOG_INTERVAL:
+                last_metrics_log = time.time()
+                logger.info(f"Métriques agrégées: {self.get_merged_metrics()}")
+
+        self._shutdown()
+
+    def _spawn(self, worker_id: str):
+        process = multiprocessing.Process(
+            target=run_worker,
+            args=(worker_id, self.worker_ids, self.metrics_queue),
+            name=worker_id,
+            daemon=False
+        )
+        process.start()
+        self.processes[worker_id] = process
+        self.started_at[worker_id] = time.time()
+        logger.info(f"  ✓ {worker_id} démarré (pid {process.pid})")
+
+    def _check_workers(self):
+        now = time.time()
+        for worker_id, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+
+            restart_at = self.next_restart.get(worker_id)
+            if restart_at is None:
+                if now - self.started_at.get(worker_id, now) >= HEALTHY_UPTIME:
+                    self.restart_counts[worker_id] = 0
+                self.restart_counts[worker_id] += 1
+                self.total_restarts += 1
+                delay = self._restart_delay(self.restart_counts[worker_id])
+                self.next_restart[worker_id] = now + delay
+                logger.warning(
+                    f"{worker_id} arrêté (code {process.exitcode}), redémarrage dans {delay}s "
+                    f"(tentative {self.restart_counts[worker_id]})"
+                )
+            elif now >= restart_at:
+                del self.next_restart[worker_id]
+                self._spawn(worker_id)
+
+    @staticmethod
+    def _restart_delay(attempt: int) -> float:
+        # The exponent is bounded too, so that a worker crashing for days does not build a huge integer.
+        return min(INITIAL_RESTART_DELAY * 2 ** min(attempt - 1, 16), MAX_RESTART_DELAY)
+
+    def _collect_metrics(self):
+        while True:
+            try:
+                worker_id, metrics = self.metrics_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.worker_metrics[worker_id] = metrics
+
+    def get_merged_metrics(self) -> Dict[str, int]:
+        merged: Dict[str, int] = {}
+        for metrics in self.worker_metrics.values():
+            for key, value in metrics.items():
+                merged[key] = merged.get(key, 0) + value
+        merged["workers_alive"] = sum(1 for p in self.processes.values() if p.is_alive())
+        merged["worker_restarts"] = self.total_restarts
+        return merged
+
+    def _signal_handler(self, sig, frame):
+        logger.info("Signal d'arrêt reçu...")
+        self.running = False
+
+    def _shutdown(self, timeout: Optional[float] = 10):
+        logger.info("Arrêt des workers...")
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes.values():
+            process.join(timeout)
+        logger.info("Superviseur terminé.")
@@ -4,17 +4,23 @@ import os
 import threading
 import queue
 import signal
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 
 from app.core.logger import setup_logger
 from app.services.telegram_service import TelegramService
+from app.services.alert_templates import fill_alert
+from app.services.fill_store_service import fill_store
+from app.services.message_recorder import MessageRecorder
+from app.services.metadata_cache import metadata_cache
+from app.services.subscription_manager import SubscriptionManager
+from app.services.watchlist_service import watchlist_service
+from app.workers.partitioning import HashRing
 from app.core.config import settings
 
 logger = setup_logger(__name__)
 
 try:
     from hyperliquid.info import Info
-    from hyperliquid.utils import constants
 except ImportError as e:
     logger.critical(f"Erreur d'importation : {e}. Vérifiez votre PYTHONPATH.")
     sys.exit(1)
@@ -24,13 +30,26 @@ INITIAL_RECONNECT_DELAY = 1
 MAX_RECONNECT_DELAY = 60
 HEARTBEAT_INTERVAL = 30
 HEARTBEAT_TIMEOUT = 90
+METRICS_INTERVAL = 10
 
 class TradesListener:
-    def __init__(self):
-        self.users_list = settings.USERS_LISTENED
+    def __init__(self, worker_id: Optional[str] = None, ring: Optional[HashRing] = None, metrics_queue: Optional[Any] = None):
+        self.worker_id = worker_id
+        self.ring = ring
+        self.metrics_queue = metrics_queue
+        self.metrics: Dict[str, int] = {
+            "messages_received": 0,
+            "fills_received": 0,
+            "notifications_sent": 0,
+            "notification_errors": 0,
+            "reconnects": 0,
+        }
+
+        self.users_list = self._owned_addresses(watchlist_service.get())
         
         self.info_client: Optional[Info] = None
         self.subscriptions: Dict[str, int] = {}
+        self.subscription_manager = SubscriptionManager(self.subscriptions, "userFills", self._on_message_received)
         self.msg_queue = queue.Queue()
         self.running = True
         self.connected = False
@@ -39,20 +58,45 @@ class TradesListener:
         self.last_message_time = time.time()
         
         self.telegram_service = TelegramService()
+        self.recorder = MessageRecorder(self._record_path()) if settings.LISTENER_RECORD_PATH else None
         self.notification_thread = threading.Thread(target=self._notification_worker, daemon=True)
         self.heartbeat_thread = threading.Thread(target=self._heartbeat_monitor, daemon=True)
+        self.watchlist_thread = threading.Thread(target=self._watchlist_monitor, daemon=True)
+        self.metrics_thread = threading.Thread(target=self._metrics_reporter, daemon=True)
+
+    def _owned_addresses(self, addresses: List[str]) -> List[str]:
+        if self.ring is None or self.worker_id is None:
+            return addresses
+        return [addr for addr in addresses if self.ring.owner(addr) == self.worker_id]
+
+    def _record_path(self) -> str:
+        # One recording per worker process: they would otherwise interleave frames.
+        if self.worker_id is None:
+            return settings.LISTENER_RECORD_PATH
+        root, ext = os.path.splitext(settings.LISTENER_RECORD_PATH)
+        return f"{root}.{self.worker_id}{ext}"
 
     def start(self):
         logger.info("-----------------------------------------------------")
         logger.info("Démarrage du Listener")
         logger.info("-----------------------------------------------------")
 
-        if not self.users_list:
+        if not self.users_list and not settings.WATCHLIST_WATCH_FILE:
             logger.error("Aucune adresse trouvée dans USERS_LISTENED.")
             return
 
+        if settings.FILL_STORE_ENABLED:
+            fill_store.start()
+        if self.recorder:
+            self.recorder.start()
+        metadata_cache.start()
+
         self.notification_thread.start()
         self.heartbeat_thread.start()
+        if settings.WATCHLIST_WATCH_FILE:
+            self.watchlist_thread.start()
+        if self.metrics_queue is not None:
+            self.metrics_thread.start()
 
         if not self._connect():
             logger.error("Impossible de se connecter initialement. Abandon.")
@@ -63,21 +107,13 @@ class TradesListener:
     def _connect(self) -> bool:
         try:
             logger.info("Connexion au WebSocket Hyperliquid...")
-            self.info_client = Info(constants.MAINNET_API_URL, skip_ws=False)
+            meta, spot_meta = metadata_cache.get()
+            self.info_client = Info(settings.HYPERLIQUID_API_URL, skip_ws=False, meta=meta, spot_meta=spot_meta)
             
             logger.info(f"Abonnement aux trades de {len(self.users_list)} adresse(s)...")
-            self.subscriptions.clear()
-            
-            for addr in self.users_list:
-                try:
-                    sub_id = self.info_client.subscribe(
-                        {"type": "userFills", "user": addr},
-                        self._on_message_received
-                    )
-                    self.subscriptions[addr] = sub_id
-                    logger.info(f"  ✓ Abonné: {addr[:10]}...")
-                except Exception as e:
-                    logger.error(f"  ✗ Erreur d'abonnement pour {addr}: {e}")
+            with self.subscription_manager.lock:
+                self.subscriptions.clear()
+                if self.subscription_manager.sync(self.info_client, self.users_list):
                     return False
             
             self.connected = True
@@ -94,6 +130,7 @@ class TradesListener:
     def _reconnect(self):
         while self.running and self.reconnect_count < MAX_RECONNECT_ATTEMPTS:
             self.reconnect_count += 1
+            self.metrics["reconnects"] += 1
             delay = min(
                 INITIAL_RECONNECT_DELAY * (2 ** (self.reconnect_count - 1)),
                 MAX_RECONNECT_DELAY
@@ -137,16 +174,51 @@ class TradesListener:
                 self.connected = False
                 self._reconnect()
 
+    def _watchlist_monitor(self):
+        watchlist_service.has_changed()
+
+        while self.running:
+            time.sleep(settings.WATCHLIST_POLL_INTERVAL)
+
+            if watchlist_service.has_changed():
+                self.update_watchlist(self._owned_addresses(watchlist_service.get()))
+
+    def update_watchlist(self, addresses: List[str]):
+        self.users_list = addresses
+
+        # Without a live connection the new list is applied by the next _connect().
+        if not self.connected or not self.info_client:
+            return
+
+        self.subscription_manager.sync(self.info_client, addresses)
+        logger.info(f"Watchlist mise à jour: {len(self.subscriptions)} abonnement(s) actif(s)")
+
+    def _metrics_reporter(self):
+        while self.running:
+            time.sleep(METRICS_INTERVAL)
+            try:
+                self.metrics_queue.put_nowait((self.worker_id, self.get_metrics()))
+            except Exception as e:
+                logger.debug(f"Envoi des métriques impossible: {e}")
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            **self.metrics,
+            "subscriptions": len(self.subscriptions),
+            "queue_size": self.msg_queue.qsize(),
+        }
+
     def _close_connection(self):
         if not self.info_client:
             return
         
         try:
-            for addr, sub_id in self.subscriptions.items():
-                try:
-                    self.info_client.unsubscribe({"type": "userFills", "user": addr}, sub_id)
-                except Exception:
-                    pass
+            with self.subscription_manager.lock:
+                for addr, sub_id in list(self.subscriptions.items()):
+                    try:
+                        self.info_client.unsubscribe({"type": "userFills", "user": addr}, sub_id)
+                    except Exception:
+                        pass
             
             if hasattr(self.info_client, 'ws_manager') and self.info_client.ws_manager:
                 if hasattr(self.info_client.ws_manager, 'ws'):
@@ -182,6 +254,9 @@ class TradesListener:
         logger.info("Arrêt en cours...")
         
         self._close_connection()
+        fill_store.stop()
+        if self.recorder:
+            self.recorder.stop()
         
         logger.info("Worker terminé.")
         os._exit(0)
@@ -189,6 +264,9 @@ class TradesListener:
     def _on_message_received(self, message: Dict[str, Any]):
         try:
             self.last_message_time = time.time()
+            self.metrics["messages_received"] += 1
+            if self.recorder:
+                self.recorder.append(message)
             
             data = message.get("data") or {}
             
@@ -200,12 +278,11 @@ class TradesListener:
                 fills = data.get("fills", [])
                 
                 if fills:
+                    self.metrics["fills_received"] += len(fills)
+                    if fill_store.running:
+                        fill_store.append(user, fills)
+
                     for fill in fills:
-                        coin = fill.get('coin', 'UNKNOWN')
-                        side = fill.get('side', '')
-                        price = fill.get('px', '?')
-                        size = fill.get('sz', '?')
-                        logger.info(f"[!] Trade détecté pour {user[:8]}... | {side} {coin} | Prix: {price} | Taille: {size}")
                         self.msg_queue.put({"fill": fill, "user": user})
                         
         except Exception as e:
@@ -215,11 +292,16 @@ class TradesListener:
         while self.running:
             try:
                 item = self.msg_queue.get(timeout=1) 
-                
-                self.telegram_service.send_trade_alert(item['fill'], item['user'])
+
+                # The log line and every Telegram destination share one rendering per template.
+                alert = fill_alert(item['fill'], item['user'])
+                logger.info(alert.text("log"))
+                self.telegram_service.send_alert(alert)
+                self.metrics["notifications_sent"] += 1
                 
                 self.msg_queue.task_done()
             except queue.Empty:
                 continue
             except Exception as e:
+                self.metrics["notification_errors"] += 1
                 logger.error(f"Erreur dans le worker de notification: {e}")
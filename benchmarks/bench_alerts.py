@@ -0,0 +1,133 @@
+"""
+Alert engine benchmark: allMids evaluation cost with many rules.
+
+Price rules are spread over the coins of a synthetic allMids feed (thresholds
+around each coin's price) and PnL rules over wallets holding a few positions. Every
+tick moves all mids by a small random walk and is passed to `AlertEngine.on_mids`.
+A linear scan over all rules is measured on the same ticks for comparison.
+
+Usage: python benchmarks/bench_alerts.py [--rules 50000] [--wallets 1000] [--coins 200] [--ticks 2000] [--output results.json]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
+for path in (PROJECT_ROOT, SCRIPT_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
+
+os.environ.setdefault("TRADING_ENABLED", "false")
+
+from harness import latency_stats, write_json
+
+
+def make_ticks(coins: List[str], ticks: int, seed: int) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
+    prices = {coin: rng.uniform(1, 100000) for coin in coins}
+    result = []
+    for _ in range(ticks):
+        for coin in coins:
+            prices[coin] *= 1 + rng.gauss(0, 0.0005)
+        result.append({coin: f"{px:.6g}" for coin, px in prices.items()})
+    return result
+
+
+def make_rules(first_tick: Dict[str, str], n_rules: int, wallets: List[str], seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    coins = list(first_tick)
+    rules = []
+    for i in range(n_rules):
+        coin = rng.choice(coins)
+        threshold = float(first_tick[coin]) * rng.uniform(0.98, 1.02)
+        rules.append({"id": f"p{i}", "type": "price", "coin": coin, "user": None,
+                      "op": rng.choice(("above", "below")), "threshold": threshold})
+    for i, wallet in enumerate(wallets):
+        rules.append({"id": f"w{i}", "type": "pnl", "user": wallet, "coin": None,
+                      "op": "below", "threshold": -rng.uniform(100, 10000)})
+    return rules
+
+
+def linear_scan(rules: List[Dict[str, Any]], previous: Dict[str, float], mids: Dict[str, str]) -> int:
+    fired = 0
+    for rule in rules:
+        if rule["type"] != "price":
+            continue
+        old, new = previous.get(rule["coin"]), float(mids[rule["coin"]])
+        if old is None:
+            continue
+        if rule["op"] == "above" and old < rule["threshold"] <= new:
+            fired += 1
+        elif rule["op"] == "below" and new < rule["threshold"] <= old:
+            fired += 1
+    return fired
+
+
+def run(n_rules: int, n_wallets: int, n_coins: int, n_ticks: int) -> Dict[str, Any]:
+    from app.services.alert_service import AlertEngine, AlertRuleStore
+    from app.services.position_state_service import PositionStateService
+    import app.services.alert_service as alert_service
+
+    coins = [f"C{i}" for i in range(n_coins)]
+    ticks = make_ticks(coins, n_ticks + 1, seed=1)
+    wallets = [f"0x{i:040x}" for i in range(n_wallets)]
+
+    positions = PositionStateService(max_staleness=3600, reconcile_interval=3600, use_webdata=False)
+    positions.update_addresses(wallets)
+    rng = random.Random(2)
+    for wallet in wallets:
+        positions.seed(wallet, {"time": 0, "assetPositions": [
+            {"type": "oneWay", "position": {"coin": coin, "szi": str(rng.uniform(-5, 5)), "entryPx": ticks[0][coin]}}
+            for coin in rng.sample(coins, 3)
+        ]})
+    alert_service.position_state_service = positions
+
+    rules = make_rules(ticks[0], n_rules, wallets, seed=3)
+    engine = AlertEngine(AlertRuleStore(os.path.join(tempfile.mkdtemp(), "alerts.json")), cooldown=0)
+    engine.load(rules)
+    engine.on_mids(ticks[0])
+    while not engine.alert_queue.empty():
+        engine.alert_queue.get_nowait()
+
+    latencies = []
+    start = time.perf_counter()
+    for mids in ticks[1:]:
+        tick_start = time.perf_counter()
+        engine.on_mids(mids)
+        latencies.append(time.perf_counter() - tick_start)
+    elapsed = time.perf_counter() - start
+    indexed = {**latency_stats(latencies, elapsed, "tick_"), "alerts": engine.alert_queue.qsize()}
+
+    latencies = []
+    previous = {coin: float(px) for coin, px in ticks[0].items()}
+    start = time.perf_counter()
+    for mids in ticks[1:]:
+        tick_start = time.perf_counter()
+        linear_scan(rules, previous, mids)
+        previous = {coin: float(px) for coin, px in mids.items()}
+        latencies.append(time.perf_counter() - tick_start)
+    linear = latency_stats(latencies, time.perf_counter() - start, "tick_")
+
+    print(f"indexé       {indexed['tick_rps']:>8.0f} ticks/s  p50={indexed['tick_p50_ms']:.3f}ms  "
+          f"p99={indexed['tick_p99_ms']:.3f}ms  alertes={indexed['alerts']}", file=sys.stderr)
+    print(f"scan linéaire {linear['tick_rps']:>7.0f} ticks/s  p50={linear['tick_p50_ms']:.3f}ms  "
+          f"p99={linear['tick_p99_ms']:.3f}ms", file=sys.stderr)
+    return {"indexed": indexed, "linear_scan": linear}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, default=50000, help="Règles de prix")
+    parser.add_argument("--wallets", type=int, default=1000, help="Wallets avec une règle de PnL (3 positions chacun)")
+    parser.add_argument("--coins", type=int, default=200, help="Coins du flux allMids")
+    parser.add_argument("--ticks", type=int, default=2000, help="Messages allMids évalués")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    write_json({"alerts": run(args.rules, args.wallets, args.coins, args.ticks)}, args.output)
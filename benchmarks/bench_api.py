@@ -0,0 +1,163 @@
+"""
+API load benchmark against the local Hyperliquid simulator.
+
+Starts `scripts/run_simulator.py` and the API (`uvicorn --factory`, pointed at the
+simulator with rate limiting disabled), then drives `/v1/health`,
+`/v1/user/{address}` and `/v1/order/market` at several concurrency levels and
+reports req/s and p50/p99 latency per endpoint and level.
+
+Usage: python benchmarks/bench_api.py [--concurrency 1,8,32] [--duration 5] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+from harness import free_port, latency_stats, spawn, stop, write_json
+
+SECRET_KEY = "0x" + "11" * 32
+ACCOUNT_ADDRESS = "0x19E7E376E7C213B7E7e7e46cc70A5dD086DAff2A"
+API_KEY = "bench" * 8
+USER = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+
+
+def endpoints() -> Dict[str, Dict[str, Any]]:
+    return {
+        "health": {"method": "GET", "url": "/v1/health"},
+        "user_state": {"method": "GET", "url": f"/v1/user/{USER}"},
+        "order_market": {
+            "method": "POST",
+            "url": "/v1/order/market",
+            "headers": {"X-API-Key": API_KEY},
+            "json": {"coin": "BTC", "is_buy": True, "size": 0.001, "slippage": 0.01},
+        },
+    }
+
+
+async def run_level(base_url: str, request: Dict[str, Any], concurrency: int, duration: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        # One untimed request per connection so connection setup and lazy loading are excluded.
+        await asyncio.gather(*(client.request(**request) for _ in range(concurrency)))
+
+        start = time.perf_counter()
+        deadline = start + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                sent = time.perf_counter()
+                try:
+                    response = await client.request(**request)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - sent)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {**latency_stats(latencies, elapsed), "errors": errors}
+
+
+def legacy_api_args(port: int) -> List[str]:
+    """Single worker, default asyncio loop and h11 parser (the historical `uvicorn.run(app)`)."""
+    return ["-m", "uvicorn", "app.api.app:create_app", "--factory", "--loop", "asyncio", "--http", "h11",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+
+
+@contextmanager
+def api_stack(
+    api_args: Callable[[int], List[str]] = legacy_api_args,
+    simulator_latency_ms: float = 0.0,
+) -> Iterator[str]:
+    """Run the simulator and an API process pointed at it; yields the API base URL."""
+    simulator_port = free_port()
+    api_port = free_port()
+    simulator_url = f"http://127.0.0.1:{simulator_port}"
+    api_url = f"http://127.0.0.1:{api_port}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        simulator = spawn(
+            ["scripts/run_simulator.py", "--port", str(simulator_port), "--latency-ms", str(simulator_latency_ms), "--seed", "1"],
+            {"TRADING_ENABLED": "false"},
+            simulator_url + "/",
+        )
+        try:
+            api = spawn(
+                api_args(api_port),
+                {
+                    "HYPERLIQUID_API_URL": simulator_url,
+                    "TRADING_ENABLED": "true",
+                    "SECRET_KEY": SECRET_KEY,
+                    "ACCOUNT_ADDRESS": ACCOUNT_ADDRESS,
+                    "ACCOUNTS": "{}",
+                    "API_KEY": API_KEY,
+                    "RATELIMIT_ENABLED": "false",
+                    "STATE_ENGINE_ENABLED": "false",
+                    "MARKET_DATA_COINS": "",
+                    "METADATA_CACHE_PATH": os.path.join(tmp, "metadata.json"),
+                    "WATCHLIST_PATH": os.path.join(tmp, "watchlist.json"),
+                    "FILL_STORE_PATH": os.path.join(tmp, "fills.db"),
+                    "API_RUN_DIR": os.path.join(tmp, "run"),
+                },
+                api_url + "/",
+            )
+            try:
+                yield api_url
+            finally:
+                stop(api)
+        finally:
+            stop(simulator)
+
+
+def measure(api_url: str, concurrency_levels: List[int], duration: float, names: Optional[List[str]] = None) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for name, request in endpoints().items():
+        if names and name not in names:
+            continue
+        results[name] = {}
+        for concurrency in concurrency_levels:
+            stats = asyncio.run(run_level(api_url, request, concurrency, duration))
+            results[name][f"c{concurrency}"] = stats
+            print(f"{name:<13} c={concurrency:<4} {stats.get('rps', 0):>9.1f} req/s  "
+                  f"p50={stats.get('p50_ms', 0):.2f}ms  p99={stats.get('p99_ms', 0):.2f}ms  "
+                  f"errors={stats['errors']}", file=sys.stderr)
+    return results
+
+
+def run(concurrency_levels: List[int], duration: float, simulator_latency_ms: float = 0.0) -> Dict[str, Any]:
+    with api_stack(simulator_latency_ms=simulator_latency_ms) as api_url:
+        return measure(api_url, concurrency_levels, duration)
+
+
+def parse_levels(value: str) -> List[int]:
+    return [int(level) for level in value.split(",") if level.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=parse_levels, default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=5.0, help="Durée de chaque mesure (secondes)")
+    parser.add_argument("--simulator-latency-ms", type=float, default=0.0, help="Latence ajoutée par le simulateur")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    write_json({"api": run(args.concurrency, args.duration, args.simulator_latency_ms)}, args.output)
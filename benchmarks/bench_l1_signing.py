@@ -0,0 +1,86 @@
+"""
+Micro-benchmark of L1 action signing (one market order per signature).
+
+Compares the SDK's `sign_l1_action` (EIP-712 payload rebuilt and encoded with
+eth_account on every call) with `L1Signer` in-thread, batched, and in a
+process pool signing from several threads at once.
+
+Usage: python benchmarks/bench_l1_signing.py [--iterations 2000] [--processes 4] [--threads 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+import eth_account
+from hyperliquid.utils.signing import sign_l1_action as sdk_sign_l1_action
+
+from app.services.l1_signer import L1Signer
+
+WALLET = eth_account.Account.from_key("0x" + "11" * 32)
+ACTION = {
+    "type": "order",
+    "orders": [{"a": 0, "b": True, "p": "100000", "s": "0.01", "r": False, "t": {"limit": {"tif": "Ioc"}}}],
+    "grouping": "na",
+}
+
+
+def measure(iterations: int, call) -> dict:
+    call(0)
+    start = time.perf_counter()
+    call(iterations)
+    elapsed = time.perf_counter() - start
+    return {"us_per_signature": elapsed / iterations * 1e6, "signatures_per_sec": iterations / elapsed}
+
+
+def run(iterations: int, processes: int, threads: int) -> dict:
+    nonces = range(1700000000000, 1700000000000 + iterations)
+    signer = L1Signer(WALLET)
+    pool_signer = L1Signer(WALLET, processes=processes)
+
+    def sdk(n):
+        for nonce in nonces[:n]:
+            sdk_sign_l1_action(WALLET, ACTION, None, nonce, True)
+
+    def fast(n):
+        for nonce in nonces[:n]:
+            signer.sign(ACTION, None, nonce, True)
+
+    def batch(n):
+        signer.sign_batch((ACTION, None, nonce, True) for nonce in nonces[:n])
+
+    def pool(n):
+        pool_signer.sign(ACTION, None, 1, True)
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda nonce: pool_signer.sign(ACTION, None, nonce, True), nonces[:n]))
+
+    try:
+        results = {
+            "sdk": measure(iterations, sdk),
+            "fast": measure(iterations, fast),
+            "batch": measure(iterations, batch),
+            f"pool x{processes}": measure(iterations, pool),
+        }
+    finally:
+        pool_signer.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.processes, args.threads)
+    baseline = results["sdk"]["us_per_signature"]
+    for name, r in results.items():
+        print(f"{name:>9}: {r['us_per_signature']:8.1f} µs/sig  {r['signatures_per_sec']:8.0f} sig/s  x{baseline / r['us_per_signature']:.1f}")
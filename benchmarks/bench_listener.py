@@ -0,0 +1,122 @@
+"""
+Listener benchmark: fill ingest rate and fill-to-alert latency.
+
+- ingest: `userFills` messages are fed straight into `TradesListener._on_message_received`
+  and the fills/s it accepts is reported (the notification worker is not running).
+- alert latency: fills are injected at a fixed rate with the notification worker
+  running against a stub Telegram server; latency is measured from injection to
+  the `sendMessage` request reaching the stub.
+
+Usage: python benchmarks/bench_listener.py [--fills 20000] [--batch 10] [--alerts 500] [--rate 200] [--output results.json]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
+for path in (PROJECT_ROOT, SCRIPT_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from harness import BackgroundServer, latency_stats, write_json
+from stub_telegram import StubTelegram
+
+USER = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+
+
+def make_message(start: int, count: int) -> Dict[str, Any]:
+    fills = [
+        {
+            "coin": f"C{start + i}", "px": "100.5", "sz": "1.25", "side": "B" if i % 2 else "A",
+            "time": 1733000000000 + start + i, "startPosition": "0", "dir": "Open Long",
+            "closedPnl": "0.0", "hash": "0x00", "oid": start + i, "crossed": True,
+            "fee": "0.05", "tid": start + i, "feeToken": "USDC",
+        }
+        for i in range(count)
+    ]
+    return {"channel": "userFills", "data": {"user": USER.lower(), "fills": fills}}
+
+
+def make_listener(telegram_url: str):
+    os.environ.update({
+        "TELEGRAM_API_URL": telegram_url,
+        "TELEGRAM_BOT_TOKEN": "bench",
+        "TELEGRAM_CHAT_ID": "1",
+        "TRADING_ENABLED": "false",
+        "FILL_STORE_ENABLED": "false",
+        "USERS_LISTENED": f'["{USER}"]',
+        "WATCHLIST_PATH": os.path.join(tempfile.mkdtemp(), "watchlist.json"),
+    })
+    from app.workers.trades_listener import TradesListener
+
+    # Per-fill log lines are still formatted, but not written to the terminal.
+    for handler in logging.getLogger("app.workers.trades_listener").handlers:
+        handler.setStream(open(os.devnull, "w"))
+    return TradesListener()
+
+
+def bench_ingest(listener, total_fills: int, batch: int) -> Dict[str, float]:
+    messages = [make_message(start, batch) for start in range(0, total_fills, batch)]
+    start = time.perf_counter()
+    for message in messages:
+        listener._on_message_received(message)
+    elapsed = time.perf_counter() - start
+
+    while not listener.msg_queue.empty():
+        listener.msg_queue.get_nowait()
+    return {"fills": len(messages) * batch, "fills_per_s": len(messages) * batch / elapsed}
+
+
+def bench_alert_latency(listener, stub: StubTelegram, alerts: int, rate: float) -> Dict[str, float]:
+    listener.notification_thread.start()
+    stub.messages.clear()
+
+    sent_at: Dict[str, float] = {}
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    for i in range(alerts):
+        delay = start + i * interval - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        sent_at[f"C{i}"] = time.perf_counter()
+        listener._on_message_received(make_message(i, 1))
+
+    stub.wait_for(alerts, timeout=60)
+    elapsed = time.perf_counter() - start
+    latencies: List[float] = []
+    for received_at, payload in stub.messages:
+        coin = payload["text"].split("| ", 1)[1].split("\n", 1)[0].strip()
+        if coin in sent_at:
+            latencies.append(received_at - sent_at[coin])
+    return {**latency_stats(latencies, elapsed, "alert_"), "lost": alerts - len(latencies)}
+
+
+def run(fills: int, batch: int, alerts: int, rate: float) -> Dict[str, Any]:
+    stub = StubTelegram()
+    with BackgroundServer(stub.app) as server:
+        listener = make_listener(server.url)
+        ingest = bench_ingest(listener, fills, batch)
+        print(f"ingest       {ingest['fills_per_s']:>10.0f} fills/s", file=sys.stderr)
+        alert = bench_alert_latency(listener, stub, alerts, rate)
+        print(f"fill->alert  p50={alert.get('alert_p50_ms', 0):.2f}ms  p99={alert.get('alert_p99_ms', 0):.2f}ms  "
+              f"lost={alert['lost']}", file=sys.stderr)
+        listener.running = False
+    return {"ingest": ingest, "alert": alert}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fills", type=int, default=20000, help="Fills injectés pour la mesure d'ingestion")
+    parser.add_argument("--batch", type=int, default=10, help="Fills par message userFills")
+    parser.add_argument("--alerts", type=int, default=500, help="Fills injectés pour la mesure de latence")
+    parser.add_argument("--rate", type=float, default=200.0, help="Fills injectés par seconde pour la mesure de latence")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    write_json({"listener": run(args.fills, args.batch, args.alerts, args.rate)}, args.output)
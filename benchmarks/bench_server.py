@@ -0,0 +1,44 @@
+"""
+Server configuration benchmark: historical single-worker run vs the production launcher.
+
+- legacy: one uvicorn worker, asyncio loop, h11 parser (what `scripts/run_api.py`
+  used to start)
+- launcher: `scripts/run_api.py --workers N` (app factory, uvloop/httptools when
+  installed, backlog and keep-alive from the settings)
+
+Both run against the local simulator with the same load on `/v1/health`
+and `/v1/user/{address}`.
+
+Usage: python benchmarks/bench_server.py [--workers 4] [--concurrency 8,64] [--duration 5] [--output results.json]
+"""
+
+import argparse
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+from bench_api import api_stack, legacy_api_args, measure, parse_levels
+from harness import write_json
+
+ENDPOINTS = ["health", "user_state"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=parse_levels, default=[8, 64])
+    parser.add_argument("--duration", type=float, default=5.0, help="Durée de chaque mesure (secondes)")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    def launcher_args(port: int):
+        return ["scripts/run_api.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(args.workers)]
+
+    results = {}
+    for name, api_args in (("legacy", legacy_api_args), (f"launcher_{args.workers}w", launcher_args)):
+        print(f"--- {name}", file=sys.stderr)
+        with api_stack(api_args) as api_url:
+            results[name] = measure(api_url, args.concurrency, args.duration, ENDPOINTS)
+    write_json({"server": results}, args.output)
@@ -0,0 +1,117 @@
+"""
+Micro-benchmark of the /v1/user/{address} response path for a large account.
+
+Compares the previous path (UserStateResponse model + FastAPI response_model
+validation + JSONResponse) with the current one (plain dict + ORJSONResponse).
+
+Usage: python benchmarks/bench_user_state_serialization.py [--positions 150] [--iterations 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.models.schemas import UserStateResponse
+from app.api.routers.v1.endpoints.user_state import build_user_state_content
+
+ADDRESS = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+
+
+def make_user_state(num_positions: int) -> dict:
+    positions = [
+        {
+            "type": "oneWay",
+            "position": {
+                "coin": f"COIN{i}",
+                "szi": "-1234.5678",
+                "entryPx": "12.3456",
+                "positionValue": "15234.12",
+                "unrealizedPnl": "-123.45",
+                "returnOnEquity": "-0.0345",
+                "liquidationPx": "45.678",
+                "marginUsed": "1523.41",
+                "maxLeverage": 20,
+                "leverage": {"type": "cross", "value": 10},
+                "cumFunding": {"allTime": "12.3", "sinceOpen": "1.2", "sinceChange": "0.4"},
+            },
+        }
+        for i in range(num_positions)
+    ]
+    summary = {"accountValue": "1523412.12", "totalNtlPos": "152341.2", "totalRawUsd": "1371070.9", "totalMarginUsed": "15234.1"}
+    return {
+        "assetPositions": positions,
+        "marginSummary": summary,
+        "crossMarginSummary": dict(summary),
+        "crossMaintenanceMarginUsed": "7617.05",
+        "withdrawable": "1508178.02",
+        "time": 1733000000000,
+    }
+
+
+async def previous_path(field, user_state: dict) -> bytes:
+    margin_summary = user_state.get('marginSummary', {})
+    asset_positions = user_state.get('assetPositions', [])
+    model = UserStateResponse(
+        address=ADDRESS,
+        accountValue=margin_summary.get('accountValue', '0.0'),
+        totalRawUsd=margin_summary.get('totalRawUsd', '0.0'),
+        numPositions=len(asset_positions),
+        marginSummary=margin_summary,
+        assetPositions=asset_positions,
+        crossMarginSummary=user_state.get('crossMarginSummary'),
+        withdrawable=user_state.get('withdrawable'),
+    )
+    content = await serialize_response(field=field, response_content=model)
+    return JSONResponse(content).body
+
+
+async def current_path(user_state: dict) -> bytes:
+    return ORJSONResponse(build_user_state_content(ADDRESS, user_state)).body
+
+
+async def run(num_positions: int, iterations: int) -> dict:
+    user_state = make_user_state(num_positions)
+    field = create_model_field(name="response", type_=UserStateResponse, mode="serialization")
+
+    results = {}
+    for name, call in (
+        ("previous", lambda: previous_path(field, user_state)),
+        ("current", lambda: current_path(user_state)),
+    ):
+        await call()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            body = await call()
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            "us_per_request": elapsed / iterations * 1e6,
+            "requests_per_sec": iterations / elapsed,
+            "body_bytes": len(body),
+        }
+
+    results["speedup"] = results["previous"]["us_per_request"] / results["current"]["us_per_request"]
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--positions", type=int, default=150)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.positions, args.iterations))
+    for name in ("previous", "current"):
+        r = results[name]
+        print(f"{name:>9}: {r['us_per_request']:8.1f} µs/req  {r['requests_per_sec']:9.0f} req/s  ({r['body_bytes']} bytes)")
+    print(f"  speedup: x{results['speedup']:.1f}")
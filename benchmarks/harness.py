@@ -0,0 +1,172 @@
+"""
+Shared helpers of the benchmark suite: local servers, latency statistics and
+regression checks against a previous JSON result.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import requests
+import uvicorn
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
+
+# Throughput metrics regress when they drop, everything else when it grows.
+HIGHER_IS_BETTER_SUFFIXES = ("rps", "per_s")
+# Absolute increase of a failed-request ratio reported as a regression (0.01 = one point).
+ERROR_RATE_TOLERANCE = 0.01
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, process: Optional[subprocess.Popen] = None, timeout: float = 60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.ConnectionError:
+            pass
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Le serveur s'est arrêté (code {process.returncode})")
+        time.sleep(0.05)
+    raise TimeoutError(f"Pas de réponse de {url}")
+
+
+def spawn(args: List[str], env: Dict[str, str], ready_url: str) -> subprocess.Popen:
+    """Start a Python subprocess from the project root and wait until `ready_url` answers."""
+    process = subprocess.Popen(
+        [sys.executable, *args],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_up(ready_url, process)
+    except Exception:
+        process.kill()
+        raise
+    return process
+
+
+def stop(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+class BackgroundServer:
+    """Uvicorn server running an ASGI app in a thread of the current process."""
+
+    def __init__(self, app, port: Optional[int] = None):
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> "BackgroundServer":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+def latency_stats(latencies_s: List[float], elapsed_s: float, prefix: str = "") -> Dict[str, float]:
+    values = np.asarray(latencies_s) * 1000
+    if not len(values):
+        return {f"{prefix}count": 0}
+    return {
+        f"{prefix}count": int(len(values)),
+        f"{prefix}rps": float(len(values) / elapsed_s),
+        f"{prefix}p50_ms": float(np.percentile(values, 50)),
+        f"{prefix}p99_ms": float(np.percentile(values, 99)),
+        f"{prefix}max_ms": float(values.max()),
+    }
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def error_rates(flat: Dict[str, float]) -> Dict[str, float]:
+    """`errors / (count + errors)` for every group of metrics that reports errors."""
+    rates = {}
+    for name, errors in flat.items():
+        if name == "errors" or name.endswith(".errors"):
+            prefix = name[:-len("errors")]
+            total = flat.get(f"{prefix}count", 0.0) + errors
+            rates[f"{prefix}error_rate"] = errors / total if total else 0.0
+    return rates
+
+
+def check_regressions(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare `results` with `baseline` and return one message per metric that got
+    worse by more than `threshold` (0.2 = 20%), is missing from `results` (an
+    endpoint that failed every request reports no latencies), or whose error rate
+    grew by more than ERROR_RATE_TOLERANCE. Counts and max latencies are ignored.
+    """
+    current = flatten(results)
+    previous = flatten(baseline)
+    regressions = []
+    for name, old in previous.items():
+        if old <= 0 or name.endswith(("count", "max_ms", "errors")):
+            continue
+        if not name.endswith(HIGHER_IS_BETTER_SUFFIXES) and not name.endswith("_ms"):
+            continue
+        new = current.get(name)
+        if new is None:
+            regressions.append(f"{name}: {old:.3f} -> absent")
+            continue
+        if name.endswith(HIGHER_IS_BETTER_SUFFIXES):
+            change = (old - new) / old
+        else:
+            change = (new - old) / old
+        if change > threshold:
+            regressions.append(f"{name}: {old:.3f} -> {new:.3f} ({(new - old) / old:+.0%})")
+
+    previous_rates = error_rates(previous)
+    for name, new in error_rates(current).items():
+        old = previous_rates.get(name, 0.0)
+        if new - old > ERROR_RATE_TOLERANCE:
+            regressions.append(f"{name}: {old:.1%} -> {new:.1%}")
+    return regressions
+
+
+def load_json(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(results: Dict[str, Any], path: Optional[str]):
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if path:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    print(text)
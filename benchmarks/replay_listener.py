@@ -0,0 +1,176 @@
+"""
+Replay recorded WebSocket traffic through the listener pipeline.
+
+Recordings are written by the listener when `LISTENER_RECORD_PATH` is set. Each
+message is fed to `TradesListener._on_message_received` at its recorded pace
+(`--speed 1`), N times faster (`--speed N`) or as fast as possible (`--speed 0`),
+with the fill store and the notification worker running against a stub Telegram
+server. Reports throughput, queue high-water marks and per-stage latency:
+
+- ingest: `_on_message_received` call (fill store enqueue, notification enqueue)
+- queue_wait: time a fill spends in the notification queue
+- notify: formatting and sending the Telegram alert
+- end_to_end: message delivery to the listener -> alert sent
+
+Usage: python benchmarks/replay_listener.py data/recording.bin [more.bin ...] [--speed 10] [--telegram-latency-ms 50] [--output replay.json]
+"""
+
+import argparse
+import heapq
+import logging
+import os
+import queue
+import sys
+import tempfile
+import time
+from collections import deque
+from typing import Any, Dict, List
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
+for path in (PROJECT_ROOT, SCRIPT_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from harness import BackgroundServer, latency_stats, write_json
+from stub_telegram import StubTelegram
+
+
+class InstrumentedQueue(queue.Queue):
+    """FIFO queue recording its high-water mark and the wait time of each item."""
+
+    def __init__(self):
+        super().__init__()
+        self.high_water = 0
+        self.arrival = 0.0
+        self.waits: List[float] = []
+        self.last_arrival = 0.0
+        self._put_times: deque = deque()
+
+    def _put(self, item):
+        super()._put(item)
+        self._put_times.append((self.arrival, time.perf_counter()))
+        self.high_water = max(self.high_water, len(self.queue))
+
+    def _get(self):
+        item = super()._get()
+        self.last_arrival, put_at = self._put_times.popleft()
+        self.waits.append(time.perf_counter() - put_at)
+        return item
+
+
+def load_records(paths: List[str]):
+    from app.services.message_recorder import read_recording
+    return list(heapq.merge(*(read_recording(path) for path in paths), key=lambda record: record[0]))
+
+
+def make_listener(telegram_url: str, tmp: str):
+    os.environ.update({
+        "TELEGRAM_API_URL": telegram_url,
+        "TELEGRAM_BOT_TOKEN": "replay",
+        "TELEGRAM_CHAT_ID": "1",
+        "TRADING_ENABLED": "false",
+        "FILL_STORE_PATH": os.path.join(tmp, "fills.db"),
+        "WATCHLIST_PATH": os.path.join(tmp, "watchlist.json"),
+        "LISTENER_RECORD_PATH": "",
+    })
+    from app.services.fill_store_service import fill_store
+    from app.workers.trades_listener import TradesListener
+
+    for name in ("app.workers.trades_listener", "app.services.telegram_service"):
+        for handler in logging.getLogger(name).handlers:
+            handler.setStream(open(os.devnull, "w"))
+
+    fill_store.write_queue = InstrumentedQueue()
+    fill_store.start()
+    listener = TradesListener()
+    listener.msg_queue = InstrumentedQueue()
+    return listener, fill_store
+
+
+def replay(paths: List[str], speed: float, telegram_latency_ms: float) -> Dict[str, Any]:
+    records = load_records(paths)
+    if not records:
+        raise SystemExit("Enregistrement vide")
+
+    stub = StubTelegram(telegram_latency_ms)
+    with tempfile.TemporaryDirectory() as tmp, BackgroundServer(stub.app) as server:
+        listener, store = make_listener(server.url, tmp)
+        notifications = listener.msg_queue
+
+        notify_times: List[float] = []
+        end_to_end: List[float] = []
+        send_alert = listener.telegram_service.send_alert
+
+        def timed_send(alert):
+            start = time.perf_counter()
+            send_alert(alert)
+            done = time.perf_counter()
+            notify_times.append(done - start)
+            end_to_end.append(done - notifications.last_arrival)
+
+        listener.telegram_service.send_alert = timed_send
+        listener.notification_thread.start()
+
+        ingest_times: List[float] = []
+        max_lag = 0.0
+        first_recorded = records[0][0]
+        start = time.perf_counter()
+        for recorded_at, message in records:
+            if speed > 0:
+                target = start + (recorded_at - first_recorded) / speed
+                delay = target - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    max_lag = max(max_lag, -delay)
+
+            arrival = time.perf_counter()
+            notifications.arrival = arrival
+            listener._on_message_received(message)
+            ingest_times.append(time.perf_counter() - arrival)
+        ingest_elapsed = time.perf_counter() - start
+
+        expected = listener.metrics["fills_received"]
+        while listener.metrics["notifications_sent"] + listener.metrics["notification_errors"] < expected:
+            time.sleep(0.01)
+        store.flush()
+        total_elapsed = time.perf_counter() - start
+        listener.running = False
+        store.stop()
+
+    recorded_span = records[-1][0] - first_recorded
+    return {
+        "messages": len(records),
+        "fills": expected,
+        "speed": speed,
+        "recorded_span_s": recorded_span,
+        "replay_s": total_elapsed,
+        "max_schedule_lag_ms": max_lag * 1000,
+        "throughput": {
+            "ingest_messages_per_s": len(records) / ingest_elapsed,
+            "ingest_fills_per_s": expected / ingest_elapsed,
+            "notified_fills_per_s": len(notify_times) / total_elapsed,
+        },
+        "queue_high_water": {
+            "notifications": notifications.high_water,
+            "fill_store": store.write_queue.high_water,
+        },
+        "latency": {
+            "ingest": latency_stats(ingest_times, ingest_elapsed),
+            "queue_wait": latency_stats(notifications.waits, total_elapsed),
+            "notify": latency_stats(notify_times, total_elapsed),
+            "end_to_end": latency_stats(end_to_end, total_elapsed),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", nargs="+", help="Fichiers enregistrés (fusionnés par horodatage)")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = temps réel, N = N fois plus vite, 0 = vitesse maximale")
+    parser.add_argument("--telegram-latency-ms", type=float, default=0.0, help="Latence simulée de l'API Telegram")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    write_json({"replay": replay(args.recordings, args.speed, args.telegram_latency_ms)}, args.output)
@@ -0,0 +1,57 @@
+"""
+Run the API and listener benchmarks and write one JSON result file.
+
+With `--baseline`, metrics are compared with a previous result: the script exits
+with status 1 if a throughput dropped or a p50/p99 latency grew by more than
+`--threshold` (default 20%).
+
+Usage:
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --baseline baseline.json --threshold 0.2
+"""
+
+import argparse
+import os
+import platform
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+import bench_api
+import bench_listener
+from harness import check_regressions, load_json, write_json
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=bench_api.parse_levels, default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=5.0, help="Durée de chaque mesure d'API (secondes)")
+    parser.add_argument("--fills", type=int, default=20000)
+    parser.add_argument("--alerts", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=200.0)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    parser.add_argument("--baseline", help="Résultats de référence (JSON) à comparer")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Dégradation tolérée (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "api": bench_api.run(args.concurrency, args.duration),
+        "listener": bench_listener.run(args.fills, 10, args.alerts, args.rate),
+    }
+    write_json(results, args.output)
+
+    if args.baseline:
+        regressions = check_regressions(results, load_json(args.baseline), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) au-delà de {args.threshold:.0%} :", file=sys.stderr)
+            for regression in regressions:
+                print(f"  - {regression}", file=sys.stderr)
+            sys.exit(1)
+        print(f"\nAucune régression au-delà de {args.threshold:.0%}", file=sys.stderr)
@@ -0,0 +1,38 @@
+"""
+Stub of the Telegram Bot API `sendMessage` endpoint, recording when each message arrives.
+
+Point `TELEGRAM_API_URL` at it to measure alert latency without sending anything.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from fastapi import FastAPI, Request
+
+
+class StubTelegram:
+    def __init__(self, delay_ms: float = 0.0):
+        self.delay_ms = delay_ms
+        self.messages: List[Tuple[float, Dict[str, Any]]] = []
+        self.received = threading.Condition()
+        self.app = FastAPI()
+
+        @self.app.post("/bot{token}/sendMessage")
+        async def send_message(token: str, request: Request):
+            payload = await request.json()
+            if self.delay_ms:
+                await asyncio.sleep(self.delay_ms / 1000)
+            with self.received:
+                self.messages.append((time.perf_counter(), payload))
+                self.received.notify_all()
+            return {"ok": True, "result": {"message_id": len(self.messages)}}
+
+        @self.app.get("/")
+        async def root():
+            return {"ok": True}
+
+    def wait_for(self, count: int, timeout: float) -> bool:
+        with self.received:
+            return self.received.wait_for(lambda: len(self.messages) >= count, timeout)
@@ -1,5 +1,7 @@
 import sys
 import os
+import argparse
+import importlib.util
 import uvicorn
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -7,14 +9,40 @@ PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
 if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
-from app.api.app import create_app
 from app.core.config import settings
+from app.core.logger import setup_logger
 
-app = create_app()
+logger = setup_logger("run_api")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API Hyperliquid (serveur de production)")
+    parser.add_argument("--host", default=settings.API_HOST, help="Adresse d'écoute (défaut: API_HOST)")
+    parser.add_argument("--port", type=int, default=settings.API_PORT, help="Port d'écoute (défaut: API_PORT)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.API_WORKERS,
+        help="Nombre de processus workers (défaut: API_WORKERS)"
+    )
+    args = parser.parse_args()
+
+    # Workers are spawned and re-read the settings: they must agree on the worker
+    # count, which partitions the order nonces between them.
+    os.environ["API_WORKERS"] = str(args.workers)
+
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    logger.info(f"Démarrage de l'API: {args.workers} worker(s), boucle {loop}, parser HTTP {http}")
+
     uvicorn.run(
-        app, 
-        host=settings.API_HOST, 
-        port=settings.API_PORT
+        "app.api.app:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        backlog=settings.API_BACKLOG,
+        timeout_keep_alive=settings.API_KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=settings.API_SHUTDOWN_TIMEOUT,
     )
@@ -0,0 +1,38 @@
+import sys
+import os
+import argparse
+import uvicorn
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+# The simulator never trades: do not require SECRET_KEY to load the gateway settings.
+os.environ.setdefault("TRADING_ENABLED", "false")
+
+from app.simulator.server import SimulatorConfig, create_simulator_app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulateur local de l'API Hyperliquid (REST + WebSocket)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latence ajoutée à chaque requête REST")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Variation aléatoire de la latence")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probabilité d'une erreur 500 (0-1)")
+    parser.add_argument("--fill-rate", type=float, default=1.0, help="Probabilité d'exécution d'un ordre marketable (0-1)")
+    parser.add_argument("--book-interval", type=float, default=0.5, help="Intervalle de publication l2Book (s)")
+    parser.add_argument("--fill-stream-rate", type=float, default=0.0, help="Fills synthétiques par seconde et par utilisateur abonné")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        fill_rate=args.fill_rate,
+        book_interval=args.book_interval,
+        fill_stream_rate=args.fill_stream_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_simulator_app(config), host=args.host, port=args.port)
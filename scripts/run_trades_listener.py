@@ -1,13 +1,28 @@
 import sys
 import os
+import argparse
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
 if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
-from app.workers.trades_listener import TradesListener
+from app.core.config import settings
 
 if __name__ == "__main__":
-    listener = TradesListener()
-    listener.start()
+    parser = argparse.ArgumentParser(description="Listener des trades Hyperliquid")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.LISTENER_WORKERS,
+        help="Nombre de processus workers (défaut: LISTENER_WORKERS)"
+    )
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        from app.workers.supervisor import ListenerSupervisor
+        ListenerSupervisor(args.workers).start()
+    else:
+        from app.workers.trades_listener import TradesListener
+        listener = TradesListener()
+        listener.start()
@@ -0,0 +1,150 @@
+import pytest
+from unittest.mock import Mock, patch
+
+from app.core.exceptions import AlertRuleNotFoundError, InvalidAlertRuleError, InvalidAddressError
+from app.services.alert_service import AlertEngine, AlertRuleStore, ThresholdIndex
+from app.services.position_state_service import PositionStateService
+
+
+ADDRESS = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+
+
+def _rule(rule_id, op, threshold, **fields):
+    return {"id": rule_id, "type": "price", "coin": "BTC", "user": None, "op": op, "threshold": threshold, **fields}
+
+
+def _fired(engine):
+    fired = []
+    while not engine.alert_queue.empty():
+        rule, value = engine.alert_queue.get_nowait()
+        fired.append((rule["id"], value))
+    return fired
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create an alert rule store in a temporary file."""
+    watchlist = Mock(**{"get.return_value": [ADDRESS]})
+    return AlertRuleStore(path=str(tmp_path / "alerts.json"), watchlist=watchlist, state_engine_enabled=True)
+
+
+def test_store_add_and_remove(store):
+    """Test that rules are validated, persisted and removed by id."""
+    rule = store.add({"type": "pnl", "user": ADDRESS.lower(), "op": "below", "threshold": -5000})
+    assert rule["user"] == ADDRESS
+    assert store.list() == [rule]
+
+    with pytest.raises(InvalidAlertRuleError):
+        store.add({"type": "price", "op": "above", "threshold": 1})
+    with pytest.raises(InvalidAddressError):
+        store.add({"type": "pnl", "user": "0x123", "op": "above", "threshold": 1})
+
+    store.remove(rule["id"])
+    assert store.list() == []
+    with pytest.raises(AlertRuleNotFoundError):
+        store.remove(rule["id"])
+
+
+def test_pnl_rule_requires_a_watched_address(store, tmp_path):
+    """Test that PnL rules are rejected for unwatched wallets or without the state engine."""
+    with pytest.raises(InvalidAlertRuleError):
+        store.add({"type": "pnl", "user": "0x742d35Cc6634C0532925a3b844Bc454e4438f44e", "op": "below", "threshold": -1})
+
+    disabled = AlertRuleStore(path=str(tmp_path / "other.json"), watchlist=store.watchlist, state_engine_enabled=False)
+    with pytest.raises(InvalidAlertRuleError):
+        disabled.add({"type": "pnl", "user": ADDRESS, "op": "below", "threshold": -1})
+    assert store.list() == disabled.list() == []
+
+
+def test_index_returns_only_crossed_rules():
+    """Test that only the thresholds between the old and new value are returned, in the move's direction."""
+    index = ThresholdIndex()
+    for i, threshold in enumerate((90, 100, 110, 120)):
+        index.add(_rule(f"up{i}", "above", threshold))
+        index.add(_rule(f"down{i}", "below", threshold))
+
+    assert [r["id"] for r in index.crossed(95, 115)] == ["up1", "up2"]
+    assert [r["id"] for r in index.crossed(115, 95)] == ["down1", "down2"]
+    assert index.crossed(101, 109) == []
+    assert [r["id"] for r in index.crossed(None, 105)] == ["up0", "up1", "down2", "down3"]
+
+
+def test_price_rule_fires_on_cross_with_cooldown(store):
+    """Test that a price rule fires when the mid crosses its threshold, once per cooldown."""
+    engine = AlertEngine(store, cooldown=60)
+    engine.load([_rule("btc100k", "above", 100000), _rule("eth", "above", 1, coin="ETH")])
+
+    engine.on_mids({"BTC": "99000", "ETH": "0.5"})
+    engine.on_mids({"BTC": "100500", "ETH": "0.5"})
+    assert _fired(engine) == [("btc100k", 100500.0)]
+
+    engine.on_mids({"BTC": "99000"})
+    engine.on_mids({"BTC": "101000"})
+    assert _fired(engine) == []
+
+
+def test_pnl_rule_follows_mids_and_positions(store):
+    """Test that a PnL rule is evaluated from the wallet positions and the live mids."""
+    positions = PositionStateService(max_staleness=60, reconcile_interval=60, use_webdata=False)
+    positions.update_addresses([ADDRESS])
+    positions.seed(ADDRESS, {
+        'time': 1000,
+        'assetPositions': [{'type': 'oneWay', 'position': {'coin': 'BTC', 'szi': '2', 'entryPx': '100000'}}]
+    })
+
+    with patch('app.services.alert_service.position_state_service', positions):
+        engine = AlertEngine(store, cooldown=0)
+        engine.load([{"id": "loss", "type": "pnl", "user": ADDRESS, "coin": None, "op": "below", "threshold": -5000}])
+
+        engine.on_mids({"BTC": "99000", "ETH": "3000"})
+        assert _fired(engine) == []
+
+        engine.on_mids({"BTC": "97000"})
+        assert _fired(engine) == [("loss", -6000.0)]
+
+        # Closing the position brings the unrealized PnL back to zero.
+        positions.apply_fills(ADDRESS, [{'coin': 'BTC', 'px': '97000', 'sz': '2', 'side': 'A', 'time': 2000}])
+        engine.on_state_changed(ADDRESS)
+        assert engine.pnls[ADDRESS.lower()] == 0.0
+        assert "BTC" not in engine.coin_users
+
+
+def test_restart_does_not_refire_rules_already_true(store):
+    """Test that after a restart the first tick only seeds the series, while new rules still fire on load."""
+    engine = AlertEngine(store, cooldown=0)
+    engine.load([_rule("btc100k", "above", 100000)])
+
+    engine.on_mids({"BTC": "105000"})
+    assert _fired(engine) == []
+
+    engine.load([_rule("btc100k", "above", 100000), _rule("btc101k", "above", 101000)])
+    assert _fired(engine) == [("btc101k", 105000.0)]
+
+
+def test_concurrent_adds_from_several_stores_keep_every_rule(tmp_path):
+    """Test that stores in different workers sharing the file never lose a rule."""
+    import threading
+    path = str(tmp_path / "alerts.json")
+    stores = [AlertRuleStore(path=path) for _ in range(4)]
+
+    def add_rules(store):
+        for i in range(10):
+            store.add({"type": "price", "coin": "BTC", "op": "above", "threshold": i})
+
+    threads = [threading.Thread(target=add_rules, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(stores[0].list()) == 40
+
+
+def test_rule_alert_escapes_user_text():
+    """Test that the coin and label of a rule are HTML-escaped for Telegram."""
+    from app.services.alert_templates import rule_alert
+    alert = rule_alert(_rule("r", "below", 5, label="PnL < -5k & co"), 4.0)
+
+    text = alert.text("full")
+    assert "PnL &lt; -5k &amp; co" in text
+    assert "<" not in text.replace("<b>", "").replace("</b>", "")
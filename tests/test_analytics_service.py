@@ -0,0 +1,71 @@
+import pytest
+from app.services.analytics_service import AnalyticsService
+from app.services.fill_store_service import FillStore
+
+
+USER = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+HOUR = 3_600_000
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a running FillStore with a round trip on BTC and one ETH buy."""
+    fill_store = FillStore(path=str(tmp_path / "fills.db"), batch_size=10, flush_interval=0.05)
+    fill_store.start()
+    fill_store.append(USER, [
+        {'coin': 'BTC', 'px': '100', 'sz': '1', 'side': 'B', 'time': 0, 'tid': 1,
+         'startPosition': '0', 'closedPnl': '0', 'fee': '0.1'},
+        {'coin': 'BTC', 'px': '110', 'sz': '1', 'side': 'A', 'time': HOUR + 60_000, 'tid': 2,
+         'startPosition': '1', 'closedPnl': '10', 'fee': '0.1'},
+        {'coin': 'ETH', 'px': '10', 'sz': '2', 'side': 'A', 'time': 2 * HOUR, 'tid': 3,
+         'startPosition': '2', 'closedPnl': '-4', 'fee': '0'},
+    ])
+    fill_store.flush()
+    yield fill_store
+    fill_store.stop()
+
+
+def test_analytics_without_fills(tmp_path):
+    """Test that an empty history returns zeroed statistics."""
+    service = AnalyticsService(FillStore(path=str(tmp_path / "empty.db")))
+    result = service.get_wallet_analytics(USER)
+
+    assert result['totalFills'] == 0
+    assert result['winRate'] is None
+    assert result['pnlCurve'] == []
+
+
+def test_volume_by_coin(store):
+    """Test per-coin volume aggregation."""
+    result = AnalyticsService(store).get_wallet_analytics(USER)
+
+    assert result['totalFills'] == 3
+    assert result['volumeByCoin']['BTC']['fills'] == 2
+    assert result['volumeByCoin']['BTC']['notional'] == pytest.approx(210)
+    assert result['volumeByCoin']['ETH']['size'] == pytest.approx(2)
+
+
+def test_pnl_curve_and_win_rate(store):
+    """Test the cumulative PnL curve and the win rate on closing fills."""
+    result = AnalyticsService(store).get_wallet_analytics(USER, resolution='1h')
+
+    assert [p['time'] for p in result['pnlCurve']] == [0, HOUR, 2 * HOUR]
+    assert result['pnlCurve'][-1]['cumulativePnl'] == pytest.approx(10 - 4 - 0.2)
+    assert result['realizedPnl'] == pytest.approx(6)
+    assert result['winRate'] == pytest.approx(0.5)
+
+
+def test_hold_time_and_frequency(store):
+    """Test that closing a position records its hold time."""
+    result = AnalyticsService(store).get_wallet_analytics(USER, resolution='1d')
+
+    assert result['avgHoldTimeSeconds'] == pytest.approx((HOUR + 60_000) / 1000)
+    assert result['tradesPerHour'] == pytest.approx(3 / 24)
+
+
+def test_time_range_filter(store):
+    """Test that the time range only keeps matching buckets."""
+    result = AnalyticsService(store).get_wallet_analytics(USER, resolution='1h', start_time=HOUR, end_time=HOUR + 1)
+
+    assert result['totalFills'] == 1
+    assert list(result['volumeByCoin']) == ['BTC']
@@ -1,8 +1,19 @@
 import pytest
+from concurrent.futures import Future
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 
 
+def done_future(result=None, error=None):
+    """A completed order future, as returned by the submit_* methods."""
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+
 @pytest.fixture
 def mock_hyperliquid_service():
     """Mock HyperliquidService for testing."""
@@ -60,7 +71,7 @@ def test_health_endpoint_not_configured(client):
 def test_create_market_order_success(mock_hs, client):
     """Test successful market order creation."""
     # Mock successful order
-    mock_hs.create_market_order.return_value = {
+    mock_hs.submit_market_order.return_value = done_future({
         "status": "ok",
         "response": {
             "data": {
@@ -73,7 +84,7 @@ def test_create_market_order_success(mock_hs, client):
                 }]
             }
         }
-    }
+    })
     
     response = client.post("/v1/order/market", json={
         "coin": "BTC",
@@ -96,7 +107,7 @@ def test_create_market_order_success(mock_hs, client):
 def test_create_market_order_exchange_not_configured(mock_hs, client):
     """Test market order when exchange not configured."""
     from app.core.exceptions import ExchangeNotConfiguredError
-    mock_hs.create_market_order.side_effect = ExchangeNotConfiguredError()
+    mock_hs.submit_market_order.side_effect = ExchangeNotConfiguredError()
     
     response = client.post("/v1/order/market", json={
         "coin": "BTC",
@@ -112,7 +123,7 @@ def test_create_market_order_exchange_not_configured(mock_hs, client):
 def test_create_market_order_trading_error(mock_hs, client):
     """Test market order with trading error."""
     from app.core.exceptions import TradingError
-    mock_hs.create_market_order.side_effect = TradingError("ouverture", "Insufficient balance")
+    mock_hs.submit_market_order.return_value = done_future(error=TradingError("ouverture", "Insufficient balance"))
     
     response = client.post("/v1/order/market", json={
         "coin": "BTC",
@@ -127,7 +138,7 @@ def test_create_market_order_trading_error(mock_hs, client):
 @patch('app.api.routers.v1.endpoints.user_state.hs')
 def test_get_user_state_success(mock_hs, client):
     """Test successful user state retrieval."""
-    mock_hs.get_user_state.return_value = {
+    mock_hs.fetch_user_state.return_value = ({
         'marginSummary': {
             'accountValue': '1000.50',
             'totalRawUsd': '1000.50'
@@ -135,7 +146,7 @@ def test_get_user_state_success(mock_hs, client):
         'assetPositions': [
             {'position': {'coin': 'BTC', 'szi': '0.1'}}
         ]
-    }
+    }, 0.0)
     
     response = client.get("/v1/user/0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045")
     
@@ -149,8 +160,332 @@ def test_get_user_state_success(mock_hs, client):
 @patch('app.api.routers.v1.endpoints.user_state.hs')
 def test_get_user_state_not_found(mock_hs, client):
     """Test user state when address not found."""
-    mock_hs.get_user_state.return_value = None
+    mock_hs.fetch_user_state.return_value = (None, 0.0)
     
     response = client.get("/v1/user/0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045")
     
     assert response.status_code == 404
+
+
+@patch('app.api.routers.v1.endpoints.user_state.position_state_service')
+@patch('app.api.routers.v1.endpoints.user_state.hs')
+def test_get_user_state_from_state_engine(mock_hs, mock_engine, client):
+    """Test that watched addresses are served from the state engine without upstream call."""
+    mock_engine.get_snapshot.return_value = {
+        'marginSummary': {'accountValue': '2000.0', 'totalRawUsd': '2000.0'},
+        'assetPositions': [],
+        'realizedPnl': '42.5'
+    }
+
+    response = client.get("/v1/user/0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accountValue"] == "2000.0"
+    assert data["realizedPnl"] == "42.5"
+    mock_hs.fetch_user_state.assert_not_called()
+
+
+@patch('app.api.routers.v1.endpoints.fills.fill_store')
+def test_get_fills_streams_ndjson(mock_store, client):
+    """Test that fills are streamed as NDJSON with the query filters."""
+    mock_store.query.return_value = iter([
+        {'coin': 'BTC', 'time': 1000, 'px': 50000.0},
+        {'coin': 'BTC', 'time': 2000, 'px': 50100.0}
+    ])
+
+    response = client.get("/v1/fills?user=0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045&coin=BTC&from=1000&to=3000")
+
+    assert response.status_code == 200
+    lines = response.text.strip().split("\n")
+    assert len(lines) == 2
+    kwargs = mock_store.query.call_args.kwargs
+    assert kwargs['coin'] == 'BTC'
+    assert kwargs['start_time'] == 1000
+    assert kwargs['end_time'] == 3000
+
+
+def test_get_fills_invalid_user(client):
+    """Test that an invalid address is rejected."""
+    response = client.get("/v1/fills?user=0xinvalid")
+
+    assert response.status_code == 400
+
+
+@patch('app.api.routers.v1.endpoints.analytics.analytics_service')
+def test_get_wallet_analytics(mock_analytics, client):
+    """Test wallet analytics endpoint."""
+    mock_analytics.get_wallet_analytics.return_value = {
+        'address': "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045",
+        'resolution': '1d',
+        'totalFills': 2,
+        'totalNotional': 210.0,
+        'realizedPnl': 10.0,
+        'fees': 0.2,
+        'winRate': 1.0,
+        'avgHoldTimeSeconds': 3660.0,
+        'tradesPerHour': 0.5,
+        'volumeByCoin': {'BTC': {'fills': 2, 'size': 2.0, 'notional': 210.0, 'realizedPnl': 10.0}},
+        'pnlCurve': [{'time': 0, 'pnl': 9.8, 'cumulativePnl': 9.8}]
+    }
+
+    response = client.get("/v1/analytics/0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045?resolution=1d")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["winRate"] == 1.0
+    assert data["volumeByCoin"]["BTC"]["fills"] == 2
+    assert mock_analytics.get_wallet_analytics.call_args.args[1] == '1d'
+
+
+@patch('app.api.routers.v1.endpoints.watchlist.watchlist_service')
+def test_add_to_watchlist(mock_watchlist, client):
+    """Test adding addresses to the watch list."""
+    mock_watchlist.add.return_value = ["0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"]
+
+    response = client.post("/v1/watchlist", json={"addresses": ["0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"]})
+
+    assert response.status_code == 200
+    assert response.json()["addresses"] == ["0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"]
+
+
+@patch('app.api.routers.v1.endpoints.watchlist.watchlist_service')
+def test_remove_from_watchlist(mock_watchlist, client):
+    """Test removing addresses from the watch list."""
+    mock_watchlist.remove.return_value = []
+
+    response = client.request("DELETE", "/v1/watchlist", json={"addresses": ["0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"]})
+
+    assert response.status_code == 200
+    assert response.json()["addresses"] == []
+    mock_watchlist.remove.assert_called_once_with(["0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"])
+
+
+@patch('app.api.routers.v1.endpoints.user_state.hs')
+def test_get_raw_user_state_passthrough(mock_hs, client):
+    """Test that the raw endpoint returns upstream bytes untouched."""
+    raw = b'{"marginSummary":{"accountValue":"1.0"},"assetPositions":[]}'
+    mock_hs.fetch_user_state_raw.return_value = (raw, 0.0)
+
+    response = client.get("/v1/user/0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045/raw")
+
+    assert response.status_code == 200
+    assert response.content == raw
+    assert response.headers["content-type"] == "application/json"
+
+
+@patch('app.api.routers.v1.endpoints.user_state.hs')
+def test_get_user_state_stale_has_age_header(mock_hs, client):
+    """Test that a stale fallback value is served with its age in X-Data-Age."""
+    mock_hs.fetch_user_state.return_value = ({'marginSummary': {'accountValue': '5.0'}, 'assetPositions': []}, 12.34)
+
+    response = client.get("/v1/user/0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045")
+
+    assert response.status_code == 200
+    assert response.headers["X-Data-Age"] == "12.3"
+
+
+@patch('app.api.routers.v1.endpoints.user_state.hs')
+def test_slow_upstream_does_not_block_other_requests(mock_hs, client):
+    """Test that concurrent user state reads wait on the upstream in parallel, not one after another."""
+    import asyncio
+    import time
+    import httpx
+
+    def slow_fetch(address):
+        time.sleep(0.3)
+        return {'marginSummary': {'accountValue': '1.0'}, 'assetPositions': []}, 0.0
+    mock_hs.fetch_user_state.side_effect = slow_fetch
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            start = time.monotonic()
+            responses = await asyncio.gather(*(
+                http.get("/v1/user/0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045") for _ in range(5)
+            ))
+            return responses, time.monotonic() - start
+
+    responses, elapsed = asyncio.run(scenario())
+
+    assert all(response.status_code == 200 for response in responses)
+    assert elapsed < 1.0
+
+
+@patch('app.api.routers.v1.endpoints.user_state.user_state_cache')
+@patch('app.api.routers.v1.endpoints.user_state.hs')
+def test_get_user_state_from_swr_cache(mock_hs, mock_cache, client):
+    """Test that cached answers carry their cache status and age."""
+    mock_cache.enabled = True
+    mock_cache.get.return_value = ({'marginSummary': {'accountValue': '7.0'}, 'assetPositions': []}, 31.26, "STALE")
+
+    response = client.get("/v1/user/0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045")
+
+    assert response.status_code == 200
+    assert response.json()["accountValue"] == "7.0"
+    assert response.headers["X-Cache"] == "STALE"
+    assert response.headers["X-Data-Age"] == "31.3"
+    mock_hs.fetch_user_state.assert_not_called()
+
+
+@patch('app.api.routers.v1.endpoints.user_state.hs')
+def test_get_user_state_upstream_unavailable(mock_hs, client):
+    """Test that an unavailable upstream without fallback returns 503."""
+    from app.core.exceptions import UpstreamUnavailableError
+    mock_hs.fetch_user_state.side_effect = UpstreamUnavailableError("info", "circuit ouvert")
+
+    response = client.get("/v1/user/0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045")
+
+    assert response.status_code == 503
+
+
+@patch('app.api.routers.v1.endpoints.info.info_proxy_service')
+def test_proxy_info(mock_proxy, client):
+    """Test that /v1/info streams the upstream bytes."""
+    mock_proxy.query.return_value = (200, iter([b'{"universe":', b'[]}']), False)
+
+    response = client.post("/v1/info", json={"type": "meta"})
+
+    assert response.status_code == 200
+    assert response.content == b'{"universe":[]}'
+    assert response.headers["X-Cache"] == "MISS"
+    mock_proxy.query.assert_called_once_with({"type": "meta"})
+
+
+@patch('app.api.routers.v1.endpoints.info.info_proxy_service')
+def test_slow_info_upstream_does_not_block_other_requests(mock_proxy, client):
+    """Test that concurrent /v1/info requests wait on the upstream in parallel, not one after another."""
+    import asyncio
+    import time
+    import httpx
+
+    def slow_query(payload):
+        time.sleep(0.3)
+        return 200, iter([b'{}']), False
+    mock_proxy.query.side_effect = slow_query
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            start = time.monotonic()
+            responses = await asyncio.gather(*(http.post("/v1/info", json={"type": "meta"}) for _ in range(5)))
+            return responses, time.monotonic() - start
+
+    responses, elapsed = asyncio.run(scenario())
+
+    assert all(response.status_code == 200 for response in responses)
+    assert elapsed < 1.0
+
+
+def test_proxy_info_requires_type(client):
+    """Test that /v1/info rejects bodies without a query type."""
+    response = client.post("/v1/info", json={"coin": "BTC"})
+
+    assert response.status_code == 400
+
+
+@patch('app.api.routers.v1.endpoints.market_data.market_data_service')
+def test_get_quote(mock_market_data, client):
+    """Test that /v1/quote returns the book estimate."""
+    from app.services.market_data_service import OrderBook
+    book = OrderBook("BTC")
+    book.apply_snapshot([{"px": "99", "sz": "1"}], [{"px": "101", "sz": "1"}, {"px": "102", "sz": "1"}], 1000)
+    mock_market_data.get_book.return_value = book
+
+    response = client.get("/v1/quote/BTC?size=2&side=buy")
+
+    assert response.status_code == 200
+    assert response.json()["vwap"] == 101.5
+
+
+@patch('app.api.routers.v1.endpoints.market_data.market_data_service')
+def test_get_book_unavailable(mock_market_data, client):
+    """Test that /v1/book returns 404 for coins without a local book."""
+    mock_market_data.get_book.return_value = None
+
+    response = client.get("/v1/book/DOGE")
+
+    assert response.status_code == 404
+
+
+@patch('app.api.routers.v1.endpoints.market_data.market_data_service')
+def test_get_prices_etag(mock_market_data, client):
+    """Test that /v1/prices returns the mids with an ETag and 304 when unchanged."""
+    from app.services.market_data_service import MidPrices
+    mids = MidPrices()
+    mids.apply({"BTC": "100.5", "ETH": "10"}, 1000)
+    mock_market_data.get_mids.return_value = mids
+
+    response = client.get("/v1/prices")
+    assert response.status_code == 200
+    assert response.json() == {"time": 1000, "mids": {"BTC": 100.5, "ETH": 10.0}}
+
+    etag = response.headers["ETag"]
+    assert client.get("/v1/prices", headers={"If-None-Match": etag}).status_code == 304
+
+    mids.apply({"BTC": "101", "ETH": "10"}, 2000)
+    response = client.get("/v1/prices", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["mids"]["BTC"] == 101.0
+
+
+@patch('app.api.routers.v1.endpoints.market_data.market_data_service')
+def test_get_price_long_poll(mock_market_data, client):
+    """Test that /v1/prices/{coin} with wait returns as soon as the mid changes."""
+    import threading
+    from app.services.market_data_service import MidPrices
+    mids = MidPrices()
+    mids.apply({"BTC": "100", "ETH": "10"}, 1000)
+    mock_market_data.get_mids.return_value = mids
+    mock_market_data.reads_shared.return_value = False
+
+    etag = client.get("/v1/prices/BTC").headers["ETag"]
+    threading.Timer(0.1, mids.apply, args=({"BTC": "100", "ETH": "11"}, 2000)).start()
+    threading.Timer(0.2, mids.apply, args=({"BTC": "102", "ETH": "11"}, 3000)).start()
+
+    response = client.get("/v1/prices/BTC?wait=5", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json() == {"coin": "BTC", "mid": 102.0, "time": 3000}
+    assert client.get("/v1/prices/DOGE").status_code == 404
+
+
+@patch('app.api.routers.v1.endpoints.trading.hs')
+def test_create_market_order_idempotency_key_replays(mock_hs, client):
+    """Test that a retried order with the same Idempotency-Key is not sent twice."""
+    mock_hs.submit_market_order.return_value = done_future({"status": "ok", "response": {"data": {"statuses": []}}})
+    order = {"coin": "BTC", "is_buy": True, "size": 0.1}
+    headers = {"Idempotency-Key": "order-replay-test"}
+
+    first = client.post("/v1/order/market", json=order, headers=headers)
+    retry = client.post("/v1/order/market", json=order, headers=headers)
+    conflict = client.post("/v1/order/market", json={**order, "size": 0.2}, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert conflict.status_code == 422
+    mock_hs.submit_market_order.assert_called_once()
+
+
+@patch('app.api.routers.v1.endpoints.alerts.alert_rule_store')
+def test_create_and_delete_alert_rule(mock_store, client):
+    """Test that /v1/alerts creates and deletes rules through the store."""
+    rule = {"id": "abc", "type": "price", "coin": "BTC", "user": None, "op": "above", "threshold": 100000.0, "label": None, "createdAt": 1}
+    mock_store.add.return_value = rule
+
+    response = client.post("/v1/alerts", json={"type": "price", "coin": "BTC", "op": "above", "threshold": 100000})
+    assert response.status_code == 201
+    assert response.json()["id"] == "abc"
+
+    response = client.delete("/v1/alerts/abc")
+    assert response.status_code == 204
+    mock_store.remove.assert_called_once_with("abc")
+
+
+@patch('app.api.routers.v1.endpoints.alerts.alert_rule_store')
+def test_delete_unknown_alert_rule(mock_store, client):
+    """Test that deleting an unknown rule returns 404."""
+    from app.core.exceptions import AlertRuleNotFoundError
+    mock_store.remove.side_effect = AlertRuleNotFoundError("nope")
+
+    assert client.delete("/v1/alerts/nope").status_code == 404
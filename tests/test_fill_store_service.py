@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+from app.services.fill_store_service import FillStore, fill_to_row
+
+
+USER = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a running FillStore in a temporary directory."""
+    fill_store = FillStore(path=str(tmp_path / "fills.db"), batch_size=10, flush_interval=0.05)
+    fill_store.start()
+    yield fill_store
+    fill_store.stop()
+
+
+def _fill(coin, fill_time, tid, side='B'):
+    return {'coin': coin, 'px': '100.5', 'sz': '0.1', 'side': side, 'time': fill_time, 'tid': tid, 'closedPnl': '1.5'}
+
+
+def test_query_without_database(tmp_path):
+    """Test that querying before any write returns nothing."""
+    fill_store = FillStore(path=str(tmp_path / "missing.db"))
+    assert list(fill_store.query(user=USER)) == []
+
+
+def test_append_and_query_by_user(store):
+    """Test that appended fills are persisted and returned in time order."""
+    store.append(USER, [_fill('ETH', 2000, 2), _fill('BTC', 1000, 1)])
+    store.flush()
+
+    fills = list(store.query(user=USER))
+
+    assert [f['tid'] for f in fills] == [1, 2]
+    assert fills[0]['user'] == USER.lower()
+    assert fills[0]['px'] == 100.5
+    assert fills[0]['closedPnl'] == 1.5
+
+
+def test_query_by_coin_and_time_range(store):
+    """Test filtering on coin and time range."""
+    store.append(USER, [_fill('BTC', t, t) for t in range(1000, 1010)])
+    store.append(USER, [_fill('ETH', 1005, 99)])
+    store.flush()
+
+    fills = list(store.query(coin='BTC', start_time=1003, end_time=1006))
+
+    assert [f['time'] for f in fills] == [1003, 1004, 1005, 1006]
+
+
+def test_duplicate_fills_are_ignored(store):
+    """Test that replayed fills with the same tid are stored once."""
+    store.append(USER, [_fill('BTC', 1000, 1)])
+    store.append(USER, [_fill('BTC', 1000, 1)])
+    store.flush()
+
+    assert len(list(store.query(user=USER))) == 1
+
+
+def test_duplicate_fills_are_not_counted_in_rollups(store):
+    """Test that fills already stored, or repeated within a batch, are counted once in the rollups."""
+    store.append(USER, [_fill('BTC', 1000, 1)])
+    store.flush()
+    store.append(USER, [_fill('BTC', 1000, 1), _fill('BTC', 2000, 2), _fill('BTC', 2000, 2)])
+    store.flush()
+
+    (rollup,) = store.query_rollups(USER, 86_400_000)
+
+    assert rollup[:3] == ('BTC', 0, 2)
+    assert rollup[5] == pytest.approx(3.0)
+
+
+def test_concurrent_writers_count_each_fill_once(tmp_path):
+    """Test that a fill written by another store while a batch is in flight is not counted by both in the rollups."""
+    path = str(tmp_path / "fills.db")
+    first, second = FillStore(path=path), FillStore(path=path)
+    first_conn, second_conn = first._connect(), second._connect()
+
+    def write_other():
+        with second_conn:
+            second._write_batch(second_conn, [fill_to_row(USER, _fill('BTC', 1000, 1))])
+
+    other = threading.Thread(target=write_other)
+
+    class InterleavedConnection:
+        """Starts the other writer right after the batch has read its rowid watermark."""
+
+        def execute(self, sql, *args):
+            cursor = first_conn.execute(sql, *args)
+            if "max(rowid)" in sql:
+                other.start()
+                other.join(0.2)
+            return cursor
+
+        def __getattr__(self, name):
+            return getattr(first_conn, name)
+
+    with first_conn:
+        first._write_batch(InterleavedConnection(), [fill_to_row(USER, _fill('BTC', 2000, 2))])
+    other.join()
+    first_conn.close()
+    second_conn.close()
+
+    (rollup,) = first.query_rollups(USER, 86_400_000)
+
+    assert rollup[2] == 2
+
+
+def test_query_limit(store):
+    """Test that the limit bounds the number of returned fills."""
+    store.append(USER, [_fill('BTC', t, t) for t in range(1000, 1050)])
+    store.flush()
+
+    assert len(list(store.query(user=USER, limit=5))) == 5
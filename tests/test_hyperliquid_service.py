@@ -11,6 +11,7 @@ def mock_settings():
     with patch('app.services.hyperliquid_service.settings') as mock:
         mock.ACCOUNT_ADDRESS = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
         mock.SECRET_KEY = "test_secret_key"
+        mock.ACCOUNTS = {}
         yield mock
 
 
@@ -33,6 +34,7 @@ def test_service_initialization_without_credentials():
     with patch('app.services.hyperliquid_service.settings') as mock_settings:
         mock_settings.ACCOUNT_ADDRESS = ""
         mock_settings.SECRET_KEY = ""
+        mock_settings.ACCOUNTS = {}
         
         with patch('app.services.hyperliquid_service.Info'):
             service = HyperliquidService()
@@ -45,6 +47,7 @@ def test_create_market_order_without_exchange():
     with patch('app.services.hyperliquid_service.settings') as mock_settings:
         mock_settings.ACCOUNT_ADDRESS = ""
         mock_settings.SECRET_KEY = ""
+        mock_settings.ACCOUNTS = {}
         
         with patch('app.services.hyperliquid_service.Info'):
             service = HyperliquidService()
@@ -59,6 +62,7 @@ def test_close_market_position_without_exchange():
     with patch('app.services.hyperliquid_service.settings') as mock_settings:
         mock_settings.ACCOUNT_ADDRESS = ""
         mock_settings.SECRET_KEY = ""
+        mock_settings.ACCOUNTS = {}
         
         with patch('app.services.hyperliquid_service.Info'):
             service = HyperliquidService()
@@ -73,8 +77,11 @@ def test_get_user_state():
     with patch('app.services.hyperliquid_service.settings') as mock_settings:
         mock_settings.ACCOUNT_ADDRESS = ""
         mock_settings.SECRET_KEY = ""
+        mock_settings.ACCOUNTS = {}
         
-        with patch('app.services.hyperliquid_service.Info') as mock_info_class:
+        with patch('app.services.hyperliquid_service.Info') as mock_info_class, \
+                patch('app.services.hyperliquid_service.metadata_cache') as mock_metadata:
+            mock_metadata.get.return_value = ({}, {})
             mock_info_instance = Mock()
             mock_info_class.return_value = mock_info_instance
             mock_info_instance.user_state.return_value = {"test": "data"}
@@ -84,3 +91,156 @@ def test_get_user_state():
             
             mock_info_instance.user_state.assert_called_once_with("0xTest")
             assert result == {"test": "data"}
+
+
+def test_get_user_state_raw():
+    """Test get_user_state_raw returns the upstream bytes from the pooled session."""
+    with patch('app.services.hyperliquid_service.settings') as mock_settings:
+        mock_settings.ACCOUNT_ADDRESS = ""
+        mock_settings.SECRET_KEY = ""
+        mock_settings.ACCOUNTS = {}
+
+        with patch('app.services.hyperliquid_service.Info') as mock_info_class, \
+                patch('app.services.hyperliquid_service.metadata_cache') as mock_metadata:
+            mock_metadata.get.return_value = ({}, {})
+            mock_info_instance = Mock()
+            mock_info_instance.base_url = "https://api.hyperliquid.xyz"
+            mock_info_instance.session.post.return_value.content = b'{"test":"data"}'
+            mock_info_class.return_value = mock_info_instance
+
+            service = HyperliquidService()
+            result = service.get_user_state_raw("0xTest")
+
+            url = mock_info_instance.session.post.call_args.args[0]
+            assert url == "https://api.hyperliquid.xyz/info"
+            assert b'"clearinghouseState"' in mock_info_instance.session.post.call_args.kwargs['data']
+            assert result == b'{"test":"data"}'
+
+
+def _service_with_mock_exchange():
+    with patch('app.services.hyperliquid_service.Info'):
+        with patch('app.services.hyperliquid_service.settings') as mock_settings:
+            mock_settings.ACCOUNT_ADDRESS = ""
+            mock_settings.SECRET_KEY = ""
+            mock_settings.ACCOUNTS = {}
+            service = HyperliquidService()
+    service.add_account("default", Mock(), "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045")
+    return service
+
+
+def test_auto_slippage_without_book():
+    """Test that 'auto' slippage fails cleanly when no local book is available."""
+    service = _service_with_mock_exchange()
+    order = MarketOrderRequest(coin="BTC", is_buy=True, size=1, slippage="auto")
+
+    with patch('app.services.hyperliquid_service.market_data_service') as mock_market_data:
+        mock_market_data.get_book.return_value = None
+        with pytest.raises(TradingError):
+            service.create_market_order(order)
+
+
+def test_auto_slippage_splits_oversized_order():
+    """Test that 'auto' slippage prices at the book and splits orders beyond visible depth."""
+    from app.services.market_data_service import OrderBook
+    book = OrderBook("BTC")
+    book.apply_snapshot([{"px": "99", "sz": "1"}], [{"px": "101", "sz": "1"}, {"px": "102", "sz": "1"}], 1000)
+
+    def market_open(coin, is_buy, size, px, slippage):
+        book.apply_snapshot([{"px": "99", "sz": "1"}], [{"px": "103", "sz": "5"}], book.time + 1)
+        filled = {"oid": book.time, "totalSz": str(size), "avgPx": "101.5" if px == 102 else "103"}
+        return {"status": "ok", "response": {"data": {"statuses": [{"filled": filled}]}}}
+
+    service = _service_with_mock_exchange()
+    service.get_account().exchange.market_open.side_effect = market_open
+    order = MarketOrderRequest(coin="BTC", is_buy=True, size=3, slippage="auto")
+
+    with patch('app.services.hyperliquid_service.market_data_service') as mock_market_data:
+        mock_market_data.get_book.return_value = book
+        result = service.create_market_order(order)
+
+    calls = service.get_account().exchange.market_open.call_args_list
+    assert [(c.args[2], c.args[3]) for c in calls] == [(2.0, 102.0), (1.0, 103.0)]
+    assert len(result["response"]["data"]["statuses"]) == 2
+    assert result["expected_slippage"] == pytest.approx(0.015)
+    assert result["realized_slippage"] == pytest.approx((306 / 3 - 100) / 100)
+
+
+def test_auto_slippage_rejected_first_order_keeps_slippage_fields():
+    """Test that a rejected first child order still reports the expected slippage."""
+    from app.services.market_data_service import OrderBook
+    book = OrderBook("BTC")
+    book.apply_snapshot([{"px": "99", "sz": "1"}], [{"px": "101", "sz": "1"}], 1000)
+
+    service = _service_with_mock_exchange()
+    service.get_account().exchange.market_open.return_value = {"status": "err", "response": "Insufficient margin"}
+    order = MarketOrderRequest(coin="BTC", is_buy=True, size=1, slippage="auto")
+
+    with patch('app.services.hyperliquid_service.market_data_service') as mock_market_data:
+        mock_market_data.get_book.return_value = book
+        result = service.create_market_order(order)
+
+    assert result["status"] == "err"
+    assert result["expected_slippage"] == pytest.approx(0.01)
+    assert result["realized_slippage"] is None
+
+
+def test_orders_are_routed_to_the_named_account():
+    """Test that orders use the exchange of the requested account."""
+    service = _service_with_mock_exchange()
+    sub_account = service.add_account("sub1", Mock(), "0x0000000000000000000000000000000000000001")
+    sub_account.exchange.market_open.return_value = {"status": "ok"}
+
+    service.create_market_order(MarketOrderRequest(coin="BTC", is_buy=True, size=1, account="sub1"))
+    service.close_market_position(MarketCloseRequest(coin="BTC"), "sub1")
+
+    sub_account.exchange.market_open.assert_called_once()
+    sub_account.exchange.market_close.assert_called_once_with("BTC")
+    service.get_account().exchange.market_open.assert_not_called()
+
+
+def test_account_named_default_is_rejected():
+    """Test that an ACCOUNTS entry cannot replace the account configured by ACCOUNT_ADDRESS/SECRET_KEY."""
+    from app.core.exceptions import ConfigurationError
+    key = "0x" + "11" * 32
+    with patch('app.services.hyperliquid_service.settings') as mock_settings, \
+            patch('app.services.hyperliquid_service.Info'):
+        mock_settings.ACCOUNT_ADDRESS = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+        mock_settings.SECRET_KEY = key
+        mock_settings.ACCOUNTS = {"default": {"secret_key": key}}
+
+        with pytest.raises(ConfigurationError):
+            HyperliquidService()
+
+
+def test_unknown_account():
+    """Test that an unknown account name raises AccountNotFoundError."""
+    from app.core.exceptions import AccountNotFoundError
+    service = _service_with_mock_exchange()
+
+    with pytest.raises(AccountNotFoundError):
+        service.create_market_order(MarketOrderRequest(coin="BTC", is_buy=True, size=1), "missing")
+
+
+def test_account_submissions_use_its_nonce_manager():
+    """Test that SDK timestamps inside account submissions come from the account's nonce manager."""
+    import hyperliquid.exchange as hl_exchange
+    service = _service_with_mock_exchange()
+    account = service.get_account()
+
+    futures = [account.submit(lambda exchange: hl_exchange.get_timestamp_ms()) for _ in range(100)]
+    nonces = [future.result() for future in futures]
+
+    assert len(set(nonces)) == 100
+
+
+def test_drain_waits_for_in_flight_orders():
+    """Test that draining waits for submitted orders and then refuses new ones."""
+    import time
+    service = _service_with_mock_exchange()
+    account = service.get_account()
+    future = account.submit(lambda exchange: time.sleep(0.1) or "done")
+
+    assert service.drain(timeout=5) == 0
+    assert future.result() == "done"
+    with pytest.raises(RuntimeError):
+        account.submit(lambda exchange: None)
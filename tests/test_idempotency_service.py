@@ -0,0 +1,180 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from app.core.exceptions import IdempotencyKeyConflictError, IdempotentRequestFailedError, AccountNotFoundError
+from app.services.idempotency_service import IdempotencyStore, SharedIdempotencyTable
+
+executor = ThreadPoolExecutor(max_workers=4)
+
+
+def _counting_submit(result="ok", delay=0.0, error=None):
+    calls = []
+
+    def send():
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    def submit():
+        calls.append(1)
+        return executor.submit(send)
+
+    return submit, calls
+
+
+def test_concurrent_duplicates_share_first_call():
+    """Test that concurrent requests with the same key run the call once."""
+    store = IdempotencyStore(ttl=60, max_entries=10)
+    submit, calls = _counting_submit(delay=0.01)
+
+    async def scenario():
+        return await asyncio.gather(*(store.run("k", b"body", submit) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert [replayed for _, replayed in results].count(False) == 1
+    assert all(result == "ok" for result, _ in results)
+
+
+def test_completed_result_is_replayed_until_expiry():
+    """Test that a later duplicate is replayed and an expired key runs again."""
+    store = IdempotencyStore(ttl=60, max_entries=10)
+    submit, calls = _counting_submit()
+
+    async def scenario():
+        await store.run("k", b"body", submit)
+        replay = await store.run("k", b"body", submit)
+        store._entries["k"].expires_at = 0
+        again = await store.run("k", b"body", submit)
+        return replay, again
+
+    replay, again = asyncio.run(scenario())
+
+    assert replay == ("ok", True)
+    assert again == ("ok", False)
+    assert len(calls) == 2
+
+
+def test_key_reused_with_different_body():
+    """Test that reusing a key for another request is rejected."""
+    store = IdempotencyStore(ttl=60, max_entries=10)
+    submit, _ = _counting_submit()
+
+    async def scenario():
+        await store.run("k", b"body", submit)
+        await store.run("k", b"other", submit)
+
+    with pytest.raises(IdempotencyKeyConflictError):
+        asyncio.run(scenario())
+
+
+def test_failures_before_submission_are_not_stored():
+    """Test that an order rejected before being sent can be retried with the same key."""
+    store = IdempotencyStore(ttl=60, max_entries=10)
+
+    def rejected():
+        raise AccountNotFoundError("missing")
+
+    submit, calls = _counting_submit()
+
+    async def scenario():
+        with pytest.raises(AccountNotFoundError):
+            await store.run("k", b"body", rejected)
+        return await store.run("k", b"body", submit)
+
+    assert asyncio.run(scenario()) == ("ok", False)
+    assert len(calls) == 1
+
+
+def test_failures_after_submission_are_not_resent():
+    """Test that a duplicate of an order that failed once sent gets an error instead of a second order."""
+    store = IdempotencyStore(ttl=60, max_entries=10)
+    submit, calls = _counting_submit(error=RuntimeError("read timeout"))
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await store.run("k", b"body", submit)
+        with pytest.raises(IdempotentRequestFailedError):
+            await store.run("k", b"body", submit)
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+
+
+def test_client_cancellation_keeps_the_order():
+    """Test that a disconnected client does not free the key while its order is in flight."""
+    store = IdempotencyStore(ttl=60, max_entries=10)
+    submit, calls = _counting_submit(delay=0.1)
+
+    async def scenario():
+        task = asyncio.create_task(store.run("k", b"body", submit))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await store.run("k", b"body", submit)
+
+    assert asyncio.run(scenario()) == ("ok", True)
+    assert len(calls) == 1
+
+
+def test_store_is_bounded():
+    """Test that the oldest entries are evicted beyond max_entries."""
+    store = IdempotencyStore(ttl=60, max_entries=2)
+    submit, _ = _counting_submit()
+
+    async def scenario():
+        for key in ("a", "b", "c", "d"):
+            await store.run(key, b"body", submit)
+
+    asyncio.run(scenario())
+
+    assert len(store._entries) <= 2
+    assert list(store._entries) == ["c", "d"]
+
+
+def test_duplicate_on_another_worker_is_not_resent(tmp_path):
+    """Test that workers sharing the SQLite table send an order once and replay it on the others."""
+    path = str(tmp_path / "idempotency.db")
+    first = IdempotencyStore(ttl=60, max_entries=10, shared=SharedIdempotencyTable(path))
+    second = IdempotencyStore(ttl=60, max_entries=10, shared=SharedIdempotencyTable(path))
+    submit, calls = _counting_submit(result={"status": "ok"}, delay=0.1)
+
+    async def scenario():
+        return await asyncio.gather(
+            first.run("k", b"body", submit),
+            second.run("k", b"body", submit),
+        )
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert sorted(replayed for _, replayed in results) == [False, True]
+    assert all(result == {"status": "ok"} for result, _ in results)
+
+    with pytest.raises(IdempotencyKeyConflictError):
+        asyncio.run(second.run("k", b"other", submit))
+
+
+def test_shared_claims_do_not_block_the_event_loop(tmp_path):
+    """Test that a slow claim in the shared table does not hold up other orders on the same worker."""
+
+    class SlowTable(SharedIdempotencyTable):
+        def claim(self, *args):
+            time.sleep(0.2)
+            return super().claim(*args)
+
+    store = IdempotencyStore(ttl=60, max_entries=10, shared=SlowTable(str(tmp_path / "idempotency.db")))
+    submit, calls = _counting_submit()
+
+    async def scenario():
+        start = time.monotonic()
+        await asyncio.gather(*(store.run(key, b"body", submit) for key in ("a", "b", "c")))
+        return time.monotonic() - start
+
+    assert asyncio.run(scenario()) < 0.5
+    assert len(calls) == 3
@@ -0,0 +1,87 @@
+import time
+import pytest
+from unittest.mock import Mock
+from app.services.info_proxy_service import InfoProxyService
+
+
+def _upstream_response(content=b'{"levels":[]}', status_code=200):
+    response = Mock()
+    response.status_code = status_code
+    response.content = content
+    response.iter_content.return_value = iter([content[:5], content[5:]])
+    return response
+
+
+@pytest.fixture
+def service():
+    """Mock HyperliquidService returning a streamed upstream response."""
+    hs = Mock()
+    hs.open_info_stream.side_effect = lambda body: _upstream_response()
+    return hs
+
+
+def test_canonicalize_sorts_keys():
+    """Test that equivalent payloads produce the same cache key."""
+    a = InfoProxyService.canonicalize({"type": "l2Book", "coin": "BTC"})
+    b = InfoProxyService.canonicalize({"coin": "BTC", "type": "l2Book"})
+
+    assert a == b == b'{"coin":"BTC","type":"l2Book"}'
+
+
+def test_uncached_query_streams_upstream_bytes(service):
+    """Test that uncached query types are streamed chunk by chunk."""
+    proxy = InfoProxyService(service, cache_ttls={}, max_entries=10)
+
+    status_code, chunks, cache_hit = proxy.query({"type": "l2Book", "coin": "BTC"})
+
+    assert status_code == 200
+    assert b"".join(chunks) == b'{"levels":[]}'
+    assert cache_hit is False
+    service.open_info_stream.assert_called_once_with(b'{"coin":"BTC","type":"l2Book"}')
+
+
+def test_cached_query_hits_cache(service):
+    """Test that cached query types only reach upstream once per TTL."""
+    proxy = InfoProxyService(service, cache_ttls={"meta": 60}, max_entries=10)
+
+    proxy.query({"type": "meta"})
+    status_code, chunks, cache_hit = proxy.query({"type": "meta"})
+
+    assert cache_hit is True
+    assert b"".join(chunks) == b'{"levels":[]}'
+    assert service.open_info_stream.call_count == 1
+
+
+def test_expired_entry_is_refetched(service):
+    """Test that expired entries go back upstream."""
+    proxy = InfoProxyService(service, cache_ttls={"meta": 0.0001}, max_entries=10)
+
+    proxy.query({"type": "meta"})
+    time.sleep(0.01)
+    proxy.query({"type": "meta"})
+
+    assert service.open_info_stream.call_count == 2
+
+
+def test_errors_are_not_cached():
+    """Test that upstream errors are passed through but never cached."""
+    hs = Mock()
+    hs.open_info_stream.side_effect = lambda body: _upstream_response(b'{"error":"bad"}', 422)
+    proxy = InfoProxyService(hs, cache_ttls={"meta": 60}, max_entries=10)
+
+    status_code, chunks, _ = proxy.query({"type": "meta"})
+    proxy.query({"type": "meta"})
+
+    assert status_code == 422
+    assert hs.open_info_stream.call_count == 2
+
+
+def test_cache_is_bounded(service):
+    """Test that the least recently used entries are evicted."""
+    proxy = InfoProxyService(service, cache_ttls={"l2Book": 60}, max_entries=2)
+
+    for coin in ("BTC", "ETH", "SOL"):
+        proxy.query({"type": "l2Book", "coin": coin})
+
+    assert len(proxy._cache) == 2
+    assert proxy.get_cached(InfoProxyService.canonicalize({"type": "l2Book", "coin": "BTC"})) is None
@@ -0,0 +1,47 @@
+import pytest
+import eth_account
+from hyperliquid.utils.signing import sign_l1_action as sdk_sign_l1_action
+import hyperliquid.exchange as hl_exchange
+
+from app.services.l1_signer import L1Signer, sign_l1_action
+
+WALLET = eth_account.Account.from_key("0x" + "11" * 32)
+VAULT = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+ACTION = {
+    "type": "order",
+    "orders": [{"a": 0, "b": True, "p": "100000", "s": "0.01", "r": False, "t": {"limit": {"tif": "Ioc"}}}],
+    "grouping": "na",
+}
+
+
+@pytest.mark.parametrize("active_pool", [None, VAULT])
+@pytest.mark.parametrize("is_mainnet", [True, False])
+def test_signature_matches_sdk(active_pool, is_mainnet):
+    """Test that the fast path produces the exact SDK signature."""
+    expected = sdk_sign_l1_action(WALLET, ACTION, active_pool, 1700000000000, is_mainnet)
+
+    assert L1Signer(WALLET).sign(ACTION, active_pool, 1700000000000, is_mainnet) == expected
+
+
+def test_sign_batch_matches_single_signatures():
+    """Test that batch signing returns one SDK-identical signature per request."""
+    signer = L1Signer(WALLET)
+    requests = [(ACTION, None, 1700000000000 + i, True) for i in range(5)]
+
+    assert signer.sign_batch(requests) == [sdk_sign_l1_action(WALLET, *request) for request in requests]
+
+
+def test_process_pool_signing_matches_sdk():
+    """Test that signing in the process pool produces the SDK signature."""
+    signer = L1Signer(WALLET, processes=1)
+    try:
+        signature = signer.sign(ACTION, VAULT, 1700000000000, True)
+    finally:
+        signer.close()
+
+    assert signature == sdk_sign_l1_action(WALLET, ACTION, VAULT, 1700000000000, True)
+
+
+def test_exchange_uses_fast_path():
+    """Test that the SDK Exchange module is routed to the fast signer."""
+    assert hl_exchange.sign_l1_action is sign_l1_action
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from app.services.market_data_service import MarketDataService, MidPrices, OrderBook
+
+
+def _levels(*pairs):
+    return [{"px": str(px), "sz": str(sz), "n": 1} for px, sz in pairs]
+
+
+@pytest.fixture
+def book():
+    """Create a BTC book with three levels per side."""
+    order_book = OrderBook("BTC")
+    order_book.apply_snapshot(
+        _levels((99, 1), (98, 2), (97, 3)),
+        _levels((101, 1), (102, 2), (103, 3)),
+        1000
+    )
+    return order_book
+
+
+def test_depth(book):
+    """Test that depth returns the best levels first."""
+    depth = book.depth(2)
+
+    assert depth["mid"] == 100.0
+    assert depth["bids"] == [[99.0, 1.0], [98.0, 2.0]]
+    assert depth["asks"] == [[101.0, 1.0], [102.0, 2.0]]
+
+
+def test_quote_buy_walks_asks(book):
+    """Test that a buy quote computes the VWAP across ask levels."""
+    quote = book.quote(2, is_buy=True)
+
+    assert quote["fullyFilled"] is True
+    assert quote["vwap"] == pytest.approx(101.5)
+    assert quote["worstPx"] == 102.0
+    assert quote["slippage"] == pytest.approx(0.015)
+
+
+def test_quote_sell_within_first_level(book):
+    """Test that a small sell is priced at the best bid."""
+    quote = book.quote(0.5, is_buy=False)
+
+    assert quote["vwap"] == pytest.approx(99.0)
+    assert quote["slippage"] == pytest.approx(0.01)
+
+
+def test_quote_exceeding_depth(book):
+    """Test that an order larger than the visible book is reported as partial."""
+    quote = book.quote(10, is_buy=True)
+
+    assert quote["fullyFilled"] is False
+    assert quote["filledSize"] == 6.0
+    assert quote["worstPx"] == 103.0
+
+
+def test_snapshot_overwrites_previous_levels(book):
+    """Test that a new snapshot replaces the levels in place."""
+    bid_px = book.bid_px
+    book.apply_snapshot(_levels((50, 1)), _levels((51, 1)), 2000)
+
+    assert book.bid_px is bid_px
+    assert book.depth()["bids"] == [[50.0, 1.0]]
+    assert book.time == 2000
+
+
+def test_service_ignores_unknown_coins():
+    """Test that l2Book messages for unsubscribed coins are dropped."""
+    service = MarketDataService()
+    service.books["BTC"] = OrderBook("BTC")
+
+    service._on_message_received({
+        "channel": "l2Book",
+        "data": {"coin": "ETH", "time": 1, "levels": [_levels((1, 1)), _levels((2, 1))]}
+    })
+    assert service.get_book("ETH") is None
+    assert service.get_book("BTC") is None
+
+    service._on_message_received({
+        "channel": "l2Book",
+        "data": {"coin": "BTC", "time": 1, "levels": [_levels((1, 1)), _levels((2, 1))]}
+    })
+    assert service.get_book("BTC").mid() == 1.5
+
+
+def test_wait_for_update_is_woken_by_snapshot():
+    """Test that a waiter returns as soon as another thread applies a newer snapshot, and False on timeout."""
+    book = OrderBook("BTC")
+    book.apply_snapshot(_levels((1, 1)), _levels((2, 1)), 1)
+    assert not book.wait_for_update(1, 0.01)
+
+    threading.Timer(0.05, book.apply_snapshot, args=(_levels((1, 1)), _levels((2, 2)), 2)).start()
+    start = time.monotonic()
+    assert book.wait_for_update(1, 2)
+    assert time.monotonic() - start < 1
+    assert book.time == 2
+
+
+def test_mids_version_tracks_changes():
+    """Test that the mids version only moves when a price changes, and per-coin versions with it."""
+    mids = MidPrices(capacity=1)
+    assert mids.apply({"BTC": "100", "ETH": "10"}, 1000)
+    version = mids.version
+    btc_version = mids.get("BTC")[1]
+
+    assert not mids.apply({"BTC": "100", "ETH": "10"}, 2000)
+    assert mids.version == version
+
+    assert mids.apply({"BTC": "100", "ETH": "11"}, 3000)
+    assert mids.get("ETH") == (11.0, mids.version)
+    assert mids.get("BTC") == (100.0, btc_version)
+    assert mids.get("DOGE") is None
+
+
+def test_changed_event_is_set_from_another_thread():
+    """Test that a waiter on the event loop is woken when another thread applies a new version."""
+    mids = MidPrices()
+    mids.apply({"BTC": "100"})
+
+    async def scenario():
+        changed = mids.changed_event()
+        assert mids.changed_event() is changed
+        threading.Timer(0.05, mids.apply, args=({"BTC": "101"},)).start()
+        await asyncio.wait_for(changed.wait(), 2)
+        return mids.changed_event() is not changed
+
+    assert asyncio.run(scenario())
+    assert mids.get("BTC")[0] == 101.0
+
+
+def test_service_applies_all_mids():
+    """Test that allMids messages update the mids held by the service."""
+    service = MarketDataService()
+    assert service.get_mids() is None
+
+    service._on_message_received({"channel": "allMids", "data": {"mids": {"BTC": "100.5"}}})
+    assert service.get_mids().get("BTC")[0] == 100.5
@@ -0,0 +1,45 @@
+from app.services.message_recorder import MessageRecorder, read_recording
+
+
+def _message(tid):
+    return {"channel": "userFills", "data": {"user": "0xabc", "fills": [{"coin": "BTC", "tid": tid}]}}
+
+
+def test_record_and_read_back(tmp_path):
+    """Test that recorded messages are read back in order with their timestamps."""
+    path = str(tmp_path / "recording.bin")
+    recorder = MessageRecorder(path, flush_interval=0.05, batch_size=2)
+    recorder.start()
+    for tid in range(5):
+        recorder.append(_message(tid))
+    recorder.stop()
+
+    records = list(read_recording(path))
+
+    assert [message["data"]["fills"][0]["tid"] for _, message in records] == [0, 1, 2, 3, 4]
+    assert all(isinstance(recorded_at, float) for recorded_at, _ in records)
+
+
+def test_recording_is_append_only(tmp_path):
+    """Test that a new session appends to an existing recording."""
+    path = str(tmp_path / "recording.bin")
+    for tid in range(2):
+        recorder = MessageRecorder(path, flush_interval=0.05)
+        recorder.start()
+        recorder.append(_message(tid))
+        recorder.stop()
+
+    assert len(list(read_recording(path))) == 2
+
+
+def test_truncated_frame_is_ignored(tmp_path):
+    """Test that a partially written last frame does not break reading."""
+    path = str(tmp_path / "recording.bin")
+    recorder = MessageRecorder(path, flush_interval=0.05)
+    recorder.start()
+    recorder.append(_message(1))
+    recorder.stop()
+    with open(path, "ab") as f:
+        f.write(b"\x00\x00\x01\x00partial")
+
+    assert len(list(read_recording(path))) == 1
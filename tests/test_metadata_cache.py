@@ -0,0 +1,68 @@
+import os
+import time
+import pytest
+from unittest.mock import patch
+from app.services.metadata_cache import MetadataCache, SNAPSHOT_VERSION
+
+META = {"universe": [{"name": "BTC", "szDecimals": 5}]}
+SPOT_META = {"universe": [], "tokens": []}
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    """Path of a metadata snapshot in a temporary directory."""
+    return str(tmp_path / "metadata.json")
+
+
+def _cache(path, max_age=3600):
+    return MetadataCache(path=path, refresh_interval=3600, max_age=max_age, base_url="https://api.test")
+
+
+def _snapshot(fetched_at=None):
+    return {
+        "version": SNAPSHOT_VERSION,
+        "baseUrl": "https://api.test",
+        "fetchedAt": time.time() if fetched_at is None else fetched_at,
+        "meta": META,
+        "spotMeta": SPOT_META,
+    }
+
+
+def test_first_get_downloads_and_writes_snapshot(cache_path):
+    """Test that a missing snapshot is downloaded once and written to disk."""
+    cache = _cache(cache_path)
+    with patch.object(MetadataCache, '_fetch', return_value=_snapshot()) as mock_fetch:
+        assert cache.get() == (META, SPOT_META)
+        assert cache.get() == (META, SPOT_META)
+
+    assert mock_fetch.call_count == 1
+    assert os.path.exists(cache_path)
+
+
+def test_other_process_reuses_snapshot(cache_path):
+    """Test that a fresh snapshot on disk avoids any download."""
+    with patch.object(MetadataCache, '_fetch', return_value=_snapshot()):
+        _cache(cache_path).get()
+
+    with patch.object(MetadataCache, '_fetch', side_effect=AssertionError("no download expected")):
+        assert _cache(cache_path).get() == (META, SPOT_META)
+
+
+def test_expired_snapshot_is_served_when_upstream_is_down(cache_path):
+    """Test that an expired snapshot is still used if the refresh fails."""
+    with patch.object(MetadataCache, '_fetch', return_value=_snapshot(fetched_at=0)):
+        _cache(cache_path).get()
+
+    with patch.object(MetadataCache, '_fetch', side_effect=ConnectionError("down")) as mock_fetch:
+        assert _cache(cache_path).get() == (META, SPOT_META)
+    assert mock_fetch.call_count == 1
+
+
+def test_snapshot_of_other_version_is_ignored(cache_path):
+    """Test that snapshots written with another layout version are re-downloaded."""
+    with patch.object(MetadataCache, '_fetch', return_value={**_snapshot(), "version": SNAPSHOT_VERSION - 1}):
+        _cache(cache_path).get()
+
+    with patch.object(MetadataCache, '_fetch', return_value=_snapshot()) as mock_fetch:
+        _cache(cache_path).get()
+    assert mock_fetch.call_count == 1
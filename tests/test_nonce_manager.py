@@ -0,0 +1,70 @@
+import threading
+import time
+from unittest.mock import patch
+
+import hyperliquid.exchange as hl_exchange
+from app.services.nonce_manager import NonceManager, MAX_NONCE_LAG_MS, claim_worker_slot, use_nonce_manager
+
+
+def test_concurrent_nonces_are_unique():
+    """Test that concurrent callers never receive the same nonce."""
+    manager = NonceManager()
+    results = []
+
+    def worker():
+        results.extend(manager.next() for _ in range(1000))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(results)) == 8000
+
+
+def test_lagging_counter_catches_up_with_clock():
+    """Test that an idle counter is moved forward to the current time."""
+    manager = NonceManager()
+    first = manager.next()
+
+    with patch('app.services.nonce_manager.time.time', return_value=time.time() + 10):
+        later = manager.next()
+
+    assert later - first >= 10_000 - MAX_NONCE_LAG_MS
+
+
+def test_sdk_timestamp_uses_bound_manager():
+    """Test that the SDK timestamp only comes from the manager bound to the current thread."""
+    manager = NonceManager()
+
+    with use_nonce_manager(manager):
+        inside = [hl_exchange.get_timestamp_ms() for _ in range(5)]
+
+    assert len(set(inside)) == 5
+    assert manager.next() > max(inside)
+
+
+def test_strided_managers_never_collide():
+    """Test that managers with different offsets produce disjoint nonce sequences."""
+    managers = [NonceManager(stride=3, offset=offset) for offset in range(3)]
+
+    nonces = [manager.next() for manager in managers for _ in range(200)]
+
+    assert len(set(nonces)) == 600
+    for offset, manager in enumerate(managers):
+        assert manager.next() % 3 == offset
+
+
+def test_worker_slots_are_exclusive(tmp_path):
+    """Test that a held worker slot is not handed out again."""
+    import subprocess
+    import sys
+    code = (
+        "from app.services.nonce_manager import claim_worker_slot;"
+        f"print(claim_worker_slot(2, {str(tmp_path)!r}))"
+    )
+
+    assert claim_worker_slot(2, str(tmp_path)) == 0
+    other = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert other.stdout.strip().splitlines()[-1] == "1"
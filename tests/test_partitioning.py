@@ -0,0 +1,63 @@
+import pytest
+from unittest.mock import patch
+from app.workers.partitioning import HashRing
+
+
+ADDRESSES = [f"0x{i:040x}" for i in range(2000)]
+
+
+def test_owner_is_deterministic_and_case_insensitive():
+    """Test that an address always maps to the same worker."""
+    ring = HashRing(["worker-0", "worker-1", "worker-2"])
+    address = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+
+    assert ring.owner(address) == ring.owner(address.lower())
+    assert ring.owner(address) == HashRing(["worker-2", "worker-1", "worker-0"]).owner(address)
+
+
+def test_partition_is_balanced():
+    """Test that addresses are spread across all workers."""
+    partitions = HashRing([f"worker-{i}" for i in range(4)]).partition(ADDRESSES)
+
+    assert sum(len(p) for p in partitions.values()) == len(ADDRESSES)
+    for addresses in partitions.values():
+        assert 300 < len(addresses) < 700
+
+
+def test_adding_worker_moves_minimal_slice():
+    """Test that adding a worker only moves addresses to the new worker."""
+    ring = HashRing([f"worker-{i}" for i in range(4)])
+    before = {addr: ring.owner(addr) for addr in ADDRESSES}
+
+    ring.add_node("worker-4")
+    moved = [addr for addr in ADDRESSES if ring.owner(addr) != before[addr]]
+
+    assert all(ring.owner(addr) == "worker-4" for addr in moved)
+    assert len(moved) < len(ADDRESSES) * 0.3
+
+
+def test_remove_node():
+    """Test that a removed worker no longer owns addresses."""
+    ring = HashRing(["worker-0", "worker-1"])
+    ring.remove_node("worker-1")
+
+    assert ring.nodes == ["worker-0"]
+    assert all(ring.owner(addr) == "worker-0" for addr in ADDRESSES[:50])
+
+
+def test_empty_ring():
+    """Test that an empty ring cannot assign addresses."""
+    with pytest.raises(ValueError):
+        HashRing().owner(ADDRESSES[0])
+
+
+def test_listener_only_watches_owned_addresses():
+    """Test that a partitioned listener keeps only its slice of the watch list."""
+    from app.workers.trades_listener import TradesListener
+
+    ring = HashRing(["worker-0", "worker-1"])
+    with patch('app.workers.trades_listener.watchlist_service') as mock_watchlist:
+        mock_watchlist.get.return_value = ADDRESSES[:100]
+        listener = TradesListener(worker_id="worker-1", ring=ring)
+
+    assert listener.users_list == ring.partition(ADDRESSES[:100])["worker-1"]
@@ -0,0 +1,119 @@
+import time
+import pytest
+from app.services.position_state_service import PositionStateService
+
+
+ADDRESS = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+
+
+@pytest.fixture
+def engine():
+    """Create a state engine seeded with one BTC long."""
+    service = PositionStateService(max_staleness=60, reconcile_interval=60, use_webdata=False)
+    service.update_addresses([ADDRESS])
+    service.seed(ADDRESS, {
+        'time': 1000,
+        'marginSummary': {'accountValue': '1000.0', 'totalRawUsd': '1000.0'},
+        'assetPositions': [
+            {'type': 'oneWay', 'position': {'coin': 'BTC', 'szi': '1.0', 'entryPx': '100.0'}}
+        ]
+    })
+    return service
+
+
+def _positions(snapshot):
+    return {p['position']['coin']: p['position'] for p in snapshot['assetPositions']}
+
+
+def test_snapshot_unknown_address(engine):
+    """Test that unwatched addresses are not served from the engine."""
+    assert engine.get_snapshot("0x0000000000000000000000000000000000000000") is None
+
+
+def test_increase_position_updates_entry(engine):
+    """Test that adding to a position averages the entry price."""
+    engine.apply_fills(ADDRESS, [{'coin': 'BTC', 'px': '200', 'sz': '1', 'side': 'B', 'time': 2000, 'closedPnl': '0'}])
+
+    position = _positions(engine.get_snapshot(ADDRESS))['BTC']
+    assert position['szi'] == '2'
+    assert position['entryPx'] == '150'
+
+
+def test_reduce_position_keeps_entry_and_realizes_pnl(engine):
+    """Test that reducing a position keeps the entry and accumulates realized PnL."""
+    engine.apply_fills(ADDRESS, [{'coin': 'BTC', 'px': '110', 'sz': '0.5', 'side': 'A', 'time': 2000, 'closedPnl': '5'}])
+
+    snapshot = engine.get_snapshot(ADDRESS)
+    position = _positions(snapshot)['BTC']
+    assert position['szi'] == '0.5'
+    assert position['entryPx'] == '100'
+    assert snapshot['realizedPnl'] == '5'
+
+
+def test_flip_and_close_position(engine):
+    """Test that flipping resets the entry and closing removes the position."""
+    engine.apply_fills(ADDRESS, [{'coin': 'BTC', 'px': '90', 'sz': '3', 'side': 'A', 'time': 2000, 'closedPnl': '-10'}])
+    position = _positions(engine.get_snapshot(ADDRESS))['BTC']
+    assert position['szi'] == '-2'
+    assert position['entryPx'] == '90'
+
+    engine.apply_fills(ADDRESS, [{'coin': 'BTC', 'px': '80', 'sz': '2', 'side': 'B', 'time': 3000, 'closedPnl': '20'}])
+    snapshot = engine.get_snapshot(ADDRESS)
+    assert 'BTC' not in _positions(snapshot)
+    assert snapshot['realizedPnl'] == '10'
+
+
+def test_fills_before_seed_are_ignored(engine):
+    """Test that fills already included in the seeded state are not applied twice."""
+    engine.apply_fills(ADDRESS, [{'coin': 'BTC', 'px': '200', 'sz': '1', 'side': 'B', 'time': 500, 'closedPnl': '0'}])
+
+    assert _positions(engine.get_snapshot(ADDRESS))['BTC']['szi'] == '1.0'
+
+
+def test_stale_snapshot_is_not_served(engine):
+    """Test that a snapshot older than the staleness bound is not served."""
+    engine.states[ADDRESS.lower()].seeded_at = time.time() - 120
+
+    assert engine.get_snapshot(ADDRESS) is None
+
+
+def test_update_addresses_drops_unwatched(engine):
+    """Test that removing an address from the watch list drops its state."""
+    engine.update_addresses([])
+
+    assert not engine.is_watched(ADDRESS)
+    assert engine.get_snapshot(ADDRESS) is None
+
+
+def test_spot_fills_are_ignored(engine):
+    """Test that spot fills do not create perp positions nor change the realized PnL."""
+    engine.apply_fills(ADDRESS, [
+        {'coin': '@107', 'px': '20', 'sz': '5', 'side': 'B', 'time': 2000, 'closedPnl': '3'},
+        {'coin': 'PURR/USDC', 'px': '0.2', 'sz': '100', 'side': 'A', 'time': 2000, 'closedPnl': '1'},
+    ])
+
+    snapshot = engine.get_snapshot(ADDRESS)
+    assert set(_positions(snapshot)) == {'BTC'}
+    assert snapshot['realizedPnl'] == '0'
+
+
+def test_reseed_replays_fills_newer_than_snapshot(engine):
+    """Test that fills received while a reconciliation snapshot was fetched survive the reseed, counted once."""
+    engine.apply_fills(ADDRESS, [
+        {'coin': 'BTC', 'px': '110', 'sz': '0.5', 'side': 'A', 'time': 1500, 'closedPnl': '5'},
+        {'coin': 'ETH', 'px': '10', 'sz': '2', 'side': 'B', 'time': 3000, 'closedPnl': '0'},
+    ])
+
+    # Snapshot taken at 2000: it includes the BTC fill but not the ETH one.
+    engine.seed(ADDRESS, {
+        'time': 2000,
+        'assetPositions': [{'type': 'oneWay', 'position': {'coin': 'BTC', 'szi': '0.5', 'entryPx': '100.0'}}]
+    })
+    snapshot = engine.get_snapshot(ADDRESS)
+    assert _positions(snapshot)['BTC']['szi'] == '0.5'
+    assert _positions(snapshot)['ETH']['szi'] == '2'
+    assert snapshot['realizedPnl'] == '5'
+
+    # An older snapshot finishing late does not roll the state back.
+    engine.seed(ADDRESS, {'time': 1200, 'assetPositions': []})
+    assert set(_positions(engine.get_snapshot(ADDRESS))) == {'BTC', 'ETH'}
@@ -0,0 +1,157 @@
+import threading
+import time
+
+import pytest
+from hyperliquid.utils.error import ClientError, ServerError
+
+from app.core.exceptions import UpstreamUnavailableError
+from app.services.resilience import CircuitBreaker, UpstreamGuard
+
+
+def make_guard(**kwargs):
+    options = dict(deadline=0.5, hedge=True, hedge_min_delay=0.01, breaker=CircuitBreaker(2, 60), stale_max_age=60)
+    options.update(kwargs)
+    return UpstreamGuard("test", **options)
+
+
+def test_fresh_value_has_no_age():
+    """Test that a successful call returns its value with age 0."""
+    guard = make_guard()
+
+    assert guard.call("k", lambda: {"v": 1}) == ({"v": 1}, 0.0)
+    assert guard.metrics["hedged"] == 0
+
+
+def test_hedged_request_wins_over_slow_one():
+    """Test that a second request is sent after the hedge delay and the first answer wins."""
+    guard = make_guard()
+    for _ in range(20):
+        guard.latency.record(0.01)
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(2)
+            return "slow"
+        return "fast"
+
+    start = time.monotonic()
+    value, age = guard.call("k", fetch)
+    release.set()
+
+    assert value == "fast" and age == 0.0
+    assert time.monotonic() - start < 0.3
+    assert guard.metrics["hedged"] == 1
+
+
+def test_failure_is_retried_by_hedge():
+    """Test that an early upstream error triggers the hedged request right away."""
+    guard = make_guard()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ServerError(502, "bad gateway")
+        return "ok"
+
+    assert guard.call("k", fetch) == ("ok", 0.0)
+    assert len(calls) == 2
+
+
+def test_breaker_opens_and_serves_stale_value():
+    """Test that the circuit opens after repeated failures and the last good value is served without calling upstream."""
+    guard = make_guard(hedge=False)
+    guard.call("k", lambda: "good")
+
+    def failing():
+        raise ServerError(500, "down")
+
+    for _ in range(2):
+        value, age = guard.call("k", failing)
+        assert value == "good" and age > 0
+    assert guard.breaker.state == "open"
+
+    calls = []
+    value, age = guard.call("k", lambda: calls.append(1))
+    assert value == "good" and age > 0
+    assert calls == []
+    assert guard.metrics["rejected"] == 1
+
+
+def test_deadline_without_stale_value_raises():
+    """Test that a timeout with nothing cached raises UpstreamUnavailableError."""
+    guard = make_guard(deadline=0.1, hedge=False)
+    release = threading.Event()
+
+    start = time.monotonic()
+    with pytest.raises(UpstreamUnavailableError):
+        guard.call("k", release.wait, 2)
+    release.set()
+
+    assert time.monotonic() - start < 0.5
+    assert guard.metrics["timeouts"] == 1
+
+
+def test_stale_value_too_old_is_not_served():
+    """Test that a last good value older than stale_max_age is not served."""
+    guard = make_guard(hedge=False, stale_max_age=0)
+    guard.call("k", lambda: "good")
+    time.sleep(0.01)
+
+    def failing():
+        raise ServerError(500, "down")
+
+    with pytest.raises(UpstreamUnavailableError):
+        guard.call("k", failing)
+
+
+def test_client_error_is_raised_and_keeps_circuit_closed():
+    """Test that a 4xx answer is passed through and not counted as an upstream failure."""
+    guard = make_guard()
+    calls = []
+
+    def invalid():
+        calls.append(1)
+        raise ClientError(422, None, "invalid user", None)
+
+    for _ in range(3):
+        with pytest.raises(ClientError):
+            guard.call("k", invalid)
+
+    assert guard.breaker.state == "closed"
+    assert len(calls) == 3
+
+
+def test_rate_limited_call_is_not_hedged_and_opens_circuit():
+    """Test that a 429 answer sends no hedged request and counts as a breaker failure."""
+    guard = make_guard()
+    calls = []
+
+    def rate_limited():
+        calls.append(1)
+        raise ClientError(429, None, "rate limited", None)
+
+    for _ in range(2):
+        with pytest.raises(UpstreamUnavailableError):
+            guard.call("k", rate_limited)
+
+    assert len(calls) == 2
+    assert guard.metrics["hedged"] == 0
+    assert guard.metrics["rate_limited"] == 2
+    assert guard.breaker.state == "open"
+
+
+def test_half_open_trial_closes_circuit():
+    """Test that a successful trial call after reset_timeout closes the circuit."""
+    breaker = CircuitBreaker(1, 0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
@@ -0,0 +1,100 @@
+import subprocess
+import sys
+import time
+
+from app.services.shared_cache import SharedCache, SharedTable, LeaderElection
+from app.services.position_state_service import PositionStateService
+
+
+ADDRESS = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+
+
+def test_put_get_delete(tmp_path):
+    """Test that values are stored, expired by age and deleted."""
+    table = SharedTable(str(tmp_path / "cache.bin"), slots=16, slot_size=256)
+
+    assert table.put("a", b"hello")
+    value, stored_at = table.get("a")
+    assert value == b"hello"
+    assert table.get("a", max_age=60) is not None
+    assert table.get("missing") is None
+
+    table.put("b", b"old", stored_at=time.time() - 120)
+    assert table.get("b", max_age=60) is None
+
+    table.delete("a")
+    assert table.get("a") is None
+
+
+def test_oversized_value_is_rejected(tmp_path):
+    """Test that a value larger than a slot is not stored."""
+    table = SharedTable(str(tmp_path / "cache.bin"), slots=4, slot_size=128)
+
+    assert not table.put("big", b"x" * 200)
+    assert table.get("big") is None
+
+
+def test_values_are_visible_from_another_process(tmp_path):
+    """Test that a value written by one process is read by another one."""
+    path = str(tmp_path / "cache.bin")
+    cache = SharedCache(path=path, slots=16, slot_size=1024, enabled=True)
+    cache.put_json("book:BTC", {"time": 1, "levels": [[], []]})
+
+    code = (
+        "from app.services.shared_cache import SharedCache;"
+        f"print(SharedCache(path={path!r}, slots=16, slot_size=1024).get_json('book:BTC')['time'])"
+    )
+    other = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert other.stdout.strip().splitlines()[-1] == "1"
+
+
+def test_single_leader_is_elected(tmp_path):
+    """Test that the leader lock can only be held by one process at a time."""
+    path = str(tmp_path / "leader.lock")
+    election = LeaderElection(path, on_elected=lambda: None)
+    assert election.try_acquire()
+
+    code = (
+        "from app.services.shared_cache import LeaderElection;"
+        f"print(LeaderElection({path!r}, on_elected=lambda: None).try_acquire())"
+    )
+    other = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert other.stdout.strip().splitlines()[-1] == "False"
+
+    election.stop()
+    other = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert other.stdout.strip().splitlines()[-1] == "True"
+
+
+def test_follower_serves_leader_snapshot(tmp_path):
+    """Test that a worker not running the state engine serves the snapshots published by the leader."""
+    cache = SharedCache(path=str(tmp_path / "cache.bin"), slots=16, slot_size=4096, enabled=True)
+    leader = PositionStateService(max_staleness=60, reconcile_interval=60, use_webdata=False, shared=cache)
+    follower = PositionStateService(max_staleness=60, reconcile_interval=60, use_webdata=False, shared=cache)
+
+    leader.update_addresses([ADDRESS])
+    leader.seed(ADDRESS, {
+        'time': 1000,
+        'marginSummary': {'accountValue': '1000.0'},
+        'assetPositions': [{'type': 'oneWay', 'position': {'coin': 'BTC', 'szi': '1.0', 'entryPx': '100.0'}}]
+    })
+
+    snapshot = follower.get_snapshot(ADDRESS)
+    assert snapshot['assetPositions'][0]['position']['szi'] == '1.0'
+
+    leader.update_addresses([])
+    assert follower.get_snapshot(ADDRESS) is None
+
+
+def test_follower_serves_leader_mids(tmp_path):
+    """Test that a worker without the allMids subscription serves the mids published by the leader."""
+    from app.services.market_data_service import MarketDataService
+    cache = SharedCache(path=str(tmp_path / "cache.bin"), slots=16, slot_size=4096, enabled=True)
+    leader = MarketDataService(shared=cache)
+    follower = MarketDataService(shared=cache)
+
+    leader._on_message_received({"channel": "allMids", "data": {"mids": {"BTC": "100", "ETH": "10"}}})
+
+    mids = follower.get_mids()
+    assert mids.get("ETH")[0] == 10.0
+    assert mids.version == leader.mids.version
@@ -0,0 +1,79 @@
+import eth_account
+from fastapi.testclient import TestClient
+
+from app.services.l1_signer import L1Signer
+from app.simulator.server import SimulatorConfig, create_simulator_app
+
+WALLET = eth_account.Account.from_key("0x" + "11" * 32)
+
+
+def _order_action(px: str, is_buy: bool = True):
+    return {
+        "type": "order",
+        "orders": [{"a": 0, "b": is_buy, "p": px, "s": "0.01", "r": False, "t": {"limit": {"tif": "Ioc"}}}],
+        "grouping": "na",
+    }
+
+
+def _post_order(client: TestClient, action):
+    nonce = 1700000000000
+    signature = L1Signer(WALLET).sign(action, None, nonce, False)
+    return client.post("/exchange", json={"action": action, "nonce": nonce, "signature": signature, "vaultAddress": None})
+
+
+def test_info_meta_and_mids():
+    """Test that the simulator serves meta and mid prices for its coins."""
+    client = TestClient(create_simulator_app(SimulatorConfig(seed=1)))
+
+    meta = client.post("/info", json={"type": "meta"}).json()
+    mids = client.post("/info", json={"type": "allMids"}).json()
+
+    assert [asset["name"] for asset in meta["universe"]] == list(mids)
+
+
+def test_exchange_fills_order_for_signer():
+    """Test that a signed marketable order is filled and attributed to the recovered signer."""
+    client = TestClient(create_simulator_app(SimulatorConfig(seed=1)))
+
+    response = _post_order(client, _order_action("1000000")).json()
+    fills = client.post("/info", json={"type": "userFills", "user": WALLET.address}).json()
+    state = client.post("/info", json={"type": "clearinghouseState", "user": WALLET.address}).json()
+
+    assert "filled" in response["response"]["data"]["statuses"][0]
+    assert len(fills) == 1
+    assert state["assetPositions"][0]["position"]["szi"] == "0.01000"
+
+
+def test_exchange_rejects_non_marketable_order():
+    """Test that an order priced away from the book is not filled."""
+    client = TestClient(create_simulator_app(SimulatorConfig(seed=1)))
+
+    response = _post_order(client, _order_action("1")).json()
+
+    assert "error" in response["response"]["data"]["statuses"][0]
+
+
+def test_error_injection():
+    """Test that error_rate=1 makes every REST call fail."""
+    client = TestClient(create_simulator_app(SimulatorConfig(error_rate=1.0)))
+
+    assert client.post("/info", json={"type": "meta"}).status_code == 500
+
+
+def test_websocket_streams_user_fills():
+    """Test that userFills subscribers receive a snapshot then synthetic fills."""
+    config = SimulatorConfig(seed=1, fill_stream_rate=50, book_interval=60)
+    client = TestClient(create_simulator_app(config))
+
+    with client.websocket_connect("/ws") as ws:
+        assert ws.receive_text() == "Websocket connection established."
+        ws.send_json({"method": "subscribe", "subscription": {"type": "userFills", "user": WALLET.address}})
+
+        snapshot = ws.receive_json()
+        assert snapshot["channel"] == "userFills" and snapshot["data"]["isSnapshot"]
+        assert ws.receive_json()["channel"] == "subscriptionResponse"
+
+        update = ws.receive_json()
+        assert update["channel"] == "userFills"
+        assert update["data"]["user"] == WALLET.address.lower()
+        assert "isSnapshot" not in update["data"]
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Generous bound for a cold interpreter on a slow CI machine; the point is that
+# startup no longer waits on (or fails without) the Hyperliquid API.
+STARTUP_BUDGET_SECONDS = 10.0
+
+STARTUP_SCRIPT = """
+import socket
+import time
+
+def _network_disabled(*args, **kwargs):
+    raise OSError("network disabled for the startup test")
+
+socket.socket.connect = _network_disabled
+socket.create_connection = _network_disabled
+
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.api.app import create_app
+
+with TestClient(create_app()) as client:
+    assert client.get("/").status_code == 200
+print(time.perf_counter() - start)
+"""
+
+
+@pytest.mark.slow
+def test_cold_start_without_network():
+    """Test that the API starts and serves a first request quickly with the network down."""
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+    env.update({
+        "TRADING_ENABLED": "true",
+        "SECRET_KEY": "0x" + "11" * 32,
+        "ACCOUNT_ADDRESS": "0x19E7E376E7C213B7E7e7e46cc70A5dD086DAff2A",
+        "API_KEY": "",
+        "STATE_ENGINE_ENABLED": "false",
+        "MARKET_DATA_COINS": "",
+    })
+
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+    elapsed = float(result.stdout.strip().splitlines()[-1])
+    assert elapsed < STARTUP_BUDGET_SECONDS
@@ -0,0 +1,40 @@
+from unittest.mock import MagicMock
+
+from app.workers import supervisor
+from app.workers.supervisor import ListenerSupervisor
+
+
+def _dead_process():
+    process = MagicMock()
+    process.is_alive.return_value = False
+    process.exitcode = 1
+    return process
+
+
+def test_restart_delay_is_capped():
+    """Test that the backoff doubles per attempt and never exceeds MAX_RESTART_DELAY."""
+    delays = [ListenerSupervisor._restart_delay(attempt) for attempt in (1, 2, 3, 10, 10_000)]
+
+    assert delays[:3] == [1, 2, 4]
+    assert delays[3:] == [supervisor.MAX_RESTART_DELAY] * 2
+
+
+def test_restart_count_resets_after_healthy_uptime(monkeypatch):
+    """Test that a worker that ran long enough is restarted without the backoff of its earlier crashes."""
+    sup = ListenerSupervisor(num_workers=1)
+    sup.processes["worker-0"] = _dead_process()
+    sup.restart_counts["worker-0"] = 6
+
+    now = 10_000.0
+    monkeypatch.setattr(supervisor.time, "time", lambda: now)
+    sup.started_at["worker-0"] = now - 10
+    sup._check_workers()
+    assert sup.restart_counts["worker-0"] == 7
+    assert sup.next_restart["worker-0"] == now + supervisor.MAX_RESTART_DELAY
+
+    del sup.next_restart["worker-0"]
+    sup.started_at["worker-0"] = now - supervisor.HEALTHY_UPTIME
+    sup._check_workers()
+    assert sup.restart_counts["worker-0"] == 1
+    assert sup.next_restart["worker-0"] == now + supervisor.INITIAL_RESTART_DELAY
+    assert sup.get_merged_metrics()["worker_restarts"] == 2
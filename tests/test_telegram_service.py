@@ -9,6 +9,7 @@ def telegram_service():
     with patch('app.services.telegram_service.settings') as mock_settings:
         mock_settings.TELEGRAM_BOT_TOKEN = "test_token_123"
         mock_settings.TELEGRAM_CHAT_ID = "test_chat_id_456"
+        mock_settings.TELEGRAM_API_URL = "https://api.telegram.org"
         yield TelegramService()
 
 
@@ -140,3 +141,56 @@ def test_send_message_network_error(mock_post, telegram_service, sample_fill):
 def test_send_trade_alert_without_config(telegram_service_no_config, sample_fill):
     """Test that sending alert without config doesn't crash."""
     telegram_service_no_config.send_trade_alert(sample_fill, "0xTest")
+
+
+@patch('app.services.telegram_service.requests.post')
+def test_fan_out_renders_each_template_once(mock_post, sample_fill):
+    """Test that each destination gets its template and a template is rendered once per fill."""
+    with patch('app.services.telegram_service.settings') as mock_settings:
+        mock_settings.TELEGRAM_BOT_TOKEN = "test_token_123"
+        mock_settings.TELEGRAM_CHAT_ID = "1,2,3:compact"
+        mock_settings.TELEGRAM_API_URL = "https://api.telegram.org"
+        service = TelegramService()
+    mock_post.return_value = Mock(status_code=200)
+
+    with patch('app.services.alert_templates.Template.render', autospec=True, side_effect=lambda self, values: self.source) as render:
+        service.send_trade_alert(sample_fill, "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045")
+
+    assert render.call_count == 2
+    sent = [(call[1]['json']['chat_id'], call[1]['json']['text']) for call in mock_post.call_args_list]
+    assert [chat_id for chat_id, _ in sent] == ["1", "2", "3"]
+    assert sent[0][1] == sent[1][1] != sent[2][1]
+
+
+def test_unknown_destination_template_is_rejected():
+    """Test that a chat configured with an unknown template fails at startup."""
+    from app.core.exceptions import ConfigurationError
+    with patch('app.services.telegram_service.settings') as mock_settings:
+        mock_settings.TELEGRAM_CHAT_ID = "1:fancy"
+        with pytest.raises(ConfigurationError):
+            TelegramService()
+
+
+def test_short_addr_is_memoized():
+    """Test that addresses are shortened once per user."""
+    from app.services.alert_templates import short_addr
+    short_addr.cache_clear()
+    assert short_addr("0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045") == "0xd8dA...6045"
+    short_addr("0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045")
+
+    assert short_addr.cache_info().hits == 1
+
+
+@patch('app.services.telegram_service.TelegramService._send_message')
+def test_failing_chat_does_not_stop_fan_out(mock_send, sample_fill):
+    """Test that an error for one destination does not prevent sending to the next ones."""
+    with patch('app.services.telegram_service.settings') as mock_settings:
+        mock_settings.TELEGRAM_BOT_TOKEN = "test_token_123"
+        mock_settings.TELEGRAM_CHAT_ID = "1,2,3"
+        mock_settings.TELEGRAM_API_URL = "https://api.telegram.org"
+        service = TelegramService()
+    mock_send.side_effect = [RuntimeError("chat not found"), None, None]
+
+    service.send_trade_alert(sample_fill, "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045")
+
+    assert [call.args[1] for call in mock_send.call_args_list] == ["1", "2", "3"]
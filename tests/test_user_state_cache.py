@@ -0,0 +1,150 @@
+import threading
+import time
+
+from app.services.user_state_cache import AccessTracker, UserStateCache
+
+
+ADDRESS = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+
+
+class FakeService:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def fetch_user_state(self, address):
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls.append(address)
+            n = len(self.calls)
+        return {"marginSummary": {"accountValue": str(n)}, "assetPositions": []}, 0.0
+
+
+def make_cache(service, **kwargs):
+    options = dict(ttl=0.3, max_stale=5, refresh_budget=50, hot_keys=100, min_hits=2, half_life=60, max_entries=100, workers=1, enabled=True)
+    options.update(kwargs)
+    return UserStateCache(service, **options)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_disabled_without_ttl():
+    """Test that the cache stays disabled when the TTL is 0."""
+    assert not make_cache(FakeService(), ttl=0).enabled
+
+
+def test_miss_then_hit():
+    """Test that the first read goes upstream and the next ones are served from memory."""
+    service = FakeService()
+    cache = make_cache(service)
+
+    state, age, status = cache.get(ADDRESS)
+    assert status == "MISS" and age == 0.0
+    state, age, status = cache.get(ADDRESS)
+    assert status == "HIT" and state["marginSummary"]["accountValue"] == "1"
+    assert len(service.calls) == 1
+
+
+def test_concurrent_misses_share_one_call():
+    """Test that simultaneous misses on one address make a single upstream call."""
+    service = FakeService(delay=0.1)
+    cache = make_cache(service)
+
+    threads = [threading.Thread(target=cache.get, args=(ADDRESS,)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(service.calls) == 1
+
+
+def test_stale_is_served_while_refreshing():
+    """Test that an expired value is served immediately and refreshed in the background."""
+    service = FakeService()
+    cache = make_cache(service, ttl=0.05, min_hits=100)
+    cache.get(ADDRESS)
+    cache.start()
+    try:
+        time.sleep(0.1)
+        state, age, status = cache.get(ADDRESS)
+        assert status == "STALE" and age > 0.05
+        assert state["marginSummary"]["accountValue"] == "1"
+
+        assert wait_for(lambda: len(service.calls) == 2)
+        assert wait_for(lambda: cache.get(ADDRESS)[2] == "HIT")
+    finally:
+        cache.stop()
+
+
+def test_hot_address_is_refreshed_before_expiry():
+    """Test that a frequently requested address never expires while it stays hot."""
+    service = FakeService(delay=0.02)
+    cache = make_cache(service, ttl=0.3)
+    cache.start()
+    try:
+        statuses = []
+        for _ in range(25):
+            statuses.append(cache.get(ADDRESS)[2])
+            time.sleep(0.04)
+
+        assert statuses[0] == "MISS"
+        assert set(statuses[1:]) == {"HIT"}
+        assert cache.metrics["refreshes"] >= 2
+    finally:
+        cache.stop()
+
+
+def test_cold_address_is_not_refreshed_ahead():
+    """Test that an address requested once is left to expire."""
+    service = FakeService()
+    cache = make_cache(service, ttl=0.1)
+    cache.get(ADDRESS)
+    cache.start()
+    try:
+        time.sleep(0.3)
+        assert len(service.calls) == 1
+    finally:
+        cache.stop()
+
+
+def test_refreshes_respect_budget():
+    """Test that background refreshes never exceed the upstream budget."""
+    service = FakeService()
+    cache = make_cache(service, ttl=0.1, refresh_budget=5)
+    addresses = [f"0x{i:040x}" for i in range(20)]
+    for address in addresses:
+        for _ in range(3):
+            cache.get(address)
+    cache.start()
+    try:
+        time.sleep(1.0)
+    finally:
+        cache.stop()
+
+    refreshes = len(service.calls) - len(addresses)
+    # 1s of budget plus the initial burst of one second's worth of tokens.
+    assert refreshes <= 11
+    assert cache.metrics["deferred"] > 0
+
+
+def test_access_tracker_decays_and_prunes():
+    """Test that scores halve every half-life and only the most requested addresses are kept."""
+    tracker = AccessTracker(half_life=10, capacity=2)
+    tracker.hit("a", now=0)
+    tracker.hit("a", now=0)
+    assert abs(tracker.score("a", now=10) - 1.0) < 1e-9
+
+    for key in ("b", "c", "d", "e"):
+        tracker.hit(key, now=10)
+    assert tracker.score("a", now=10) > 0
+    tracker.hit("f", now=10)
+    assert len(tracker._scores) <= 4
@@ -0,0 +1,107 @@
+import pytest
+from unittest.mock import Mock, patch
+from app.core.exceptions import InvalidAddressError
+from app.services.subscription_manager import SubscriptionManager
+from app.services.watchlist_service import WatchlistService
+
+
+ADDR_1 = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+ADDR_2 = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+@pytest.fixture
+def watchlist(tmp_path):
+    """Create a WatchlistService seeded from a mocked USERS_LISTENED."""
+    with patch('app.services.watchlist_service.settings') as mock_settings:
+        mock_settings.USERS_LISTENED = [ADDR_1]
+        yield WatchlistService(path=str(tmp_path / "watchlist.json"))
+
+
+def test_watchlist_defaults_to_users_listened(watchlist):
+    """Test that the watch list is seeded from USERS_LISTENED."""
+    assert watchlist.get() == [ADDR_1]
+
+
+def test_add_and_remove_addresses(watchlist):
+    """Test that added and removed addresses are persisted."""
+    assert watchlist.add([ADDR_2.lower()]) == [ADDR_1, ADDR_2]
+    assert watchlist.add([ADDR_2]) == [ADDR_1, ADDR_2]
+    assert watchlist.remove([ADDR_1]) == [ADDR_2]
+    assert watchlist.get() == [ADDR_2]
+
+
+def test_add_invalid_address(watchlist):
+    """Test that invalid addresses are rejected."""
+    with pytest.raises(InvalidAddressError):
+        watchlist.add(["0xinvalid"])
+
+
+def test_has_changed_after_write(watchlist):
+    """Test that file modifications are detected once."""
+    assert not watchlist.has_changed()
+
+    watchlist.add([ADDR_2])
+
+    assert watchlist.has_changed()
+    assert not watchlist.has_changed()
+
+
+def test_concurrent_adds_from_several_services_keep_every_address(tmp_path):
+    """Test that services in different workers sharing the file never lose an address."""
+    import threading
+    path = str(tmp_path / "watchlist.json")
+    services = [WatchlistService(path=path) for _ in range(4)]
+
+    def add_addresses(index, service):
+        for i in range(10):
+            service.add([f"0x{index * 100 + i + 1:040x}"])
+
+    with patch('app.services.watchlist_service.settings') as mock_settings:
+        mock_settings.USERS_LISTENED = []
+        threads = [threading.Thread(target=add_addresses, args=item) for item in enumerate(services)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(services[0].get()) == 40
+
+
+def test_subscription_manager_sends_only_diff():
+    """Test that only added and removed addresses are (un)subscribed."""
+    info_client = Mock()
+    info_client.subscribe.return_value = 7
+    subscriptions = {ADDR_1: 1}
+    manager = SubscriptionManager(subscriptions, "userFills", Mock())
+
+    failed = manager.sync(info_client, [ADDR_2])
+
+    assert failed == []
+    info_client.unsubscribe.assert_called_once_with({"type": "userFills", "user": ADDR_1}, 1)
+    info_client.subscribe.assert_called_once()
+    assert info_client.subscribe.call_args.args[0] == {"type": "userFills", "user": ADDR_2}
+    assert subscriptions == {ADDR_2: 7}
+
+
+def test_subscription_manager_keeps_unchanged_addresses():
+    """Test that addresses staying watched are not resubscribed."""
+    info_client = Mock()
+    subscriptions = {ADDR_1: 1}
+    manager = SubscriptionManager(subscriptions, "userFills", Mock())
+
+    manager.sync(info_client, [ADDR_1.lower()])
+
+    info_client.subscribe.assert_not_called()
+    info_client.unsubscribe.assert_not_called()
+    assert subscriptions == {ADDR_1: 1}
+
+
+def test_subscription_manager_reports_failures():
+    """Test that failed subscriptions are reported and not recorded."""
+    info_client = Mock()
+    info_client.subscribe.side_effect = Exception("ws closed")
+    subscriptions = {}
+    manager = SubscriptionManager(subscriptions, "userFills", Mock())
+
+    assert manager.sync(info_client, [ADDR_1]) == [ADDR_1]
+    assert subscriptions == {}